@@ -0,0 +1,58 @@
+"""Benchmark: PlaybackEngine track transitions per minute on FakeBackend.
+
+Simulates end-of-track -> advance -> play -> preload cycles on a virtual
+clock (no VLC, no Tk), so the cost measured is the sequencing itself.
+
+Run from the parent directory of song_folder_player/:
+    py -3.13 -m song_folder_player.benchmarks.bench_engine [transitions] [tracks]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from song_folder_player.benchmarks.bench_natural_sort import synthetic_names
+from song_folder_player.engine import FakeBackend, PlaybackEngine
+from song_folder_player.media_utils import sort_names
+from song_folder_player.playlist import PlaylistController
+from song_folder_player.shuffle import STRATEGIES
+from song_folder_player.state import PlaylistState
+
+DEFAULT_TRANSITIONS = 1_000_000
+DEFAULT_TRACKS = 10_000
+ROOT = Path("C:/Music/Library")
+TRACK_MS = 1000
+
+
+def run(label: str, names: list[str], transitions: int, strategy: str | None) -> None:
+    """Time transitions track changes in one playback mode."""
+    playlist = PlaylistController()
+    playlist.load([ROOT / n for n in names], PlaylistState(loop_enabled=True), root=ROOT)
+    if strategy is not None:
+        playlist.shuffle_strategy = strategy
+        playlist.enable_shuffle(seed=1)
+    backend = FakeBackend(track_ms=TRACK_MS)
+    engine = PlaybackEngine(playlist, backend)
+    engine.play_at(0)
+
+    start = time.perf_counter()
+    backend.tick(TRACK_MS * transitions)
+    elapsed = time.perf_counter() - start
+    assert backend.ends == transitions and backend.preload_hits == transitions
+    print(f"  {label:<22} {elapsed:8.2f} s {transitions / elapsed * 60 / 1e6:10.1f} M/min "
+          f"{elapsed / transitions * 1e6:8.2f} us each")
+
+
+def main() -> None:
+    args = [int(arg) for arg in sys.argv[1:]]
+    transitions = args[0] if args else DEFAULT_TRANSITIONS
+    tracks = args[1] if len(args) > 1 else DEFAULT_TRACKS
+    names = sort_names(synthetic_names(tracks))
+    print(f"{transitions:,} transitions over {tracks:,} tracks")
+    run("straight", names, transitions, None)
+    for name in STRATEGIES:
+        run(f"shuffle ({name})", names, transitions, name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark: silence between tracks, with and without preloading the next one.
+
+Plays short tracks back to back through VLCPlayer and reports the gap it
+measures between the end of one track and the start of the next
+(VLCPlayer.last_gap_ms), and where the next track started: a preloaded
+track plays muted until it is paused, then is rewound, so its start
+position should be near 0 ms rather than however far it had run. Needs
+VLC and an audio device. By default the
+tracks are generated WAV tones in a temp folder; pass a folder (e.g. on a
+network share) to use the first two audio files found there.
+
+Run from the parent directory of song_folder_player/:
+    py -3.13 -m song_folder_player.benchmarks.bench_gapless [folder] [rounds]
+"""
+
+import math
+import statistics
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Callable
+
+from song_folder_player.events import EVENT_END
+from song_folder_player.media_utils import scan_folder
+from song_folder_player.player import VLCPlayer
+
+DEFAULT_ROUNDS = 5
+TONE_SECONDS = 1.0
+SAMPLE_RATE = 44100
+
+
+def write_tone(path: Path, frequency: float, seconds: float = TONE_SECONDS) -> None:
+    """Write a quiet mono 16-bit sine tone."""
+    frames = int(SAMPLE_RATE * seconds)
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(SAMPLE_RATE)
+        out.writeframes(b"".join(
+            struct.pack("<h", int(3000 * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE)))
+            for i in range(frames)
+        ))
+
+
+def tracks(folder: Path | None, workdir: Path) -> list[Path]:
+    """Two tracks to alternate between."""
+    if folder is None:
+        pair = [workdir / "a.wav", workdir / "b.wav"]
+        write_tone(pair[0], 440.0)
+        write_tone(pair[1], 660.0)
+        return pair
+    found = scan_folder(folder)[:2]
+    if len(found) < 2:
+        raise SystemExit(f"need two audio files in {folder}")
+    return found
+
+
+class EndHook:
+    """Routes the player's end events to the current round's handler."""
+
+    def __init__(self, player: VLCPlayer) -> None:
+        self.handler: Callable[[], None] | None = None
+        player.events.subscribe(EVENT_END, self._on_end)
+
+    def _on_end(self) -> None:
+        if self.handler is not None:
+            self.handler()
+
+
+def measure(
+    player: VLCPlayer, hook: EndHook, first: Path, second: Path, preload: bool
+) -> tuple[float, int] | None:
+    """Gap in ms between first ending and second starting, and second's start position."""
+    ended = threading.Event()
+    start_ms = -1
+
+    def on_end() -> None:
+        nonlocal start_ms
+        # What the GUI does when it drains the end event.
+        player.play(second)
+        start_ms = player.get_time()
+        ended.set()
+
+    hook.handler = on_end
+    player.last_gap_ms = None
+    player.play(first)
+    player.preload(second if preload else None)
+    if not ended.wait(TONE_SECONDS * 10 + 30):
+        return None
+    deadline = time.monotonic() + 10
+    while player.last_gap_ms is None and time.monotonic() < deadline:
+        time.sleep(0.005)
+    gap = player.last_gap_ms
+    player.stop()
+    return None if gap is None else (gap, start_ms)
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    folder = Path(args[0]) if args and not args[0].isdigit() else None
+    rounds = int(args[-1]) if args and args[-1].isdigit() else DEFAULT_ROUNDS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        first, second = tracks(folder, workdir)
+        print(f"tracks: {first.name}, {second.name}; {rounds} rounds")
+        player = VLCPlayer()  # Events dispatched on the posting thread, not queued
+        hook = EndHook(player)
+        try:
+            for label, preload in (("set_media on track end", False), ("preloaded", True)):
+                gaps = [measure(player, hook, first, second, preload) for _ in range(rounds)]
+                measured = [g for g, _start in filter(None, gaps)]
+                starts = [start for _g, start in filter(None, gaps)]
+                if not measured:
+                    print(f"  {label:<24} no measurement (playback failed)")
+                    continue
+                print(f"  {label:<24} median {statistics.median(measured):8.1f} ms, "
+                      f"max {max(measured):8.1f} ms ({len(measured)} measured), "
+                      f"next track started at <= {max(starts)} ms")
+        finally:
+            player.release()
+
+
+if __name__ == "__main__":
+    main()
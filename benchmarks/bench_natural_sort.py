@@ -0,0 +1,81 @@
+"""Benchmark: natural sort keys, original implementation vs media_utils.
+
+Run from the parent directory of song_folder_player/:
+    py -3.13 -m song_folder_player.benchmarks.bench_natural_sort [sizes...]
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from song_folder_player.media_utils import natural_name_key, natural_sorted, sort_names
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def legacy_natural_sort_key(path: Path) -> list[int | str]:
+    """natural_sort_key as originally shipped (uncompiled split, list key)."""
+    text = path.name.lower()
+    parts: list[int | str] = []
+    for segment in re.split(r'(\d+)', text):
+        if segment.isdigit():
+            parts.append(int(segment))
+        else:
+            parts.append(segment)
+    return parts
+
+
+def synthetic_names(count: int, seed: int = 0) -> list[str]:
+    """Filenames shaped like a real library: artist, album, track number, title."""
+    rng = random.Random(seed)
+    words = ["love", "night", "blue", "river", "song", "dream", "fire", "road", "Live", "Remix"]
+    exts = [".mp3", ".flac", ".m4a", ".ogg"]
+    names = []
+    for i in range(count):
+        title = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        names.append(
+            f"Artist {rng.randint(1, 500)} - Album {rng.randint(1, 40)} - "
+            f"{rng.randint(1, 30):02d} {title} ({i}){rng.choice(exts)}"
+        )
+    return names
+
+
+def timed(label: str, func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<42} {elapsed * 1000:10.1f} ms")
+    return elapsed
+
+
+def run(size: int) -> None:
+    names = synthetic_names(size)
+    paths = [Path(n) for n in names]
+    print(f"{size:,} names")
+
+    base = timed("legacy: paths.sort(key=list key)", lambda: sorted(paths, key=legacy_natural_sort_key))
+    new = timed("natural_sorted(paths)", lambda: natural_sorted(paths))
+    timed("sort_names(names)", lambda: sort_names(names))
+    natural_name_key.cache_clear()
+    timed("sorted(names, key=natural_name_key) cold", lambda: sorted(names, key=natural_name_key))
+    timed("sorted(names, key=natural_name_key) warm", lambda: sorted(names, key=natural_name_key))
+    print(f"  speedup (legacy / natural_sorted)          {base / new:10.2f}x")
+
+    sample = names[: min(size, 10_000)]
+    legacy_size = sum(sys.getsizeof(legacy_natural_sort_key(Path(n))) for n in sample)
+    tuple_size = sum(sys.getsizeof(natural_name_key(n)) for n in sample)
+    print(f"  key container bytes per name: list {legacy_size / len(sample):.0f}, "
+          f"tuple {tuple_size / len(sample):.0f}")
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SIZES)
+    for size in sizes:
+        run(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark: PlaylistController.load reconciliation of a saved shuffle order.
+
+Run from the parent directory of song_folder_player/:
+    py -3.13 -m song_folder_player.benchmarks.bench_reconcile [sizes...]
+"""
+
+import gc
+import random
+import sys
+import tracemalloc
+from array import array
+from pathlib import Path
+
+from song_folder_player.benchmarks.bench_natural_sort import synthetic_names, timed
+from song_folder_player.media_utils import sort_names
+from song_folder_player.playlist import PlaylistController, merge_at_random_positions
+from song_folder_player.state import PlaylistState
+
+DEFAULT_SIZES = (10_000, 100_000)
+
+
+def legacy_insert(base: list[int], extra: list[int]) -> list[int]:
+    """New-file insertion as originally shipped: one list.insert per file."""
+    merged = list(base)
+    extra = list(extra)
+    random.shuffle(extra)
+    for idx in extra:
+        merged.insert(random.randint(0, len(merged)), idx)
+    return merged
+
+
+ROOT = Path("C:/Music/Library")
+
+
+def saved_state(files: list[Path]) -> PlaylistState:
+    """Shuffled state for files, as sync_to_state would save it."""
+    state = PlaylistState(current_filename=files[len(files) // 2].name)
+    ctrl = PlaylistController()
+    ctrl.load(files, state, root=ROOT)
+    ctrl.enable_shuffle()
+    ctrl.sync_to_state()
+    return state
+
+
+def retained_bytes(build: object) -> int:
+    """Bytes still allocated by build() once its result is the only survivor."""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    result = build()  # type: ignore[operator]
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def loaded_controller(files: list[Path]) -> PlaylistController:
+    ctrl = PlaylistController()
+    ctrl.load(files, PlaylistState(), root=ROOT)
+    return ctrl
+
+
+def run(size: int) -> None:
+    files = [ROOT / n for n in sort_names(synthetic_names(size))]
+    print(f"{size:,} files")
+
+    state = saved_state(files)
+    ctrl = PlaylistController()
+    timed("load, folder unchanged (fingerprint)", lambda: ctrl.load(files, state, root=ROOT))
+    names_state = PlaylistState(
+        current_filename=state.current_filename, shuffle_order=list(state.shuffle_order or [])
+    )
+    timed("load, name list (full reconcile)", lambda: ctrl.load(files, names_state, root=ROOT))
+
+    # Half the folder is new since the order was saved.
+    half_state = saved_state(files[: size // 2])
+    timed("load, 50% new files", lambda: ctrl.load(files, half_state, root=ROOT))
+
+    base = list(range(size // 2))
+    extra = list(range(size // 2, size))
+    old = timed("legacy: list.insert per new file", lambda: legacy_insert(base, extra))
+    new = timed("merge_at_random_positions", lambda: merge_at_random_positions(base, extra))
+    print(f"  speedup (legacy / merge)                   {old / new:10.2f}x")
+
+    # Name strings are shared by both sides, so this compares the containers.
+    names = [f.name for f in files]
+    paths = retained_bytes(lambda: [ROOT / n for n in names])
+    ctrl = retained_bytes(lambda: loaded_controller([ROOT / n for n in names]))
+    print(f"  bytes per track besides its name: list[Path] {paths / size:.0f}, "
+          f"controller {ctrl / size:.0f}")
+    as_list = retained_bytes(lambda: random.sample(range(size), size))
+    as_array = retained_bytes(lambda: array("I", random.sample(range(size), size)))
+    print(f"  bytes per shuffle entry: list {as_list / size:.1f}, array {as_array / size:.1f}")
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SIZES)
+    for size in sizes:
+        run(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark: shuffle strategies, checking each stays O(n log n).
+
+Run from the parent directory of song_folder_player/:
+    py -3.13 -m song_folder_player.benchmarks.bench_shuffle [sizes...]
+"""
+
+import math
+import random
+import sys
+import time
+
+from song_folder_player.benchmarks.bench_natural_sort import synthetic_names
+from song_folder_player.shuffle import STRATEGIES
+
+DEFAULT_SIZES = (10_000, 100_000)
+
+
+def library_names(count: int, seed: int = 0) -> list[str]:
+    """Track names in album subfolders of about 12 tracks each."""
+    return [f"Album {i // 12:05d}/{name}" for i, name in enumerate(synthetic_names(count, seed))]
+
+
+def play_counts(names: list[str], seed: int = 0) -> dict[str, int]:
+    """A tenth of the tracks played, with a long tail of counts."""
+    rng = random.Random(seed)
+    return {name: int(rng.paretovariate(1.2)) for name in rng.sample(names, len(names) // 10)}
+
+
+def time_strategy(name: str, names: list[str], counts: dict[str, int]) -> tuple[float, float]:
+    """Time building an order, then reading every entry (what lazy orders defer)."""
+    strategy = STRATEGIES[name]
+    start = time.perf_counter()
+    order = strategy.order(names, 12345, counts)
+    built = time.perf_counter()
+    for _ in order:
+        pass
+    return built - start, time.perf_counter() - built
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SIZES)
+    results: dict[str, list[float]] = {name: [] for name in STRATEGIES}
+    for size in sizes:
+        names = library_names(size)
+        counts = play_counts(names)
+        print(f"{size:,} tracks{'build':>16}{'read all':>14}")
+        for name in STRATEGIES:
+            build, read = time_strategy(name, names, counts)
+            results[name].append(build + read)
+            print(f"  {name:<12} {build * 1000:10.1f} ms {read * 1000:10.1f} ms")
+
+    if len(sizes) > 1:
+        # Time ratio between the largest and smallest size, relative to n log n growth.
+        small, large = sizes[0], sizes[-1]
+        expected = (large * math.log(large)) / (small * math.log(small))
+        print(f"growth of build + read all, {small:,} -> {large:,} (n log n predicts {expected:.1f}x)")
+        for name, times in results.items():
+            print(f"  {name:<12} {times[-1] / times[0]:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""Headless playback sequencing over a PlaylistController and a pluggable backend."""
+
+import logging
+from pathlib import Path
+from typing import Callable, Protocol
+
+from .events import EVENT_END, PlayerEventBus
+from .playlist import PlaylistController
+
+logger = logging.getLogger(__name__)
+
+
+class PlaybackBackend(Protocol):
+    """What the engine needs from a player (VLCPlayer, or FakeBackend in tests).
+
+    The backend posts EVENT_END to its events bus when a track ends.
+    """
+
+    events: PlayerEventBus
+
+    def play(self, file_path: str | Path) -> bool: ...
+
+    def play_paused(self, file_path: str | Path) -> bool: ...
+
+    def play_paused_at(self, file_path: str | Path, ms: int) -> bool: ...
+
+    def preload(self, file_path: str | Path | None) -> None: ...
+
+    def stop(self) -> None: ...
+
+    def get_current_file(self) -> Path | None: ...
+
+    def get_time(self) -> int: ...
+
+    def set_time(self, ms: int) -> None: ...
+
+
+class PlaybackEngine:
+    """Playback sequencing: what plays when, independent of Tk and VLC.
+
+    Owns the rules the GUI used to implement inline: playing a display
+    position counts a play and preloads the next track, the end of a track
+    advances (or stops at the end without loop), and a folder load opens
+    the current track paused at its saved position. The UI listens through
+    on_track_change and on_state_change.
+    """
+
+    def __init__(
+        self,
+        playlist: PlaylistController,
+        backend: PlaybackBackend | None = None,
+        on_track_change: Callable[[Path | None], None] | None = None,
+        on_state_change: Callable[[], None] | None = None,
+    ) -> None:
+        """Initialize the engine.
+
+        Args:
+            playlist: Playlist to sequence.
+            backend: Player to drive; may be attached later (see attach).
+            on_track_change: Called with the track that started or was
+                loaded, or None when playback stops.
+            on_state_change: Called when playlist state changed and should
+                be saved.
+        """
+        self._playlist = playlist
+        self._backend: PlaybackBackend | None = None
+        self._on_track_change = on_track_change
+        self._on_state_change = on_state_change
+        if backend is not None:
+            self.attach(backend)
+
+    @property
+    def backend(self) -> PlaybackBackend | None:
+        """The attached player, if any."""
+        return self._backend
+
+    def attach(self, backend: PlaybackBackend) -> None:
+        """Start driving a player; its end-of-track events advance the playlist.
+
+        Args:
+            backend: Player to drive.
+        """
+        self._backend = backend
+        backend.events.subscribe(EVENT_END, self.on_track_end)
+
+    def _ready(self) -> PlaybackBackend | None:
+        """The backend, if there is one and a playlist is loaded."""
+        if self._backend is None or not self._playlist.is_loaded:
+            return None
+        return self._backend
+
+    def _track_changed(self, path: Path | None) -> None:
+        if self._on_track_change is not None:
+            self._on_track_change(path)
+
+    def _state_changed(self) -> None:
+        if self._on_state_change is not None:
+            self._on_state_change()
+
+    def play_at(self, display_pos: int) -> bool:
+        """Play the track at a display position.
+
+        Args:
+            display_pos: Position in the display order.
+
+        Returns:
+            True if a track was started.
+        """
+        backend = self._ready()
+        if backend is None:
+            return False
+        file_path = self._playlist.file_at(display_pos)
+        if file_path is None:
+            return False
+
+        self._playlist.go_to(display_pos)
+        self._playlist.record_play()
+        self._state_changed()
+
+        logger.debug("playing: %s", file_path.name)
+        backend.play(file_path)
+        self.preload_next()
+        self._track_changed(file_path)
+        return True
+
+    def play_next(self) -> bool:
+        """Play the next track, or stop at the end of the playlist without loop.
+
+        Returns:
+            True if a track was started.
+        """
+        if not self._playlist.is_loaded:
+            return False
+        next_pos = self._playlist.advance()
+        if next_pos is None:
+            self.stop()
+            return False
+        return self.play_at(next_pos)
+
+    def play_previous(self) -> bool:
+        """Play the previous track.
+
+        Returns:
+            True if a track was started.
+        """
+        if not self._playlist.is_loaded:
+            return False
+        return self.play_at(self._playlist.retreat())
+
+    def on_track_end(self) -> None:
+        """Handle EVENT_END from the backend."""
+        self.play_next()
+
+    def stop(self) -> None:
+        """Stop playback."""
+        if self._backend is None:
+            return
+        self._backend.stop()
+        self._track_changed(None)
+
+    def load_current_paused(self) -> bool:
+        """Open the current track paused, at its saved playback position.
+
+        Used on folder load so controls work at once without starting playback.
+
+        Returns:
+            True if a track was loaded.
+        """
+        backend = self._ready()
+        if backend is None:
+            return False
+        file_path = self._playlist.file_at(self._playlist.current_display_index)
+        if file_path is None:
+            return False
+
+        # The backend seeks once the file is open, however long that takes.
+        backend.play_paused_at(file_path, self._playlist.playback_position_ms)
+        self._track_changed(file_path)
+        self.preload_next()
+        return True
+
+    def preload_next(self) -> None:
+        """Preload the track that plays next, so it starts without a gap.
+
+        Call whenever the current track or the order after it changes.
+        """
+        backend = self._ready()
+        if backend is None:
+            return
+        next_pos = self._playlist.peek_next()
+        backend.preload(None if next_pos is None else self._playlist.file_at(next_pos))
+
+    def sync_state(self) -> bool:
+        """Write the current track, position and order into the playlist's state.
+
+        Call before loading another folder: the playlist then takes a new
+        PlaylistState, and anything not yet synced would never be saved.
+
+        Returns:
+            True if a playlist was loaded (its state should be saved).
+        """
+        if not self._playlist.is_loaded:
+            return False
+        self.capture_position()
+        self._playlist.sync_to_state()
+        return True
+
+    def capture_position(self) -> bool:
+        """Copy the backend's position into playlist state.
+
+        Returns:
+            True if the saved position changed (state should be saved).
+        """
+        backend = self._ready()
+        if backend is None or not backend.get_current_file():
+            return False
+        current_ms = backend.get_time()
+        if current_ms < 0 or current_ms == self._playlist.playback_position_ms:
+            return False
+        self._playlist.playback_position_ms = current_ms
+        return True
+
+
+class FakeBackend:
+    """PlaybackBackend on a virtual clock, for tests and benchmarks.
+
+    Nothing is opened or decoded: every track lasts track_ms (or whatever
+    track_ms(path) returns) and time only moves when tick() is called, so
+    simulated playback runs as fast as the engine can sequence it.
+    """
+
+    def __init__(
+        self,
+        track_ms: int | Callable[[Path], int] = 180_000,
+        events: PlayerEventBus | None = None,
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            track_ms: Length of every track, or a function of its path.
+            events: Bus for EVENT_END; by default one that dispatches at once.
+        """
+        self.events = events if events is not None else PlayerEventBus()
+        self._track_ms = track_ms
+        self._current: Path | None = None
+        self._preloaded: Path | None = None
+        self._time_ms = 0
+        self._length_ms = 0
+        self._playing = False
+        self.plays = 0  # play() calls
+        self.preloads = 0  # preload() calls with a track
+        self.preload_hits = 0  # play() of the preloaded track
+        self.ends = 0  # Tracks played to the end
+
+    def _open(self, file_path: str | Path) -> Path:
+        path = Path(file_path)
+        self._current = path
+        self._time_ms = 0
+        length = self._track_ms(path) if callable(self._track_ms) else self._track_ms
+        self._length_ms = max(1, length)  # A zero-length track would never let tick() finish
+        return path
+
+    def play(self, file_path: str | Path) -> bool:
+        path = self._open(file_path)
+        self.plays += 1
+        if path == self._preloaded:
+            self.preload_hits += 1
+            self._preloaded = None
+        self._playing = True
+        return True
+
+    def play_paused(self, file_path: str | Path) -> bool:
+        return self.play_paused_at(file_path, 0)
+
+    def play_paused_at(self, file_path: str | Path, ms: int) -> bool:
+        self._open(file_path)
+        self._playing = False
+        self.set_time(ms)
+        return True
+
+    def preload(self, file_path: str | Path | None) -> None:
+        self._preloaded = None if file_path is None else Path(file_path)
+        if file_path is not None:
+            self.preloads += 1
+
+    def stop(self) -> None:
+        self._current = None
+        self._playing = False
+        self._time_ms = self._length_ms = 0
+
+    def set_paused(self, paused: bool) -> None:
+        self._playing = not paused and self._current is not None
+
+    def is_playing(self) -> bool:
+        return self._playing
+
+    def get_current_file(self) -> Path | None:
+        return self._current
+
+    def get_time(self) -> int:
+        return self._time_ms if self._current is not None else -1
+
+    def set_time(self, ms: int) -> None:
+        self._time_ms = max(0, min(ms, self._length_ms))
+
+    def get_length(self) -> int:
+        return self._length_ms if self._current is not None else -1
+
+    def tick(self, ms: int) -> None:
+        """Advance the virtual clock, ending tracks (EVENT_END) as they run out.
+
+        With a bus that dispatches at once, the engine starts the next track
+        inside this call and the remaining time is spent on it.
+
+        Args:
+            ms: Milliseconds of playback to simulate.
+        """
+        while ms > 0 and self._playing:
+            left = self._length_ms - self._time_ms
+            if ms < left:
+                self._time_ms += ms
+                return
+            ms -= left
+            self._time_ms = self._length_ms
+            self._playing = False
+            self.ends += 1
+            self.events.post(EVENT_END)
@@ -0,0 +1,107 @@
+"""Lock-free event bus carrying player events from VLC threads to one consumer thread."""
+
+import logging
+from collections import deque
+from typing import Any, Callable, Collection
+
+logger = logging.getLogger(__name__)
+
+# Event kinds posted by VLCPlayer
+EVENT_END = "end"  # Track ended (or was handed off gaplessly); no arguments
+EVENT_PROGRESS = "progress"  # (time_ms, length_ms, playing); -1 = unknown
+
+# schedule(delay_ms, callback) runs callback later on the consumer thread,
+# e.g. tk.Misc.after.
+Scheduler = Callable[[int, Callable[[], None]], Any]
+
+
+class PlayerEventBus:
+    """Queues events posted from any thread and dispatches them in batches.
+
+    post() appends to a deque (atomic in CPython, so no lock) and arms at
+    most one drain via the scheduler; drain() runs on the consumer thread
+    and dispatches everything queued since, in order. Kinds listed in
+    coalesce (e.g. progress) are dispatched only once per batch, with their
+    latest arguments, and arm the drain after delay_ms() instead of at once,
+    so a burst of position updates costs one wakeup. Any other kind arms an
+    immediate drain.
+
+    Without a scheduler, events are dispatched synchronously on the posting
+    thread (for headless use and benchmarks).
+    """
+
+    def __init__(
+        self,
+        schedule: Scheduler | None = None,
+        delay_ms: Callable[[], int] = lambda: 0,
+        coalesce: Collection[str] = (EVENT_PROGRESS,),
+    ) -> None:
+        """Initialize the bus.
+
+        Args:
+            schedule: Runs a callback after a delay on the consumer thread;
+                None dispatches on the posting thread.
+            delay_ms: Current drain delay for coalesced kinds (may change,
+                e.g. while the window is unfocused).
+            coalesce: Kinds where only the latest event per batch matters.
+        """
+        self._schedule = schedule
+        self._delay_ms = delay_ms
+        self._coalesce = frozenset(coalesce)
+        self._queue: deque[tuple[str, tuple[Any, ...]]] = deque()
+        self._handlers: dict[str, list[Callable[..., None]]] = {}
+        self._armed_ms: int | None = None  # Delay of the pending drain, None if none
+
+    def subscribe(self, kind: str, handler: Callable[..., None]) -> None:
+        """Call handler(*args) for every dispatched event of a kind.
+
+        Args:
+            kind: Event kind (e.g. EVENT_END).
+            handler: Receives the event's arguments.
+        """
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def post(self, kind: str, *args: Any) -> None:
+        """Queue an event (any thread).
+
+        Args:
+            kind: Event kind.
+            *args: Event arguments.
+        """
+        self._queue.append((kind, args))
+        if self._schedule is None:
+            self.drain()
+            return
+        delay = self._delay_ms() if kind in self._coalesce else 0
+        armed = self._armed_ms
+        if armed is None or delay < armed:
+            # Racing posters may both schedule; an extra drain finds nothing.
+            self._armed_ms = delay
+            self._schedule(delay, self.drain)
+
+    def drain(self) -> None:
+        """Dispatch every queued event (consumer thread)."""
+        # Disarm before reading the queue: an event posted from here on arms a
+        # new drain, and one posted earlier is picked up below.
+        self._armed_ms = None
+        batch: list[tuple[str, tuple[Any, ...]]] = []
+        while True:
+            try:
+                batch.append(self._queue.popleft())
+            except IndexError:
+                break
+        if not batch:
+            return
+        last_of_kind = {kind: i for i, (kind, _args) in enumerate(batch) if kind in self._coalesce}
+        for i, (kind, args) in enumerate(batch):
+            if kind in self._coalesce and last_of_kind[kind] != i:
+                continue
+            for handler in self._handlers.get(kind, ()):
+                try:
+                    handler(*args)
+                except Exception:
+                    logger.exception("player event handler failed: %s", kind)
+
+    def __len__(self) -> int:
+        """Number of events waiting to be dispatched."""
+        return len(self._queue)
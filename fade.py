@@ -0,0 +1,90 @@
+"""Crossfade curves and a drift-free timer for running a fade."""
+
+import math
+import threading
+import time
+from typing import Callable
+
+# A curve maps fade progress t (0.0 -> 1.0) to (outgoing gain, incoming gain).
+FadeCurve = Callable[[float], tuple[float, float]]
+
+DEFAULT_CURVE = "equal_power"
+FADE_STEP_S = 0.02  # Volume update interval during a fade
+
+
+def _linear(t: float) -> tuple[float, float]:
+    """Straight ramps; the sum of gains is constant (dips in loudness mid-fade)."""
+    return 1.0 - t, t
+
+
+def _equal_power(t: float) -> tuple[float, float]:
+    """Quarter sine/cosine; the sum of squared gains is constant (no dip)."""
+    angle = t * math.pi / 2
+    return math.cos(angle), math.sin(angle)
+
+
+def _s_curve(t: float) -> tuple[float, float]:
+    """Smoothstep ramps: gentle at both ends, quicker in the middle."""
+    eased = t * t * (3.0 - 2.0 * t)
+    return 1.0 - eased, eased
+
+
+CURVES: dict[str, FadeCurve] = {
+    "linear": _linear,
+    "equal_power": _equal_power,
+    "s_curve": _s_curve,
+}
+
+
+def get_curve(name: str) -> FadeCurve:
+    """Look up a fade curve by name.
+
+    Args:
+        name: Curve name (a key of CURVES).
+
+    Returns:
+        The curve, or the equal-power curve for unknown names.
+    """
+    return CURVES.get(name, CURVES[DEFAULT_CURVE])
+
+
+def run_fade(
+    duration_s: float,
+    step: Callable[[float], None],
+    cancel: threading.Event,
+    interval_s: float = FADE_STEP_S,
+    clock: Callable[[], float] = time.perf_counter,
+) -> bool:
+    """Call step(t) for t rising from 0.0 to 1.0 over duration_s, on this thread.
+
+    Ticks are scheduled against absolute deadlines on a monotonic clock, so
+    a late wakeup shortens the next wait instead of delaying the rest of
+    the fade, and t always comes from the elapsed time. The last call is
+    always step(1.0) unless cancelled.
+
+    Args:
+        duration_s: Fade length in seconds (<= 0 jumps straight to 1.0).
+        step: Applies the fade at progress t.
+        cancel: Set from another thread to stop the fade early.
+        interval_s: Target time between steps.
+        clock: Monotonic clock in seconds (overridable for tests).
+
+    Returns:
+        True if the fade completed, False if it was cancelled.
+    """
+    start = clock()
+    deadline = start
+    while True:
+        if cancel.is_set():
+            return False
+        elapsed = clock() - start
+        if duration_s <= 0 or elapsed >= duration_s:
+            step(1.0)
+            return True
+        step(elapsed / duration_s)
+        deadline += interval_s
+        wait = deadline - clock()
+        if wait < 0:
+            deadline = clock()  # Fell behind: resync rather than burst
+        elif cancel.wait(wait):
+            return False
@@ -0,0 +1,212 @@
+"""Persistent per-folder file index, so unchanged folders load without rescanning."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from .media_utils import MEDIA_EXTENSIONS, NaturalKey, natural_key, walk_media_dirs
+from .state import APP_DIR
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = APP_DIR / "index"
+INDEX_VERSION = 1
+
+
+@dataclass
+class _DirRecord:
+    """Cached listing of one directory.
+
+    A record is trusted while the directory's mtime and inode are unchanged:
+    adding, removing, or renaming an entry updates the directory mtime.
+    """
+
+    mtime_ns: int
+    ino: int
+    dev: int = 0
+    # (name, size, mtime_ns, natural sort key), naturally sorted by name
+    files: list[tuple[str, int, int, NaturalKey]] = field(default_factory=list)
+    subdirs: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "mtime_ns": self.mtime_ns,
+            "ino": self.ino,
+            "dev": self.dev,
+            "files": [list(f) for f in self.files],
+            "subdirs": self.subdirs,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "_DirRecord":
+        """Create a _DirRecord from dictionary."""
+        return cls(
+            mtime_ns=data["mtime_ns"],
+            ino=data["ino"],
+            dev=data.get("dev", 0),
+            files=[(f[0], f[1], f[2], tuple(f[3])) for f in data["files"]],
+            subdirs=data.get("subdirs", []),
+        )
+
+
+def _index_file(folder: Path, recursive: bool) -> Path:
+    """Cache file location for a folder and scan mode."""
+    digest = hashlib.sha1(str(folder).encode("utf-8")).hexdigest()
+    return INDEX_DIR / (f"{digest}.r.json" if recursive else f"{digest}.json")
+
+
+def _load_index(folder: Path, recursive: bool) -> dict[str, _DirRecord]:
+    """Read the cached records for a folder, or {} if absent or unusable."""
+    path = _index_file(folder, recursive)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION or data.get("folder") != str(folder):
+            return {}
+        return {rel: _DirRecord.from_dict(rec) for rel, rec in data["dirs"].items()}
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        logger.warning("folder index unreadable, rescanning: %s", path, exc_info=True)
+        return {}
+
+
+def _save_index(folder: Path, recursive: bool, records: dict[str, _DirRecord]) -> None:
+    """Write the records for a folder atomically; failures are only logged."""
+    path = _index_file(folder, recursive)
+    data = {
+        "version": INDEX_VERSION,
+        "folder": str(folder),
+        "recursive": recursive,
+        "dirs": {rel: rec.to_dict() for rel, rec in records.items()},
+    }
+    try:
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=INDEX_DIR, prefix="index_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+    except OSError:
+        logger.warning("failed to save folder index: %s", path, exc_info=True)
+
+
+def _list_directory(path: Path, st: os.stat_result, recursive: bool) -> _DirRecord:
+    """Read a directory from disk into a fresh record.
+
+    Per-file size and mtime come from DirEntry.stat(), which is served from
+    the directory listing on Windows without extra system calls. Sort keys
+    bypass natural_name_key's cache: a bulk scan would only evict the keys
+    the GUI reuses.
+    """
+    record = _DirRecord(mtime_ns=st.st_mtime_ns, ino=st.st_ino, dev=st.st_dev)
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if recursive:
+                        record.subdirs.append(entry.name)
+                    continue
+                if os.path.splitext(entry.name)[1].lower() not in MEDIA_EXTENSIONS:
+                    continue
+                if not entry.is_file():
+                    continue
+                entry_st = entry.stat()
+            except OSError:
+                continue
+            record.files.append(
+                (entry.name, entry_st.st_size, entry_st.st_mtime_ns, natural_key(entry.name))
+            )
+    record.files.sort(key=lambda f: f[3])
+    return record
+
+
+def scan_folder_cached(
+    folder_path: str | Path,
+    recursive: bool = False,
+    on_batch: Callable[[list[Path]], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> list[Path]:
+    """Scan a folder for media files, reusing the on-disk index when valid.
+
+    Equivalent to media_utils.scan_folder, and walks the tree the same way
+    (media_utils.walk_media_dirs), but each directory is first checked
+    against its cached mtime/inode under INDEX_DIR. Unchanged directories
+    cost a single stat; only directories that changed are listed again.
+
+    Args:
+        folder_path: Path to the folder to scan.
+        recursive: Also include media files in subfolders.
+        on_batch: Called with each directory's files (unsorted across
+            directories) as soon as they are known, for progressive display.
+            Runs on the calling thread.
+        cancel: If set during the scan, the walk stops and an empty list is
+            returned without updating the index.
+
+    Returns:
+        List of Path objects for media files, sorted like scan_folder.
+    """
+    folder = Path(folder_path)
+    if not folder.is_dir():
+        return []
+
+    root = str(folder)
+    cached = _load_index(folder, recursive)
+    listed: dict[str, _DirRecord] = {}  # Filled by walk workers, one key each
+    relisted = False
+
+    def relative(path: str) -> str:
+        return "" if path == root else Path(path).relative_to(folder).as_posix()
+
+    def list_directory(path: str, st: os.stat_result) -> tuple[list[Path], list[str]]:
+        nonlocal relisted
+        rel = relative(path)
+        record = cached.get(rel)
+        if record is None or record.mtime_ns != st.st_mtime_ns or record.ino != st.st_ino:
+            record = _list_directory(Path(path), st, recursive)
+            relisted = True
+        record.dev = st.st_dev
+        listed[rel] = record
+        return (
+            [Path(path, f[0]) for f in record.files],
+            [os.path.join(path, name) for name in record.subdirs],
+        )
+
+    records: dict[str, _DirRecord] = {}
+    walk = walk_media_dirs(
+        folder, max_depth=None if recursive else 0, cancel=cancel, lister=list_directory
+    )
+    for path, files in walk:
+        rel = relative(path)
+        records[rel] = listed[rel]
+        if on_batch is not None and files:
+            on_batch(files)
+    if cancel is not None and cancel.is_set():
+        return []
+
+    if relisted or records.keys() != cached.keys():
+        logger.debug("folder index updated: %s", folder)
+        _save_index(folder, recursive, records)
+
+    if not recursive:
+        record = records.get("")
+        return [folder / f[0] for f in record.files] if record else []
+
+    keyed: list[tuple[list[NaturalKey], Path]] = []
+    for rel, record in records.items():
+        dir_key = [natural_key(part) for part in rel.split("/")] if rel else []
+        dir_path = folder / rel
+        for name, _size, _mtime, key in record.files:
+            keyed.append((dir_key + [key], dir_path / name))
+    keyed.sort(key=lambda item: item[0])
+    return [path for _key, path in keyed]
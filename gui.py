@@ -1,20 +1,28 @@
 """Tkinter GUI for Song Folder Player."""
 
+import bisect
 import ctypes
 import logging
 import sys
 import threading
 import tkinter as tk
+from array import array
 from pathlib import Path
 from tkinter import filedialog, ttk
-from typing import Callable
+from typing import Callable, Sequence
 
 logger = logging.getLogger(__name__)
 
-from .media_utils import scan_folder
-from .player import VLCPlayer
+from .engine import PlaybackEngine
+from .events import EVENT_PROGRESS, PlayerEventBus
+from .folder_index import scan_folder_cached
+from .media_info import MediaInfo, MediaInfoScanner
+from .player import VLCMediaParser, VLCPlayer
 from .playlist import PlaylistController
-from .state import AppState
+from .search import SearchIndex
+from .shuffle import STRATEGIES
+from .state import AppState, SaveScheduler
+from .virtual_list import VirtualListbox
 
 # Dark theme colors (matching multi_file_search style)
 DARK_BG = "#1e1e1e"        # Main background (darkest)
@@ -23,6 +31,20 @@ DARK_BG_WIDGET = "#3c3c3c" # Buttons, entry fields
 DARK_FG = "#d4d4d4"        # Text color
 DARK_ACCENT = "#264f78"    # Selection highlight
 
+# Search keystrokes are debounced on playlists at least this large, so fast
+# typing filters once per pause instead of once per key.
+SEARCH_DEBOUNCE_MIN_TRACKS = 5000
+SEARCH_DEBOUNCE_MS = 60
+
+# Progress bar/time label refresh limits; VLC pushes position changes, and
+# bursts are coalesced into one update per interval (see PlayerEventBus).
+PROGRESS_INTERVAL_MS = 100
+PROGRESS_UNFOCUSED_INTERVAL_MS = 1000
+PROGRESS_HIDDEN_INTERVAL_MS = 10_000  # Minimized: caught up on restore
+
+# Crossfade lengths offered in the dropdown (0 = off).
+CROSSFADE_CHOICES_MS = (0, 2000, 4000, 6000, 10000)
+
 
 class _ToolTip:
     """Simple hover tooltip for a tkinter widget."""
@@ -122,6 +144,10 @@ class SongFolderPlayerGUI:
         self.state = state
         self._on_state_change = on_state_change
 
+        # Coalesces saves: state changes mark it dirty, writes are batched.
+        self._save_scheduler = SaveScheduler(self._write_state)
+        self._save_after_id: str | None = None
+
         # Playlist controller — owns navigation logic and per-folder state.
         self._playlist = PlaylistController()
 
@@ -129,17 +155,47 @@ class SongFolderPlayerGUI:
         self._current_folder: str | None = None
 
         self._loading: bool = False  # Suppresses toggle callbacks during folder load
+        self._scanning: bool = False  # A background folder scan is in progress
         self._seeking: bool = False  # Suppresses progress updates while scrubbing
 
         # Search filter state
         self._search_var = tk.StringVar()
         self._search_var.trace_add("write", self._on_search_change)
-        # Maps filtered listbox pos -> original display pos
-        self._filtered_indices: list[int] = []
+        # Maps filtered listbox pos -> original display pos (a range when unfiltered)
+        self._filtered_indices: Sequence[int] = []
+        # Inverse of _filtered_indices for ranked (unsorted) fuzzy results
+        self._filtered_rows: dict[int, int] | None = None
+        # Display order captured at the last rebuild, read lazily by _row_text
+        self._display_order: Sequence[int] = []
         # When True, search results highlight first match; when False, highlight current track
         self._search_select_first: bool = False
         # Stores active item position before search began (for restore on Esc)
         self._pre_search_active_pos: int | None = None
+        # Search index over the loaded folder's track names
+        self._search_index = SearchIndex([])
+        # Pending debounced search refresh (root.after id)
+        self._search_after_id: str | None = None
+
+        # Background folder loading: each _load_folder call bumps the generation
+        # so results from a superseded scan are discarded on arrival.
+        self._load_generation: int = 0
+        self._load_cancel: threading.Event | None = None
+        self._scan_batches: list[tuple[int, list[Path]]] = []
+        self._scan_batches_lock = threading.Lock()
+        self._scan_flush_scheduled: bool = False
+        self._scan_folder: Path | None = None
+        self._scan_file_count: int = 0
+        self._scan_preview: list[str] = []  # Rows shown while scanning
+
+        # Track durations and tags, read in the background after a folder
+        # loads (see media_info). Durations are ms by file index, -1 = unknown.
+        self._media_scanner: MediaInfoScanner | None = None
+        self._durations: array[int] = array("i")
+        self._durations_total_ms: int = 0
+        self._durations_known: int = 0
+        self._info_batches: list[tuple[int, int, MediaInfo]] = []
+        self._info_batches_lock = threading.Lock()
+        self._info_flush_scheduled: bool = False
 
         # Zoom level (1.0 = 100%, default 1.2 = 120%)
         self._zoom_level: float = 1.2
@@ -155,6 +211,23 @@ class SongFolderPlayerGUI:
         # VLC player - deferred until after window is drawn
         self._player: VLCPlayer | None = None
 
+        # Player events from VLC threads, drained in batches on the Tk loop
+        self._player_events = PlayerEventBus(
+            schedule=self.root.after, delay_ms=self._progress_delay_ms
+        )
+        self._player_events.subscribe(EVENT_PROGRESS, self._on_player_progress)
+
+        # Playback sequencing (advance on end, resume, preload); the player is
+        # attached once VLC is ready. End-of-track events reach it via the bus.
+        self._engine = PlaybackEngine(
+            self._playlist,
+            on_track_change=self._on_track_change,
+            on_state_change=self._save_state,
+        )
+        self._time_text: str = "0:00 / 0:00"
+        self._window_visible: bool = True  # False while minimized
+        self._window_focused: bool = True  # False while another app has focus
+
         # Build GUI
         self._setup_window()
         self._create_widgets()
@@ -168,10 +241,7 @@ class SongFolderPlayerGUI:
         self._zoom_level = self.state.zoom_level
         self._apply_zoom()
 
-        # Start progress bar update loop
-        self._update_progress()
-
-        # Start periodic save timer (every 5 seconds)
+        # Start periodic playback position capture (every 5 seconds)
         self._periodic_save()
 
         # Defer player creation and folder load until after window is drawn
@@ -183,23 +253,27 @@ class SongFolderPlayerGUI:
         VLC plugin scanning can block for several seconds on first launch.
         Running it off the main thread keeps the window responsive.
         """
-        self._playlist_listbox.insert(tk.END, "  Loading player...")
-        self._playlist_listbox.itemconfig(0, foreground="#666666")
+        self._playlist_listbox.set_message("  Loading player...")
 
         def _create() -> None:
-            player = VLCPlayer(on_end_callback=self._on_track_end)
-            self.root.after(0, lambda: self._finish_player_init(player))
+            player = VLCPlayer(events=self._player_events)
+            parser = VLCMediaParser()
+            self.root.after(0, lambda: self._finish_player_init(player, parser))
 
         threading.Thread(target=_create, daemon=True).start()
 
-    def _finish_player_init(self, player: VLCPlayer) -> None:
+    def _finish_player_init(self, player: VLCPlayer, parser: VLCMediaParser) -> None:
         """Complete player setup on the main thread once VLC is ready.
 
         Args:
             player: The fully initialized VLCPlayer instance.
+            parser: Media parser for track durations and tags.
         """
         self._player = player
+        self._engine.attach(player)
+        self._media_scanner = MediaInfoScanner(parser.parse)
         self._player.set_volume(self.state.volume)
+        self._player.set_crossfade(self.state.crossfade_ms, self.state.crossfade_curve)
 
         if self.state.recent_folders:
             self._load_folder(self.state.recent_folders[0])
@@ -245,6 +319,9 @@ class SongFolderPlayerGUI:
         )
         self._folder_label.pack(fill=tk.X, pady=(0, 10))
 
+        # Scan progress (shown only while a folder is loading)
+        self._scan_progress = ttk.Progressbar(main_frame, mode="indeterminate")
+
         # Mode toggles frame
         mode_frame = ttk.Frame(main_frame)
         mode_frame.pack(fill=tk.X, pady=(0, 10))
@@ -265,7 +342,19 @@ class SongFolderPlayerGUI:
             mode_frame, text="Reshuffle", command=self._on_reshuffle, state=tk.DISABLED,
             takefocus=False
         )
-        self._reshuffle_btn.pack(side=tk.LEFT, padx=(0, 20))
+        self._reshuffle_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        # Shuffle strategy dropdown (per folder)
+        self._strategy_names = list(STRATEGIES)
+        self._strategy_combo = ttk.Combobox(
+            mode_frame,
+            values=[STRATEGIES[name].label for name in self._strategy_names],
+            state="readonly",
+            width=18,
+            takefocus=False,
+        )
+        self._strategy_combo.current(0)
+        self._strategy_combo.pack(side=tk.LEFT, padx=(0, 20))
 
         # Loop checkbox
         self._loop_var = tk.BooleanVar(value=True)
@@ -276,7 +365,18 @@ class SongFolderPlayerGUI:
             command=self._on_loop_toggle,
             takefocus=False,
         )
-        self._loop_check.pack(side=tk.LEFT)
+        self._loop_check.pack(side=tk.LEFT, padx=(0, 10))
+
+        # Subfolders checkbox (recursive scan, per folder)
+        self._subfolders_var = tk.BooleanVar(value=False)
+        self._subfolders_check = ttk.Checkbutton(
+            mode_frame,
+            text="Subfolders",
+            variable=self._subfolders_var,
+            command=self._on_subfolders_toggle,
+            takefocus=False,
+        )
+        self._subfolders_check.pack(side=tk.LEFT)
 
         # Search bar (right side of mode_frame)
         # Clear checkbox - clicking clears search and re-checks itself
@@ -296,6 +396,17 @@ class SongFolderPlayerGUI:
         )
         self._search_entry.pack(side=tk.RIGHT, padx=(10, 0))
 
+        # Fuzzy search toggle (ranked, multi-token, accent-insensitive)
+        self._fuzzy_var = tk.BooleanVar(value=self.state.fuzzy_search)
+        self._fuzzy_check = ttk.Checkbutton(
+            mode_frame,
+            text="Fuzzy",
+            variable=self._fuzzy_var,
+            command=self._on_fuzzy_toggle,
+            takefocus=False,
+        )
+        self._fuzzy_check.pack(side=tk.RIGHT, padx=(10, 0))
+
         # Playlist listbox with scrollbar
         list_frame = ttk.Frame(main_frame)
         list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
@@ -303,10 +414,9 @@ class SongFolderPlayerGUI:
         self._scrollbar = ttk.Scrollbar(list_frame)
         self._scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        self._playlist_listbox = tk.Listbox(
+        self._playlist_listbox = VirtualListbox(
             list_frame,
             yscrollcommand=self._scrollbar.set,
-            selectmode=tk.SINGLE,
             font=("Consolas", 10),
             bg=DARK_BG,
             fg=DARK_FG,
@@ -340,7 +450,24 @@ class SongFolderPlayerGUI:
         self._next_btn = ttk.Button(
             control_frame, text="Next", command=self._play_next, takefocus=False
         )
-        self._next_btn.pack(side=tk.LEFT)
+        self._next_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        # Crossfade length dropdown (global)
+        self._crossfade_choices = list(CROSSFADE_CHOICES_MS)
+        if self.state.crossfade_ms not in self._crossfade_choices:
+            self._crossfade_choices.append(self.state.crossfade_ms)  # Set in the state file
+        self._crossfade_combo = ttk.Combobox(
+            control_frame,
+            values=[
+                f"Crossfade {ms / 1000:g}s" if ms else "No crossfade"
+                for ms in self._crossfade_choices
+            ],
+            state="readonly",
+            width=14,
+            takefocus=False,
+        )
+        self._crossfade_combo.current(self._crossfade_choices.index(self.state.crossfade_ms))
+        self._crossfade_combo.pack(side=tk.LEFT)
 
         # Volume slider (on the right)
         self._volume_var = tk.IntVar(value=100)
@@ -401,6 +528,13 @@ class SongFolderPlayerGUI:
         self._playlist_listbox.bind("<Double-1>", lambda e: self._play_selected())
         self._playlist_listbox.bind("<Return>", lambda e: self._play_selected())
         self._recent_combo.bind("<<ComboboxSelected>>", self._on_recent_selected)
+        self._strategy_combo.bind("<<ComboboxSelected>>", self._on_strategy_selected)
+        self._crossfade_combo.bind("<<ComboboxSelected>>", self._on_crossfade_selected)
+        # Window state sets the progress refresh rate
+        self.root.bind("<Map>", self._on_window_map, add="+")
+        self.root.bind("<Unmap>", self._on_window_unmap, add="+")
+        self.root.bind("<FocusIn>", self._on_window_focus, add="+")
+        self.root.bind("<FocusOut>", self._on_window_focus, add="+")
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Global keyboard shortcuts
@@ -458,79 +592,330 @@ class SongFolderPlayerGUI:
             self._load_folder(folder)
 
     def _load_folder(self, folder_path: str) -> None:
-        """Load a folder and its media files.
+        """Start loading a folder and its media files in the background.
+
+        Scanning runs on a worker thread so the window stays responsive on
+        large or slow folders; _finish_load_folder completes the load on the
+        main thread. Picking another folder mid-scan cancels this one.
 
         Args:
             folder_path: Path to the folder to load.
         """
+        if self._load_cancel is not None:
+            self._load_cancel.set()
+        if self._media_scanner is not None:
+            self._media_scanner.cancel()  # Frees the parse workers for the new folder
+        # Sync the outgoing folder now: a pending save runs after the playlist
+        # has moved on to the new folder's state.
+        if self._engine.sync_state():
+            self._save_state()
+        cancel = threading.Event()
+        self._load_cancel = cancel
+        self._load_generation += 1
+        generation = self._load_generation
+
+        folder = str(Path(folder_path).resolve())
+        root = Path(folder)
+        recursive = self.state.get_playlist_state(folder).include_subfolders
+        self._start_scan_progress(folder)
+
+        def _scan() -> None:
+            # Whatever happens, the Tk thread hears back (unless a newer load
+            # superseded this one), so the progress indicator always stops.
+            try:
+                files = scan_folder_cached(
+                    root,
+                    recursive=recursive,
+                    on_batch=lambda batch: self._queue_scan_batch(generation, batch),
+                    cancel=cancel,
+                )
+            except Exception:
+                logger.exception("folder scan failed: %s", folder)
+                if not cancel.is_set():
+                    self.root.after(0, lambda: self._fail_load_folder(generation, folder))
+                return
+            if not cancel.is_set():
+                self.root.after(0, lambda: self._finish_load_folder(generation, folder, files))
+
+        threading.Thread(target=_scan, daemon=True).start()
+
+    def _start_scan_progress(self, folder: str) -> None:
+        """Show the scan progress indicator and an empty playlist preview.
+
+        Args:
+            folder: Folder being scanned.
+        """
+        self._scanning = True
+        self._scan_folder = Path(folder)
+        self._scan_file_count = 0
+        self._scan_preview = []
+        self._filtered_indices = []
+        self._playlist_listbox.set_rows(0, self._scan_preview.__getitem__)
+        self._folder_label.config(text=f"Scanning: {folder}")
+        self._scan_progress.pack(fill=tk.X, pady=(0, 10), after=self._folder_label)
+        self._scan_progress.start(15)
+
+    def _stop_scan_progress(self) -> None:
+        """Hide the scan progress indicator."""
+        self._scanning = False
+        self._scan_preview = []  # The loaded playlist replaces the preview rows
+        self._scan_progress.stop()
+        self._scan_progress.pack_forget()
+
+    def _queue_scan_batch(self, generation: int, batch: list[Path]) -> None:
+        """Queue files found by the scan worker for display.
+
+        Called on the scan worker thread. Batches are flushed to the listbox at
+        most every 100ms so a fast scan cannot flood the Tk event queue.
+
+        Args:
+            generation: Load generation the batch belongs to.
+            batch: Files from one scanned directory.
+        """
+        with self._scan_batches_lock:
+            self._scan_batches.append((generation, batch))
+            if self._scan_flush_scheduled:
+                return
+            self._scan_flush_scheduled = True
+        self.root.after(100, self._flush_scan_batches)
+
+    def _flush_scan_batches(self) -> None:
+        """Append queued scan results to the playlist preview (main thread)."""
+        with self._scan_batches_lock:
+            batches = self._scan_batches
+            self._scan_batches = []
+            self._scan_flush_scheduled = False
+
+        if not self._scanning or self._scan_folder is None:
+            return
+        root = self._scan_folder
+        items: list[str] = []
+        for generation, batch in batches:
+            if generation != self._load_generation:
+                continue
+            items.extend(f"   {f.relative_to(root).as_posix()}" for f in batch)
+        if items:
+            self._scan_file_count += len(items)
+            self._scan_preview.extend(items)
+            self._playlist_listbox.set_rows(len(self._scan_preview), self._scan_preview.__getitem__)
+            self._folder_label.config(
+                text=f"Scanning: {root} ({self._scan_file_count} files)"
+            )
+
+    def _fail_load_folder(self, generation: int, folder: str) -> None:
+        """End a background folder load whose scan failed (main thread).
+
+        The previously loaded playlist, if any, stays loaded and is shown again.
+
+        Args:
+            generation: Load generation the scan was started with.
+            folder: Resolved folder path.
+        """
+        if generation != self._load_generation:
+            return
+        self._load_cancel = None
+        self._stop_scan_progress()
+        self._update_playlist_display()
+        self._folder_label.config(text=f"Could not read folder: {folder}")
+
+    def _finish_load_folder(self, generation: int, folder: str, files: list[Path]) -> None:
+        """Complete a background folder load on the main thread.
+
+        Args:
+            generation: Load generation the scan was started with; stale
+                results (another folder was picked meanwhile) are ignored.
+            folder: Resolved folder path.
+            files: Media files found by the scan, naturally sorted.
+        """
+        if generation != self._load_generation:
+            return
+        self._load_cancel = None
+        self._stop_scan_progress()
+
         self._loading = True
         try:
-            self._current_folder = str(Path(folder_path).resolve())
-            files = scan_folder(self._current_folder)
+            self._current_folder = folder
+            playlist_state = self.state.get_playlist_state(self._current_folder)
 
             self.state.add_recent_folder(self._current_folder)
-            playlist_state = self.state.get_playlist_state(self._current_folder)
-            self._playlist.load(files, playlist_state)
+            # The old folder kept playing during the scan; sync it once more
+            # right before the controller moves to the new folder's state.
+            self._engine.sync_state()
+            self._save_state()
+            self._playlist.load(files, playlist_state, root=Path(folder))
+            self._search_index = SearchIndex(self._playlist.track_names)
+            self._durations = array("i", [-1]) * len(self._playlist.track_names)
+            self._durations_total_ms = 0
+            self._durations_known = 0
 
-            self._folder_label.config(text=f"Folder: {self._current_folder}")
+            self._folder_label.config(text=self._folder_label_text())
             self._update_recent_combo()
 
             # Sync UI toggles to restored state (without triggering callbacks)
             self._shuffle_var.set(self._playlist.shuffle_enabled)
             self._loop_var.set(self._playlist.loop_enabled)
+            self._subfolders_var.set(playlist_state.include_subfolders)
             self._reshuffle_btn.config(
                 state=tk.NORMAL if self._playlist.shuffle_enabled else tk.DISABLED
             )
+            strategy = self._playlist.shuffle_strategy
+            if strategy in self._strategy_names:
+                self._strategy_combo.current(self._strategy_names.index(strategy))
         finally:
             self._loading = False
 
         logger.debug("loaded folder: %s (%d files)", self._current_folder, len(files))
         self._update_playlist_display()
         self._save_state()
+        self._start_media_scan()
 
         if self._player is not None:
             self._player.stop()
-            self._load_current_track_paused()
+            self._engine.load_current_paused()
 
         self._playlist_listbox.focus_set()
 
+    def _start_media_scan(self) -> None:
+        """Read durations and tags of the loaded folder's tracks in the background."""
+        if self._media_scanner is None or self._current_folder is None:
+            return
+        generation = self._load_generation
+        self._media_scanner.scan(
+            Path(self._current_folder),
+            self._playlist.files,
+            self._playlist.track_names,
+            lambda index, info: self._queue_media_info(generation, index, info),
+        )
+
+    def _queue_media_info(self, generation: int, index: int, info: MediaInfo) -> None:
+        """Queue a parsed track's info for display.
+
+        Called on media scanner worker threads; flushed at most every 250ms.
+
+        Args:
+            generation: Load generation the scan belongs to.
+            index: File index of the track.
+            info: The track's info.
+        """
+        with self._info_batches_lock:
+            self._info_batches.append((generation, index, info))
+            if self._info_flush_scheduled:
+                return
+            self._info_flush_scheduled = True
+        self.root.after(250, self._flush_media_info)
+
+    def _flush_media_info(self) -> None:
+        """Apply queued track info: durations, totals and search metadata (main thread)."""
+        with self._info_batches_lock:
+            batches = self._info_batches
+            self._info_batches = []
+            self._info_flush_scheduled = False
+
+        changed = False
+        for generation, index, info in batches:
+            if generation != self._load_generation or index >= len(self._durations):
+                continue
+            previous = self._durations[index]
+            if previous >= 0:
+                self._durations_total_ms -= previous
+                self._durations_known -= 1
+            if info.duration_ms >= 0:
+                self._durations_total_ms += info.duration_ms
+                self._durations_known += 1
+            self._durations[index] = info.duration_ms
+            if info.search_text:
+                self._search_index.set_metadata(index, info.search_text)
+            changed = True
+        if changed:
+            self._playlist_listbox.refresh()
+            self._folder_label.config(text=self._folder_label_text())
+
+    def _folder_label_text(self) -> str:
+        """Folder label with track count and total time (once durations are known)."""
+        text = f"Folder: {self._current_folder}"
+        if not self._durations_known:
+            return text
+        total = self._format_time(self._durations_total_ms)
+        if self._durations_known < len(self._durations):
+            total += " so far"
+        return f"{text}  ({len(self._durations)} tracks, {total})"
+
     def _update_playlist_display(self) -> None:
-        """Update the playlist listbox with optional search filtering."""
-        self._playlist_listbox.delete(0, tk.END)
-        self._filtered_indices.clear()
+        """Update the playlist listbox with optional search filtering.
+
+        Row text is produced lazily by _row_text, so only the rows in view are
+        ever formatted; without a search filter this is O(1) in playlist size.
+        """
+        if self._scanning:
+            return  # Listbox shows the scan preview until the load finishes
 
-        files = self._playlist.files
-        if not files:
+        if not self._playlist.files:
+            self._filtered_indices = []
+            self._display_order = []
+            self._playlist_listbox.set_rows(0, self._row_text)
             return
 
-        search_term = self._search_var.get().lower().strip()
-        display_order = self._playlist.display_order
+        search_term = self._search_var.get().strip()
+        self._display_order = display_order = self._playlist.display_order
         current_display_idx = self._playlist.current_display_index
 
-        items: list[str] = []
-        filtered_current_pos: int | None = None
-        for pos, file_index in enumerate(display_order):
-            if 0 <= file_index < len(files):
-                file = files[file_index]
+        self._filtered_rows = None
+        if search_term and self._fuzzy_var.get():
+            # Ranked: rows follow match quality, not display order
+            matches = self._search_index.fuzzy_query(search_term)
+            self._filtered_indices = self._playlist.display_positions_of_ranked(matches)
+            self._filtered_rows = {pos: row for row, pos in enumerate(self._filtered_indices)}
+        elif search_term:
+            matches = self._search_index.query(search_term)
+            self._filtered_indices = self._playlist.display_positions_of(matches)
+        else:
+            self._filtered_indices = range(len(display_order))
+        filtered_current_pos = self._filtered_row_of(current_display_idx)
 
-                if search_term and search_term not in file.name.lower():
-                    continue
+        self._playlist_listbox.set_rows(len(self._filtered_indices), self._row_text)
+        self._apply_list_cursor(filtered_current_pos)
 
-                filtered_pos = len(self._filtered_indices)
-                self._filtered_indices.append(pos)
+    def _update_current_marker(self) -> None:
+        """Move the ">>" marker and highlight after a track change.
 
-                prefix = ">> " if pos == current_display_idx else "   "
-                items.append(f"{prefix}{file.name}")
+        Row membership and order are unchanged by a track change, so only the
+        rows in view are redrawn (O(1) in playlist size, O(log n) with a search
+        filter) instead of rebuilding the whole list.
+        """
+        if self._scanning:
+            return
+        self._playlist_listbox.refresh()
+        self._apply_list_cursor(self._filtered_row_of(self._playlist.current_display_index))
 
-                if pos == current_display_idx:
-                    filtered_current_pos = filtered_pos
+    def _filtered_row_of(self, display_pos: int) -> int | None:
+        """Listbox row showing a display position, or None if filtered out.
 
-        if items:
-            self._playlist_listbox.insert(tk.END, *items)
+        Args:
+            display_pos: Position in the display order.
+
+        Returns:
+            Row in the (possibly filtered) listbox.
+        """
+        if self._filtered_rows is not None:
+            return self._filtered_rows.get(display_pos)
+        filtered = self._filtered_indices
+        if isinstance(filtered, range):
+            return display_pos if display_pos in filtered else None
+        row = bisect.bisect_left(filtered, display_pos)
+        return row if row < len(filtered) and filtered[row] == display_pos else None
+
+    def _apply_list_cursor(self, filtered_current_pos: int | None) -> None:
+        """Set the listbox selection and active row for the current track.
+
+        Args:
+            filtered_current_pos: Row of the current track, or None if it is
+                hidden by the search filter.
+        """
+        search_term = self._search_var.get().strip()
 
         # Determine active (underline) and selection (highlight) positions
         # Selection = currently playing track, Active = navigation cursor
-        self._playlist_listbox.selection_clear(0, tk.END)
+        self._playlist_listbox.selection_clear()
 
         if search_term and self._search_select_first and self._filtered_indices:
             active_pos = 0
@@ -550,7 +935,26 @@ class SongFolderPlayerGUI:
         if active_pos is not None:
             self._playlist_listbox.activate(active_pos)
             self._playlist_listbox.see(active_pos)
-            self._playlist_listbox.xview_moveto(0)
+
+    def _row_text(self, row: int) -> str:
+        """Listbox text for a filtered row, with the ">>" current-track marker.
+
+        Args:
+            row: Row in the (possibly filtered) listbox.
+
+        Returns:
+            The row's display text.
+        """
+        pos = self._filtered_indices[row]
+        index = self._display_order[pos]
+        name = self._playlist.track_name_at(index)
+        if not name:
+            return ""
+        prefix = ">> " if pos == self._playlist.current_display_index else "   "
+        duration = self._durations[index] if index < len(self._durations) else -1
+        if duration >= 0:
+            return f"{prefix}{name}  ({self._format_time(duration)})"
+        return f"{prefix}{name}"
 
     def _on_shuffle_toggle(self) -> None:
         """Handle shuffle checkbox toggle."""
@@ -566,6 +970,7 @@ class SongFolderPlayerGUI:
 
         self._update_playlist_display()
         self._save_state()
+        self._preload_next()
 
     def _on_reshuffle(self) -> None:
         """Handle reshuffle button click."""
@@ -575,6 +980,29 @@ class SongFolderPlayerGUI:
         self._playlist.reshuffle()
         self._update_playlist_display()
         self._save_state()
+        self._preload_next()
+
+    def _on_strategy_selected(self, event: tk.Event) -> None:
+        """Handle a shuffle strategy pick: store it and reshuffle if shuffling."""
+        selection = self._strategy_combo.current()
+        if not self._playlist.is_loaded or not 0 <= selection < len(self._strategy_names):
+            return
+        self._playlist.shuffle_strategy = self._strategy_names[selection]
+        if self._shuffle_var.get():
+            self._playlist.reshuffle()
+            self._update_playlist_display()
+            self._preload_next()
+        self._save_state()
+
+    def _on_crossfade_selected(self, event: tk.Event) -> None:
+        """Handle a crossfade length pick."""
+        selection = self._crossfade_combo.current()
+        if not 0 <= selection < len(self._crossfade_choices):
+            return
+        self.state.crossfade_ms = self._crossfade_choices[selection]
+        if self._player is not None:
+            self._player.set_crossfade(self.state.crossfade_ms, self.state.crossfade_curve)
+        self._save_state()
 
     def _on_loop_toggle(self) -> None:
         """Handle loop checkbox toggle."""
@@ -583,6 +1011,16 @@ class SongFolderPlayerGUI:
         if self._playlist.is_loaded:
             self._playlist.loop_enabled = self._loop_var.get()
             self._save_state()
+            self._preload_next()
+
+    def _on_subfolders_toggle(self) -> None:
+        """Handle subfolders checkbox toggle by rescanning the current folder."""
+        if self._loading or self._current_folder is None:
+            return
+        self._playlist.sync_to_state()
+        playlist_state = self.state.get_playlist_state(self._current_folder)
+        playlist_state.include_subfolders = self._subfolders_var.get()
+        self._load_folder(self._current_folder)
 
     def _on_search_change(self, *args: object) -> None:
         """Handle search entry text change.
@@ -593,14 +1031,34 @@ class SongFolderPlayerGUI:
         search_term = self._search_var.get().strip()
 
         if search_term and self._pre_search_active_pos is None:
-            try:
-                self._pre_search_active_pos = self._playlist_listbox.index(tk.ACTIVE)
-            except tk.TclError:
-                self._pre_search_active_pos = 0
+            active = self._playlist_listbox.active_index()
+            self._pre_search_active_pos = active if active is not None else 0
         elif not search_term:
             self._pre_search_active_pos = None
 
         self._search_select_first = bool(search_term)
+
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        if search_term and len(self._playlist.files) >= SEARCH_DEBOUNCE_MIN_TRACKS:
+            self._search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self._flush_search)
+        else:
+            self._update_playlist_display()
+
+    def _on_fuzzy_toggle(self) -> None:
+        """Handle fuzzy search checkbox toggle."""
+        self.state.fuzzy_search = self._fuzzy_var.get()
+        if self._search_var.get().strip():
+            self._update_playlist_display()
+        self._save_state()
+
+    def _flush_search(self) -> None:
+        """Apply a pending debounced search now (no-op if none is pending)."""
+        if self._search_after_id is None:
+            return
+        self.root.after_cancel(self._search_after_id)
+        self._search_after_id = None
         self._update_playlist_display()
 
     def _clear_search(self) -> None:
@@ -636,6 +1094,7 @@ class SongFolderPlayerGUI:
         Returns:
             "break" to prevent default handling.
         """
+        self._flush_search()
         if self._filtered_indices:
             self._playlist_listbox.focus_set()
             self._playlist_listbox.activate(0)
@@ -674,7 +1133,9 @@ class SongFolderPlayerGUI:
         self._volume_var.set(volume)
         if self._player is not None:
             self._player.set_volume(volume)
-        self.state.volume = volume
+        if volume != self.state.volume:
+            self.state.volume = volume
+            self._save_state()
         self._volume_level_label.config(text=str(volume))
 
     def _on_volume_change(self, value: str) -> None:
@@ -721,12 +1182,14 @@ class SongFolderPlayerGUI:
 
     def _apply_zoom(self) -> None:
         """Apply current zoom level to all fonts."""
-        self.state.zoom_level = self._zoom_level
+        if self._zoom_level != self.state.zoom_level:
+            self.state.zoom_level = self._zoom_level
+            self._save_state()
 
         playlist_size = int(self._base_font_sizes["playlist"] * self._zoom_level)
         ui_size = int(self._base_font_sizes["ui"] * self._zoom_level)
 
-        self._playlist_listbox.config(font=("Consolas", playlist_size))
+        self._playlist_listbox.set_font(("Consolas", playlist_size))
 
         self._style.configure("TButton", font=("TkDefaultFont", ui_size))
         self._style.configure("TLabel", font=("TkDefaultFont", ui_size))
@@ -801,9 +1264,8 @@ class SongFolderPlayerGUI:
         if not self._playlist.files:
             return
 
-        try:
-            filtered_pos = self._playlist_listbox.index(tk.ACTIVE)
-        except tk.TclError:
+        filtered_pos = self._playlist_listbox.active_index()
+        if filtered_pos is None:
             return
 
         if filtered_pos < len(self._filtered_indices):
@@ -815,74 +1277,40 @@ class SongFolderPlayerGUI:
         Args:
             display_pos: Position in the displayed list.
         """
-        if self._player is None or not self._playlist.is_loaded:
-            return
+        self._engine.play_at(display_pos)
+
+    def _on_track_change(self, file_path: Path | None) -> None:
+        """Show the track the engine started or loaded (None: playback stopped).
 
-        file_path = self._playlist.file_at(display_pos)
+        Args:
+            file_path: The new current track, or None.
+        """
         if file_path is None:
+            self._now_playing_label.config(text="")
             return
-
-        self._playlist.go_to(display_pos)
-        self._save_state()
-
-        logger.debug("playing: %s", file_path.name)
-        self._player.play(file_path)
-        self._update_playlist_display()
-        self._now_playing_label.config(text=f"Now playing: {file_path.name}")
+        self._update_current_marker()
+        self._now_playing_label.config(
+            text=f"Now playing: {self._playlist.track_name(file_path)}"
+        )
 
     def _stop(self) -> None:
         """Stop playback."""
-        if self._player is None:
-            return
-        self._player.stop()
-        self._now_playing_label.config(text="")
+        self._engine.stop()
 
-    def _load_current_track_paused(self) -> None:
-        """Load the current track into VLC but start paused.
+    def _preload_next(self) -> None:
+        """Preload the track that plays next, so it starts without a gap.
 
-        Used on folder load so keyboard shortcuts work immediately.
-        Restores the saved playback position if available.
+        Called whenever the current track or the order after it changes.
         """
-        if self._player is None or not self._playlist.is_loaded:
-            return
-
-        file_path = self._playlist.file_at(self._playlist.current_display_index)
-        if file_path is None:
-            return
-
-        # Pause fires in the MediaPlayerPlaying callback before VLC's audio
-        # buffer drains to the audio device — no audible blip.
-        self._player.play_paused(file_path)
-        self._now_playing_label.config(text=f"Now playing: {file_path.name}")
-
-        saved_position = self._playlist.playback_position_ms
-        if saved_position > 0:
-            self.root.after(200, lambda: self._player and self._player.set_time(saved_position))
+        self._engine.preload_next()
 
     def _play_next(self) -> None:
         """Play the next track."""
-        if not self._playlist.is_loaded:
-            return
-
-        next_pos = self._playlist.advance()
-        if next_pos is None:
-            self._stop()
-        else:
-            self._play_at_display_position(next_pos)
+        self._engine.play_next()
 
     def _play_previous(self) -> None:
         """Play the previous track."""
-        if not self._playlist.is_loaded:
-            return
-
-        self._play_at_display_position(self._playlist.retreat())
-
-    def _on_track_end(self) -> None:
-        """Handle track end event from VLC.
-
-        Note: This is called from a VLC thread, so we schedule on main thread.
-        """
-        self.root.after(0, self._play_next)
+        self._engine.play_previous()
 
     def _on_space_press(self, event: tk.Event) -> str | None:
         """Handle space key press globally.
@@ -1034,62 +1462,128 @@ class SongFolderPlayerGUI:
         else:
             return f"{minutes}:{seconds:02d}"
 
-    def _update_progress(self) -> None:
-        """Update the progress bar and time label."""
+    def _progress_delay_ms(self) -> int:
+        """How long progress events may wait to be drawn (read on VLC threads)."""
+        if not self._window_visible:
+            return PROGRESS_HIDDEN_INTERVAL_MS
+        return PROGRESS_INTERVAL_MS if self._window_focused else PROGRESS_UNFOCUSED_INTERVAL_MS
+
+    def _on_player_progress(self, time_ms: int, length_ms: int, playing: bool) -> None:
+        """Show playback progress (latest of a batch of VLC events).
+
+        Args:
+            time_ms: Playback position, or -1 if unknown.
+            length_ms: Track length, or -1 if unknown.
+            playing: Whether the track is playing (unused; paused tracks
+                send no further updates).
+        """
         try:
-            if self._player and self._player.get_current_file():
-                current_ms = self._player.get_time()
-                length_ms = self._player.get_length()
-
-                if current_ms >= 0 and length_ms > 0:
-                    if not self._seeking:
-                        position = current_ms / length_ms
-                        self._progress_var.set(position)
-                    current_str = self._format_time(current_ms)
-                    total_str = self._format_time(length_ms)
-                    self._time_label.config(text=f"{current_str} / {total_str}")
-                else:
-                    if not self._seeking:
-                        self._progress_var.set(0.0)
-                    self._time_label.config(text="0:00 / 0:00")
-            else:
-                if not self._seeking:
-                    self._progress_var.set(0.0)
-                self._time_label.config(text="0:00 / 0:00")
+            self._render_progress(time_ms, length_ms)
         except tk.TclError:
             logger.warning("progress update failed", exc_info=True)
 
-        self.root.after(250, self._update_progress)
+    def _render_progress(self, current_ms: int, length_ms: int) -> None:
+        """Update the progress bar and time label.
+
+        Args:
+            current_ms: Playback position, or -1 if unknown.
+            length_ms: Track length, or -1 if unknown.
+        """
+        if current_ms >= 0 and length_ms > 0:
+            if not self._seeking:
+                self._progress_var.set(current_ms / length_ms)
+            text = f"{self._format_time(current_ms)} / {self._format_time(length_ms)}"
+        else:
+            if not self._seeking:
+                self._progress_var.set(0.0)
+            text = "0:00 / 0:00"
+        if text != self._time_text:
+            self._time_text = text
+            self._time_label.config(text=text)
+
+    def _on_window_map(self, event: tk.Event) -> None:
+        """Handle the window being restored: catch up on progress."""
+        if event.widget is not self.root:
+            return
+        self._window_visible = True
+        self._player_events.drain()  # Catch up without waiting for the slow timer
+
+    def _on_window_unmap(self, event: tk.Event) -> None:
+        """Handle the window being minimized: stop progress updates."""
+        if event.widget is self.root:
+            self._window_visible = False
+
+    def _on_window_focus(self, event: tk.Event) -> None:
+        """Track whether the application has focus (sets the progress refresh rate).
+
+        Focus also moves between widgets inside the window, so the check
+        runs once the move has settled.
+        """
+        self.root.after_idle(self._refresh_window_focus)
+
+    def _refresh_window_focus(self) -> None:
+        """Record whether any of this application's widgets has focus."""
+        try:
+            self._window_focused = self.root.focus_get() is not None
+        except (KeyError, tk.TclError):
+            # focus_get() fails on some internal widgets (e.g. combobox popdowns)
+            self._window_focused = True
 
     def _save_state(self) -> None:
-        """Save current state to disk."""
+        """Mark state as changed; the save scheduler batches the disk write."""
+        self._save_scheduler.mark_dirty()
+        self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        """Arm the save timer for the scheduler's next due time, if needed."""
+        if self._save_after_id is not None:
+            return  # Timer pending; it re-arms itself after polling
+        due = self._save_scheduler.due_in()
+        if due is not None:
+            self._save_after_id = self.root.after(int(due * 1000), self._on_save_timer)
+
+    def _on_save_timer(self) -> None:
+        """Write state if due, then re-arm for any remaining changes."""
+        self._save_after_id = None
+        try:
+            self._save_scheduler.poll()
+        except OSError:
+            logger.warning("state save failed", exc_info=True)
+        self._schedule_save()
+
+    def _write_state(self) -> None:
+        """Write current state to disk (called by the save scheduler)."""
         self._playlist.sync_to_state()
         if self._on_state_change:
             self._on_state_change()
 
+    def _capture_position(self) -> None:
+        """Copy the player's position into playlist state, marking it dirty if it moved."""
+        if self._engine.capture_position():
+            self._save_state()
+
     def _periodic_save(self) -> None:
-        """Periodically save playback position and volume to state."""
+        """Periodically record playback position; writes only happen if it moved."""
         try:
-            if self._player and self._playlist.is_loaded and self._player.get_current_file():
-                current_ms = self._player.get_time()
-                if current_ms >= 0:
-                    self._playlist.playback_position_ms = current_ms
-
-            self._save_state()
-        except (OSError, tk.TclError):
+            self._capture_position()
+        except tk.TclError:
             logger.warning("periodic save failed", exc_info=True)
 
         self.root.after(5000, self._periodic_save)
 
     def _on_close(self) -> None:
         """Handle window close event."""
+        if self._media_scanner is not None:
+            # The parser's VLC instance is left to process exit: a worker may
+            # still be inside parse().
+            self._media_scanner.close()
         if self._player:
-            if self._playlist.is_loaded and self._player.get_current_file():
-                current_ms = self._player.get_time()
-                if current_ms >= 0:
-                    self._playlist.playback_position_ms = current_ms
+            self._capture_position()
             self._player.release()
-        self._save_state()
+        try:
+            self._save_scheduler.flush()
+        except OSError:
+            logger.error("final state save failed", exc_info=True)
         self.root.destroy()
 
     def run(self) -> None:
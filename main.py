@@ -6,7 +6,7 @@ import logging
 import tkinter as tk
 
 from .gui import SongFolderPlayerGUI, add_readonly_indicator
-from .state import APP_DIR, LOG_FILE, acquire_lock, load_state, release_lock, save_state
+from .state import APP_DIR, LOG_FILE, acquire_lock, release_lock, select_backend
 
 
 class _JSONFormatter(logging.Formatter):
@@ -55,21 +55,24 @@ def main() -> None:
     logging.getLogger(__name__).info("starting")
     _print_banner()
 
-    # Load saved state
-    state = load_state()
+    # Try to acquire the instance lock before touching state: only the
+    # primary instance may write (or migrate) the state store.
+    lock_handle = acquire_lock()
+    if lock_handle is not None:
+        atexit.register(release_lock, lock_handle)  # Runs after backend.close
+
+    # Load saved state (JSON files, or SQLite if SONG_FOLDER_PLAYER_STATE=sqlite)
+    backend = select_backend(read_only=lock_handle is None)
+    atexit.register(backend.close)
+    state = backend.load()
 
     # Create main window
     root = tk.Tk()
 
-    # Try to acquire the instance lock
-    lock_handle = acquire_lock()
-
     if lock_handle is not None:
         # Primary instance — save state normally
-        atexit.register(release_lock, lock_handle)
-
         def on_state_change() -> None:
-            save_state(state)
+            backend.save(state)
     else:
         # Read-only instance — no-op save
         def on_state_change() -> None:
@@ -0,0 +1,90 @@
+"""Bounded LRU cache of player media objects, keyed by file path."""
+
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEDIA_CACHE_SIZE = 32
+
+M = TypeVar("M")
+
+
+class MediaCache(Generic[M]):
+    """Keeps the media objects of recently played files for reuse.
+
+    A hit returns the object created for that path before, so looping a
+    short playlist or going back and forth between tracks does not create
+    (and re-parse) a new media each time. The cache owns one reference to
+    each object: release() is called when an entry is evicted (least
+    recently used first, once more than capacity paths are held) or the
+    cache is cleared. A player that still has an evicted media set keeps
+    its own reference (libvlc refcounts media), so eviction is always safe.
+
+    Not thread-safe; VLCPlayer only uses it under its lock.
+    """
+
+    def __init__(
+        self,
+        create: Callable[[Path], M],
+        release: Callable[[M], None],
+        capacity: int = DEFAULT_MEDIA_CACHE_SIZE,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            create: Makes the media object for a path (e.g. Instance.media_new).
+            release: Drops the cache's reference to a media object.
+            capacity: Most media objects held at once (at least 1).
+        """
+        self._create = create
+        self._release = release
+        self._capacity = max(1, capacity)
+        self._entries: OrderedDict[Path, M] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: Path) -> M:
+        """Media for a path, created on a miss.
+
+        Args:
+            path: File the media plays.
+
+        Returns:
+            The cached or newly created media object.
+        """
+        media = self._entries.get(path)
+        if media is not None:
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return media
+        self.misses += 1
+        media = self._create(path)
+        self._entries[path] = media
+        while len(self._entries) > self._capacity:
+            _path, evicted = self._entries.popitem(last=False)
+            self.evictions += 1
+            self._release_quietly(evicted)
+        return media
+
+    def clear(self) -> None:
+        """Release every cached media object."""
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for media in entries:
+            self._release_quietly(media)
+
+    def _release_quietly(self, media: M) -> None:
+        try:
+            self._release(media)
+        except Exception:
+            logger.warning("failed to release media", exc_info=True)
+
+    def __contains__(self, path: Path) -> bool:
+        return path in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,277 @@
+"""Track durations and tag metadata, parsed in the background and cached per folder."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from .state import APP_DIR
+
+logger = logging.getLogger(__name__)
+
+MEDIA_INFO_DIR = APP_DIR / "media_info"
+MEDIA_INFO_VERSION = 1
+DEFAULT_PARSE_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """What parsing a media file tells us without playing it."""
+
+    duration_ms: int  # -1 if unknown
+    title: str = ""
+    artist: str = ""
+    album: str = ""
+
+    @property
+    def search_text(self) -> str:
+        """Tag fields joined for SearchIndex.set_metadata."""
+        return " ".join(field for field in (self.artist, self.album, self.title) if field)
+
+
+# Parses one file; None if it could not be parsed.
+ParseFunc = Callable[[Path], "MediaInfo | None"]
+
+
+def _cache_file(folder: Path) -> Path:
+    """Cache file location for a folder."""
+    digest = hashlib.sha1(str(folder).encode("utf-8")).hexdigest()
+    return MEDIA_INFO_DIR / f"{digest}.json"
+
+
+class MediaInfoCache:
+    """Parsed MediaInfo for one folder's tracks, keyed by track name.
+
+    An entry is trusted while the file's size and mtime are unchanged.
+    Safe to use from several worker threads.
+    """
+
+    def __init__(self, folder: Path) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            folder: Folder the track names are relative to.
+        """
+        self.folder = folder
+        # name -> (size, mtime_ns, info)
+        self._entries: dict[str, tuple[int, int, MediaInfo]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, folder: Path) -> "MediaInfoCache":
+        """Read a folder's cache from disk (empty if absent or unusable)."""
+        cache = cls(folder)
+        path = _cache_file(folder)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MEDIA_INFO_VERSION or data.get("folder") != str(folder):
+                return cache
+            for name, (size, mtime_ns, duration_ms, title, artist, album) in data["tracks"].items():
+                cache._entries[name] = (size, mtime_ns, MediaInfo(duration_ms, title, artist, album))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("media info cache unreadable, reparsing: %s", path, exc_info=True)
+            cache._entries.clear()
+        return cache
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, name: str, size: int, mtime_ns: int) -> MediaInfo | None:
+        """Cached info for a track, if the file is unchanged since it was parsed."""
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != size or entry[1] != mtime_ns:
+            return None
+        return entry[2]
+
+    def put(self, name: str, size: int, mtime_ns: int, info: MediaInfo) -> None:
+        """Store parsed info for a track."""
+        with self._lock:
+            self._entries[name] = (size, mtime_ns, info)
+            self._dirty = True
+
+    def save(self, keep: Sequence[str] | None = None) -> None:
+        """Write the cache atomically if it changed; failures are only logged.
+
+        Args:
+            keep: If given, entries for other names (deleted files) are dropped.
+        """
+        with self._lock:
+            if keep is not None:
+                wanted = set(keep)
+                stale = [name for name in self._entries if name not in wanted]
+                for name in stale:
+                    del self._entries[name]
+                self._dirty = self._dirty or bool(stale)
+            if not self._dirty:
+                return
+            data = {
+                "version": MEDIA_INFO_VERSION,
+                "folder": str(self.folder),
+                "tracks": {
+                    name: [size, mtime_ns, info.duration_ms, info.title, info.artist, info.album]
+                    for name, (size, mtime_ns, info) in self._entries.items()
+                },
+            }
+            self._dirty = False
+        _write_atomic(_cache_file(self.folder), data)
+
+
+def _write_atomic(path: Path, data: dict[str, Any]) -> None:
+    """Write JSON via a temp file and rename; failures are only logged."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix="info_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+    except OSError:
+        logger.warning("failed to save media info cache: %s", path, exc_info=True)
+
+
+class _ScanJob:
+    """One folder's parse run, shared by the pool workers that drain it."""
+
+    def __init__(
+        self,
+        folder: Path,
+        files: Sequence[Path],
+        names: Sequence[str],
+        on_info: Callable[[int, MediaInfo], None],
+        on_done: Callable[[], None] | None,
+        workers: int,
+    ) -> None:
+        self.folder = folder
+        self.files = files
+        self.names = names
+        self.on_info = on_info
+        self.on_done = on_done
+        self.cancel = threading.Event()
+        self.cache: MediaInfoCache | None = None
+        self._next = 0
+        self._running = workers
+        self._lock = threading.Lock()
+
+    def _claim(self) -> int | None:
+        """Next file index to process, or None when done or cancelled."""
+        with self._lock:
+            if self.cache is None:
+                self.cache = MediaInfoCache.load(self.folder)
+            if self.cancel.is_set() or self._next >= len(self.files):
+                return None
+            index = self._next
+            self._next += 1
+            return index
+
+    def work(self, parse: ParseFunc) -> None:
+        """Process files until none are left (one pool worker)."""
+        try:
+            while (index := self._claim()) is not None:
+                self._process(index, parse)
+        finally:
+            with self._lock:
+                self._running -= 1
+                last = self._running == 0
+            if last and self.cache is not None:
+                if self.cancel.is_set():
+                    # Keep what was parsed so far, but only a full scan knows
+                    # which names are gone, so nothing is pruned.
+                    self.cache.save()
+                else:
+                    self.cache.save(keep=self.names)
+                    if self.on_done is not None:
+                        self.on_done()
+
+    def _process(self, index: int, parse: ParseFunc) -> None:
+        """Look up or parse one file and report it."""
+        assert self.cache is not None
+        name = self.names[index]
+        path = self.files[index]
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        info = self.cache.get(name, st.st_size, st.st_mtime_ns)
+        if info is None:
+            try:
+                info = parse(path)
+            except Exception:
+                logger.warning("media parse failed: %s", path, exc_info=True)
+                info = None
+            if info is None:
+                return
+            self.cache.put(name, st.st_size, st.st_mtime_ns, info)
+        if not self.cancel.is_set():
+            self.on_info(index, info)
+
+
+class MediaInfoScanner:
+    """Fills a folder's MediaInfoCache on a bounded pool of worker threads.
+
+    Each scan() claims files one at a time from a shared cursor, so at most
+    max_workers files are being parsed at once and no per-file tasks are
+    queued up front. Starting a new scan cancels the previous one; its
+    workers stop after the file they are on. Cached entries are reported
+    without parsing. The cache is saved once a scan completes.
+    """
+
+    def __init__(self, parse: ParseFunc, max_workers: int = DEFAULT_PARSE_WORKERS) -> None:
+        """Initialize the scanner.
+
+        Args:
+            parse: Reads one file's MediaInfo (called on worker threads).
+            max_workers: Number of files parsed concurrently.
+        """
+        self._parse = parse
+        self._max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="media-info")
+        self._job: _ScanJob | None = None
+
+    def scan(
+        self,
+        folder: Path,
+        files: Sequence[Path],
+        names: Sequence[str],
+        on_info: Callable[[int, MediaInfo], None],
+        on_done: Callable[[], None] | None = None,
+    ) -> None:
+        """Start reading info for a folder's tracks in the background.
+
+        Args:
+            folder: Folder the tracks were loaded from (the cache key).
+            files: Track paths (e.g. PlaylistController.files).
+            names: Track names in the same order (the cache entry keys).
+            on_info: Called on a worker thread with (file index, info) for
+                every track whose info is known.
+            on_done: Called on a worker thread once every track is processed
+                (not if the scan was cancelled).
+        """
+        self.cancel()
+        job = _ScanJob(folder, files, names, on_info, on_done, self._max_workers)
+        self._job = job
+        for _ in range(self._max_workers):
+            self._pool.submit(job.work, self._parse)
+
+    def cancel(self) -> None:
+        """Stop the running scan, if any."""
+        if self._job is not None:
+            self._job.cancel.set()
+            self._job = None
+
+    def close(self) -> None:
+        """Cancel any scan and stop the worker threads."""
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,7 +1,13 @@
 """Media file utilities for scanning and filtering files."""
 
+import functools
+import os
+import queue
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
 
 # Supported audio extensions
@@ -17,6 +23,21 @@ VIDEO_EXTENSIONS: set[str] = {
 # All supported media extensions
 MEDIA_EXTENSIONS: set[str] = AUDIO_EXTENSIONS | VIDEO_EXTENSIONS
 
+# Directory listings in flight at once during a recursive walk
+DEFAULT_WALK_WORKERS = 8
+
+# How often a walk waiting on a slow directory listing checks for cancellation
+_WALK_CANCEL_POLL_S = 0.1
+
+# Splits a name into alternating text and digit runs: text at even indices,
+# digits at odd indices (re.split with one capture group guarantees this).
+_DIGIT_RUNS = re.compile(r"(\d+)")
+
+# Natural sort keys memoized by natural_name_key
+NATURAL_KEY_CACHE_SIZE = 65536
+
+NaturalKey = tuple[int | str, ...]
+
 
 def is_media_file(path: Path) -> bool:
     """Check if a file is a supported media file.
@@ -30,7 +51,7 @@ def is_media_file(path: Path) -> bool:
     return path.suffix.lower() in MEDIA_EXTENSIONS
 
 
-def natural_sort_key(path: Path) -> list[int | str]:
+def natural_sort_key(path: Path) -> NaturalKey:
     """Generate a sort key for natural sorting of filenames.
 
     This handles numbered files correctly, e.g., "track2.mp3" comes before "track10.mp3".
@@ -39,36 +60,305 @@ def natural_sort_key(path: Path) -> list[int | str]:
         path: Path to generate sort key for.
 
     Returns:
-        List of alternating strings and integers for proper sorting.
+        Tuple of alternating strings and integers for proper sorting.
     """
-    text = path.name.lower()
-    parts: list[int | str] = []
-    for segment in re.split(r'(\d+)', text):
-        if segment.isdigit():
-            parts.append(int(segment))
-        else:
-            parts.append(segment)
-    return parts
+    return natural_name_key(path.name)
+
 
+def natural_key(text: str) -> NaturalKey:
+    """Uncached natural sort key (see natural_name_key), for bulk scans and sorts."""
+    parts: list[int | str] = _DIGIT_RUNS.split(text.lower())  # type: ignore[assignment]
+    parts[1::2] = map(int, parts[1::2])  # type: ignore[arg-type]
+    return tuple(parts)
 
-def scan_folder(folder_path: str | Path) -> list[Path]:
-    """Scan a folder for media files (top-level only).
+
+@functools.lru_cache(maxsize=NATURAL_KEY_CACHE_SIZE)
+def natural_name_key(text: str) -> NaturalKey:
+    """Generate a natural sort key for a bare name.
+
+    Keys are memoized, which pays off for names that recur across calls,
+    such as folder components in tree_sort_key. One-off bulk sorts should use
+    sort_names / natural_sorted (or natural_key directly), which bypass the
+    cache.
+
+    Args:
+        text: File or folder name.
+
+    Returns:
+        Tuple of alternating strings and integers, always starting and
+        ending with a (possibly empty) string.
+    """
+    return natural_key(text)
+
+
+def sort_names(names: Iterable[str]) -> list[str]:
+    """Sort bare names naturally in one pass.
+
+    Args:
+        names: File or folder names.
+
+    Returns:
+        New list of the names in natural order.
+    """
+    return sorted(names, key=natural_key)
+
+
+def natural_sorted(paths: Iterable[Path]) -> list[Path]:
+    """Sort paths naturally by file name in one pass.
+
+    Args:
+        paths: Paths to sort.
+
+    Returns:
+        New list of the paths in natural order of their names.
+    """
+    return sorted(paths, key=lambda path: natural_key(path.name))
+
+
+def tree_sort_key(path: Path, root: Path) -> list[NaturalKey]:
+    """Generate a natural sort key for a file below root.
+
+    Each path component is compared naturally, so "disc2/track1.mp3" sorts
+    before "disc10/track1.mp3".
+
+    Args:
+        path: File to generate the sort key for.
+        root: Folder the walk started from.
+
+    Returns:
+        One natural sort key per component of the path relative to root.
+    """
+    return [natural_name_key(part) for part in path.relative_to(root).parts]
+
+
+def _scan_directory(
+    folder: str | os.PathLike[str],
+    subdirs: list[os.DirEntry[str]] | None = None,
+) -> list[Path]:
+    """List the media files directly inside a folder using os.scandir.
+
+    DirEntry carries the file type from the directory listing itself, so no
+    per-file stat call is made (Windows and most POSIX filesystems). Paths are
+    only built for entries that pass the extension check.
+
+    Args:
+        folder: Folder to list.
+        subdirs: If given, directory entries found in the folder are appended
+            to it (symlinked directories included).
+
+    Returns:
+        Unsorted list of media file paths; empty if the folder is unreadable.
+    """
+    media_files: list[Path] = []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if subdirs is not None:
+                    try:
+                        if entry.is_dir():
+                            subdirs.append(entry)
+                            continue
+                    except OSError:
+                        continue
+                if os.path.splitext(entry.name)[1].lower() not in MEDIA_EXTENSIONS:
+                    continue
+                try:
+                    if entry.is_file():
+                        media_files.append(Path(entry.path))
+                except OSError:
+                    continue
+    except OSError:
+        return []
+    return media_files
+
+
+def scan_folder(
+    folder_path: str | Path,
+    recursive: bool = False,
+    max_depth: int | None = None,
+) -> list[Path]:
+    """Scan a folder for media files.
 
     Args:
         folder_path: Path to the folder to scan.
+        recursive: Also include media files in subfolders.
+        max_depth: With recursive, how many subfolder levels to descend
+            (None = unlimited, 0 = top-level only).
 
     Returns:
-        List of Path objects for media files, sorted naturally.
+        List of Path objects for media files, sorted naturally. Recursive
+        results are sorted component by component (see tree_sort_key).
     """
     folder = Path(folder_path)
     if not folder.is_dir():
         return []
 
-    media_files: list[Path] = []
-    for item in folder.iterdir():
-        if item.is_file() and is_media_file(item):
-            media_files.append(item)
+    if recursive:
+        media_files = [f for batch in iter_media_files(folder, max_depth) for f in batch]
+        media_files.sort(key=lambda f: tree_sort_key(f, folder))
+        return media_files
 
     # Sort files using natural sort
-    media_files.sort(key=natural_sort_key)
-    return media_files
+    return natural_sorted(_scan_directory(folder))
+
+
+def scan_folders(
+    folder_paths: Iterable[str | Path],
+    max_workers: int | None = None,
+) -> dict[Path, list[Path]]:
+    """Scan several folders concurrently (top-level only in each).
+
+    Directory listings on network shares are dominated by round-trip latency,
+    so overlapping them on a thread pool is much faster than scanning in turn.
+
+    Args:
+        folder_paths: Folders to scan.
+        max_workers: Thread pool size; None lets the executor choose.
+
+    Returns:
+        Mapping of each folder to its naturally sorted media files, in the
+        order the folders were given.
+    """
+    folders = [Path(p) for p in folder_paths]
+    if len(folders) <= 1 or max_workers == 1:
+        return {folder: scan_folder(folder) for folder in folders}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(scan_folder, folders)
+        return dict(zip(folders, results))
+
+
+# (device, inode), or the normalized real path where the filesystem has no inodes
+DirectoryId = tuple[int, int] | str
+
+# Lists one directory for walk_media_dirs: (path, its os.stat) ->
+# (media files directly inside, subdirectory paths). May raise OSError.
+DirectoryLister = Callable[[str, os.stat_result], tuple[list[Path], list[str]]]
+
+
+def _directory_id(path: str | Path, st: os.stat_result) -> DirectoryId:
+    """Identify a directory by (device, inode), following symlinks.
+
+    st must come from os.stat rather than DirEntry.stat: on Windows the
+    latter reports st_ino = st_dev = 0 for every non-symlink entry, which
+    would make all subdirectories look like one. Filesystems that report no
+    inode at all (st_ino 0, e.g. some network shares) fall back to the real
+    path.
+    """
+    if st.st_ino == 0:
+        return os.path.normcase(os.path.realpath(path))
+    return (st.st_dev, st.st_ino)
+
+
+def list_media_directory(folder: str, st: os.stat_result) -> tuple[list[Path], list[str]]:
+    """Default DirectoryLister: media files and subdirectories via _scan_directory."""
+    subdir_entries: list[os.DirEntry[str]] = []
+    files = _scan_directory(folder, subdir_entries)
+    return files, [entry.path for entry in subdir_entries]
+
+
+# (directory path, its id, media files, subdir paths, depth) for one listed directory
+_WalkResult = tuple[str, DirectoryId, list[Path], list[str], int]
+
+
+def _walk_one(folder: str, depth: int, lister: DirectoryLister) -> _WalkResult:
+    """Worker task for walk_media_dirs: identify and list one directory."""
+    st = os.stat(folder)
+    files, subdirs = lister(folder, st)
+    return folder, _directory_id(folder, st), files, subdirs, depth
+
+
+def walk_media_dirs(
+    folder_path: str | Path,
+    max_depth: int | None = None,
+    max_workers: int = DEFAULT_WALK_WORKERS,
+    cancel: threading.Event | None = None,
+    lister: DirectoryLister = list_media_directory,
+) -> Iterator[tuple[str, list[Path]]]:
+    """Walk a folder tree, yielding each directory's media files as it is listed.
+
+    Directories are listed on a bounded thread pool. Every subfolder found
+    is queued as a new task, and any idle worker picks up the next one, so
+    one deep or slow branch cannot stall the others. Symlinked (or
+    junctioned) directories are followed at most once: each worker stats its
+    directory and the walk drops any whose identity (see _directory_id) was
+    already seen, which breaks link loops.
+
+    Args:
+        folder_path: Root folder of the walk.
+        max_depth: How many subfolder levels to descend (None = unlimited,
+            0 = top-level only).
+        max_workers: Maximum directory listings in flight at once.
+        cancel: If set during the walk, pending work is dropped and the
+            generator returns early, within _WALK_CANCEL_POLL_S even while
+            a listing (e.g. on an unresponsive network share) is still
+            blocked; that listing is abandoned to its worker thread.
+        lister: Lists one directory; folder_index passes one that reuses
+            its cached listings.
+
+    Yields:
+        (directory path, unsorted media files) for every directory walked,
+        including ones without media files, in completion order.
+    """
+    visited: set[DirectoryId] = set()
+    done: queue.SimpleQueue[Future[_WalkResult]] = queue.SimpleQueue()
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="media-walk")
+    pending = 0
+
+    def submit(folder: str, depth: int) -> None:
+        nonlocal pending
+        pending += 1
+        pool.submit(_walk_one, folder, depth, lister).add_done_callback(done.put)
+
+    try:
+        submit(str(folder_path), 0)
+        while pending:
+            if cancel is not None and cancel.is_set():
+                return
+            try:
+                future = done.get(timeout=None if cancel is None else _WALK_CANCEL_POLL_S)
+            except queue.Empty:
+                continue
+            pending -= 1
+            try:
+                folder, dir_id, files, subdirs, depth = future.result()
+            except OSError:
+                continue
+            if dir_id in visited:
+                continue
+            visited.add(dir_id)
+
+            if max_depth is None or depth < max_depth:
+                for path in subdirs:
+                    submit(path, depth + 1)
+            yield folder, files
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_media_files(
+    folder_path: str | Path,
+    max_depth: int | None = None,
+    max_workers: int = DEFAULT_WALK_WORKERS,
+    cancel: threading.Event | None = None,
+) -> Iterator[list[Path]]:
+    """Walk a folder tree, yielding media files as each directory is listed.
+
+    See walk_media_dirs for how the tree is walked. Batches arrive in
+    completion order, not sorted order; callers that need the final playlist
+    order sort with tree_sort_key once the walk is done.
+
+    Args:
+        folder_path: Root folder of the walk.
+        max_depth: How many subfolder levels to descend (None = unlimited,
+            0 = top-level only).
+        max_workers: Maximum directory listings in flight at once.
+        cancel: If set during the walk, pending work is dropped and the
+            generator returns early.
+
+    Yields:
+        Non-empty, unsorted lists of media file paths, one per directory.
+    """
+    for _folder, files in walk_media_dirs(folder_path, max_depth, max_workers, cancel):
+        if files:
+            yield files
@@ -1,63 +1,411 @@
 """VLC media player wrapper."""
 
 import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable
 
 import vlc
 
+from .events import EVENT_END, EVENT_PROGRESS, PlayerEventBus
+from .fade import DEFAULT_CURVE, get_curve, run_fade
+from .media_cache import DEFAULT_MEDIA_CACHE_SIZE, MediaCache
+from .media_info import MediaInfo
+
 logger = logging.getLogger(__name__)
 
+_FADE_POLL_S = 0.25  # Fader re-check interval while no fade can be scheduled
+PARSE_TIMEOUT_MS = 5000  # Per-file limit for VLCMediaParser
+
+
+@dataclass
+class _Deck:
+    """One of the two VLC media players used for gapless playback and crossfades."""
+
+    player: vlc.MediaPlayer
+    path: Path | None = None  # File loaded in this player
+    # Set: pause on the next MediaPlayerPlaying (set by callers, cleared on VLC's thread)
+    pause_on_play: threading.Event = field(default_factory=threading.Event)
+    ready: bool = False  # Preloaded: opened, buffered and paused at the start
+    opened: bool = False  # MediaPlayerPlaying seen since the media was set
+    time_ms: int = -1  # Last position reported by MediaPlayerTimeChanged
+    length_ms: int = -1  # Last length reported by MediaPlayerLengthChanged
+    seek_ms: int = -1  # Position to seek to once the media is seekable (-1 = none)
 
-class VLCPlayer:
-    """Wrapper for VLC media player with event callbacks."""
 
-    def __init__(self, on_end_callback: Callable[[], None] | None = None) -> None:
+class VLCPlayer:
+    """Wrapper for VLC media player that reports through a PlayerEventBus.
+
+    Gapless playback: preload() opens the next track in a second, muted
+    media player and pauses it as soon as it starts, so the file is opened,
+    demuxed and buffered ahead of time. When the current track ends, a
+    handoff thread unpauses the preloaded player immediately (without
+    waiting for the Tk loop), and the following play() call for that file
+    finds it already playing. last_gap_ms reports the measured silence
+    between the end of one track and the start of the next.
+
+    Crossfade (set_crossfade): a fader thread sleeps until the active track
+    is crossfade_ms from its end, starts the preloaded track at volume 0,
+    then ramps both players' volumes along a fade curve on its own timer
+    (see fade.run_fade), independent of the Tk loop. Starting, stopping or
+    pausing playback cancels a running fade.
+
+    Events: VLC callbacks never call into the application. They post to
+    the event bus (events.PlayerEventBus), which the GUI drains on the Tk
+    loop: EVENT_END when a track ends (after any gapless handoff), and
+    EVENT_PROGRESS (time_ms, length_ms, playing) from the active player's
+    TimeChanged, LengthChanged, Playing, Paused and Stopped events. No
+    progress events arrive while paused or stopped.
+
+    Media objects are reused through an LRU MediaCache (media_cache), so
+    replaying a track does not create a new one, and are released when
+    evicted or when the player is released.
+    """
+
+    def __init__(
+        self,
+        events: PlayerEventBus | None = None,
+        media_cache_size: int = DEFAULT_MEDIA_CACHE_SIZE,
+    ) -> None:
         """Initialize VLC player.
 
         Args:
-            on_end_callback: Function to call when track ends.
+            events: Bus to post player events to; by default a bus that
+                dispatches on the posting (VLC) thread.
+            media_cache_size: Most media objects kept for reuse.
         """
         # Use --quiet to suppress verbose VLC logging (stale cache warnings, etc.)
         self._instance = vlc.Instance("--quiet", "--no-video")
-        self._player = self._instance.media_player_new()
-        self._on_end_callback = on_end_callback
+        self.media_cache: MediaCache[vlc.Media] = MediaCache(
+            lambda path: self._instance.media_new(str(path)),
+            lambda media: media.release(),
+            media_cache_size,
+        )
+        self._active = _Deck(self._instance.media_player_new())
+        self._standby = _Deck(self._instance.media_player_new())
+        self._player = self._active.player  # Always the active deck's player
+        self.events = events if events is not None else PlayerEventBus()
         self._current_file: Path | None = None
-        self._pause_on_play: bool = False  # Set True to pause on next MediaPlayerPlaying
-
-        # Set up events
-        event_manager = self._player.event_manager()
-        event_manager.event_attach(
-            vlc.EventType.MediaPlayerEndReached,
-            self._handle_end_reached
+        self._volume: int = 100
+        self._lock = threading.RLock()  # Guards deck swaps against Tk-thread calls
+        self._handed_off: Path | None = None  # Started gaplessly; next play() is a no-op
+        self._generation = 0  # Bumped whenever the active track changes
+        self._ended_at: float | None = None  # perf_counter() at the last end of track
+        self.last_gap_ms: float | None = None  # End of previous track to start of next
+        self._crossfade_ms = 0  # 0 = crossfade off
+        self._fade_curve = get_curve(DEFAULT_CURVE)
+        self._fading: _Deck | None = None  # Outgoing deck while a fade runs
+        self._deferred_preload: Path | None = None  # preload() made during a fade
+        self._closed = False
+
+        # VLC forbids calling into a media player from its own event callback
+        # and the Tk loop may be busy, so end-of-track handoffs run here.
+        self._handoffs: queue.Queue[int | None] = queue.Queue()
+        self._handoff_thread = threading.Thread(
+            target=self._handoff_loop, name="vlc-handoff", daemon=True
         )
-        event_manager.event_attach(
-            vlc.EventType.MediaPlayerPlaying,
-            self._handle_playing
+        self._handoff_thread.start()
+
+        self._fade_wakeup = threading.Event()  # Track or crossfade settings changed
+        self._fade_cancel = threading.Event()  # Abort a running fade
+        self._fader_thread = threading.Thread(
+            target=self._fader_loop, name="vlc-crossfade", daemon=True
         )
+        self._fader_thread.start()
 
-    def _handle_playing(self, event: vlc.Event) -> None:
-        """Handle media player entering playing state.
+        # Set up events
+        for deck in (self._active, self._standby):
+            event_manager = deck.player.event_manager()
+            event_manager.event_attach(
+                vlc.EventType.MediaPlayerEndReached,
+                self._handle_end_reached,
+                deck,
+            )
+            event_manager.event_attach(
+                vlc.EventType.MediaPlayerPlaying,
+                self._handle_playing,
+                deck,
+            )
+            event_manager.event_attach(
+                vlc.EventType.MediaPlayerTimeChanged,
+                self._handle_time_changed,
+                deck,
+            )
+            event_manager.event_attach(
+                vlc.EventType.MediaPlayerLengthChanged,
+                self._handle_length_changed,
+                deck,
+            )
+            event_manager.event_attach(
+                vlc.EventType.MediaPlayerSeekableChanged,
+                self._handle_seekable_changed,
+                deck,
+            )
+            for stopped in (vlc.EventType.MediaPlayerPaused, vlc.EventType.MediaPlayerStopped):
+                event_manager.event_attach(stopped, self._handle_not_playing, deck)
+
+    def _handle_playing(self, event: vlc.Event, deck: _Deck) -> None:
+        """Handle a media player entering playing state.
 
         Args:
             event: VLC event (unused but required by callback signature).
+            deck: Deck whose player started playing.
         """
-        if self._pause_on_play:
-            self._pause_on_play = False
-            self._player.set_pause(1)
-
-    def _handle_end_reached(self, event: vlc.Event) -> None:
+        deck.opened = True
+        if deck.pause_on_play.is_set():
+            deck.pause_on_play.clear()
+            deck.player.set_pause(1)
+            # Some demuxers only report seekable just after Playing; until
+            # MediaPlayerSeekableChanged says otherwise, the seek stays pending.
+            if deck.player.is_seekable():
+                self._apply_pending_seek(deck)
+            if deck is self._standby:
+                # It played (muted) until the pause took effect; rewind so the
+                # handoff starts the track from the beginning.
+                deck.player.set_time(0)
+                deck.time_ms = 0
+                deck.ready = True
+            return
+        if deck is not self._active:
+            return
+        if self._ended_at is not None:
+            self.last_gap_ms = (time.perf_counter() - self._ended_at) * 1000
+            self._ended_at = None
+            logger.debug("track gap: %.1f ms", self.last_gap_ms)
+        self._report_progress(deck, playing=True)
+
+    def _handle_seekable_changed(self, event: vlc.Event, deck: _Deck) -> None:
+        """Handle the media becoming seekable (or not) once it is opened."""
+        if event.u.new_seekable:
+            self._apply_pending_seek(deck)
+        else:
+            self._drop_pending_seek(deck)
+
+    def _drop_pending_seek(self, deck: _Deck) -> None:
+        """Give up a pending seek on media that cannot seek (VLC thread).
+
+        Otherwise a later set_time() would keep replacing a seek that is
+        never applied.
+        """
+        if deck.seek_ms >= 0:
+            logger.debug("media not seekable, staying at the start: %s", deck.path)
+            deck.seek_ms = -1
+
+    def _apply_pending_seek(self, deck: _Deck) -> None:
+        """Seek to the position requested by play_paused_at, once (VLC thread)."""
+        ms = deck.seek_ms
+        if ms < 0:
+            return
+        deck.seek_ms = -1
+        deck.player.set_time(ms)
+        deck.time_ms = ms
+        if deck is self._active:
+            self._report_progress(deck, playing=False)
+
+    def _handle_time_changed(self, event: vlc.Event, deck: _Deck) -> None:
+        """Handle a playback position change (new_time in ms)."""
+        deck.time_ms = event.u.new_time
+        if deck is self._active:
+            self._report_progress(deck, playing=True)
+
+    def _handle_length_changed(self, event: vlc.Event, deck: _Deck) -> None:
+        """Handle the media length becoming known (new_length in ms)."""
+        deck.length_ms = event.u.new_length
+        if deck is self._active:
+            self._report_progress(deck, playing=deck.player.is_playing() == 1)
+
+    def _handle_not_playing(self, event: vlc.Event, deck: _Deck) -> None:
+        """Handle a media player pausing or stopping."""
+        if event.type == vlc.EventType.MediaPlayerStopped:
+            deck.time_ms = deck.length_ms = -1
+        if deck is self._active:
+            self._report_progress(deck, playing=False)
+
+    def _report_progress(self, deck: _Deck, playing: bool) -> None:
+        """Post a deck's position as a progress event."""
+        self.events.post(EVENT_PROGRESS, deck.time_ms, deck.length_ms, playing)
+
+    def _handle_end_reached(self, event: vlc.Event, deck: _Deck) -> None:
         """Handle media end reached event.
 
         Args:
             event: VLC event (unused but required by callback signature).
+            deck: Deck whose player reached the end.
         """
-        if self._on_end_callback:
-            self._on_end_callback()
+        if deck is not self._active:
+            return
+        self._ended_at = time.perf_counter()
+        self._handoffs.put(self._generation)
+
+    def _handoff_loop(self) -> None:
+        """Start the preloaded track when the active one ends (handoff thread)."""
+        while True:
+            generation = self._handoffs.get()
+            if generation is None:
+                return
+            with self._lock:
+                if generation != self._generation:
+                    continue  # Another track was started since this one ended
+                if self._standby.ready:
+                    self._handed_off = self._standby.path
+                    self._swap_decks()
+            self.events.post(EVENT_END)
+
+    def _swap_decks(self, fade: bool = False) -> None:
+        """Make the (ready) standby deck active and start it. Caller holds the lock.
+
+        Args:
+            fade: Start the new track silent and leave the previous one
+                playing, for a crossfade to ramp between them.
+        """
+        previous, self._active, self._standby = self._active, self._standby, self._active
+        self._generation += 1
+        self._fade_wakeup.set()
+        self._player = self._active.player
+        self._active.ready = False
+        self._active.player.audio_set_volume(0 if fade else self._volume)
+        self._active.player.set_pause(0)
+        self._current_file = self._active.path
+        self._report_progress(self._active, playing=True)
+        if fade:
+            self._fading = previous
+            return
+        previous.player.stop()
+        previous.path = None
+        previous.ready = False
+
+    def set_crossfade(self, ms: int, curve: str = DEFAULT_CURVE) -> None:
+        """Configure crossfading between consecutive tracks.
+
+        Args:
+            ms: Fade length in milliseconds; 0 turns crossfade off (gapless
+                playback still applies). Capped at half the outgoing track.
+            curve: Fade curve name (a key of fade.CURVES).
+        """
+        self._crossfade_ms = max(0, ms)
+        self._fade_curve = get_curve(curve)
+        self._fade_wakeup.set()
+
+    def _seconds_until_fade(self) -> float | None:
+        """Seconds until the active track should start fading out.
+
+        Returns:
+            0.0 if a fade is due now, a wait in seconds otherwise, or None if
+            crossfade is off.
+        """
+        if self._crossfade_ms <= 0:
+            return None
+        if self._fading is not None or not self._standby.ready or not self._player.is_playing():
+            return _FADE_POLL_S
+        length = self._player.get_length()
+        now = self._player.get_time()
+        if length <= 0 or now < 0:
+            return _FADE_POLL_S
+        fade_ms = min(self._crossfade_ms, length // 2)
+        # Re-check at least every second so seeks are noticed.
+        return min(max(0.0, (length - fade_ms - now) / 1000), 1.0)
+
+    def _fader_loop(self) -> None:
+        """Start each crossfade on time (fader thread)."""
+        while not self._closed:
+            delay = self._seconds_until_fade()
+            if delay == 0.0:
+                self._crossfade()
+                continue
+            self._fade_wakeup.wait(delay)
+            self._fade_wakeup.clear()
+
+    def _crossfade(self) -> None:
+        """Fade from the active track into the preloaded one."""
+        with self._lock:
+            if not self._standby.ready:
+                return
+            outgoing = self._active
+            length = outgoing.player.get_length()
+            remaining_ms = max(0, length - outgoing.player.get_time())
+            fade_ms = min(self._crossfade_ms, length // 2, remaining_ms)
+            curve = self._fade_curve
+            self._fade_cancel.clear()
+            self._handed_off = self._standby.path
+            self._swap_decks(fade=True)
+            incoming = self._active
+        logger.debug("crossfade: %d ms into %s", fade_ms, incoming.path)
+        self.events.post(EVENT_END)
+
+        def step(t: float) -> None:
+            out_gain, in_gain = curve(t)
+            outgoing.player.audio_set_volume(round(self._volume * out_gain))
+            incoming.player.audio_set_volume(round(self._volume * in_gain))
+
+        completed = run_fade(fade_ms / 1000, step, self._fade_cancel)
+        with self._lock:
+            outgoing.player.stop()
+            outgoing.path = None
+            outgoing.ready = False
+            self._fading = None
+            if not completed:
+                self._player.audio_set_volume(self._volume)
+            deferred, self._deferred_preload = self._deferred_preload, None
+            if deferred is not None:
+                self.preload(deferred)
+
+    def _cancel_fade(self) -> None:
+        """Stop a running crossfade (the outgoing track is cut off)."""
+        if self._fading is not None:
+            self._fade_cancel.set()
+
+    def _set_media(self, deck: _Deck, path: Path) -> None:
+        """Load a file into a deck's player, reusing its cached media.
+
+        A file that is also loaded on the other deck (e.g. a one-track loop)
+        gets its own uncached media, so the two players never share one.
+        """
+        deck.seek_ms = -1
+        deck.opened = False
+        other = self._standby if deck is self._active else self._active
+        if path == other.path:
+            media = self._instance.media_new(str(path))
+            deck.player.set_media(media)
+            media.release()  # The player holds its own reference
+        else:
+            deck.player.set_media(self.media_cache.get(path))
+
+    def preload(self, file_path: str | Path | None) -> None:
+        """Open the track expected to play next, so it can start without a gap.
+
+        Args:
+            file_path: File to preload, or None to drop any preloaded track.
+        """
+        path = Path(file_path) if file_path is not None else None
+        with self._lock:
+            if self._fading is not None:
+                # The standby deck is still fading out; preload when it is free.
+                self._deferred_preload = path
+                return
+            standby = self._standby
+            if path == standby.path:
+                return
+            standby.player.stop()
+            standby.path = None
+            standby.ready = False
+            if path is None or not path.exists():
+                return
+            self._set_media(standby, path)
+            standby.time_ms = standby.length_ms = -1
+            standby.player.audio_set_volume(0)  # Silent while buffering
+            standby.path = path
+            standby.pause_on_play.set()
+            standby.player.play()
 
     def play(self, file_path: str | Path) -> bool:
         """Play a media file.
 
+        A file that was preloaded starts from the preloaded player; one that
+        already started gaplessly at the end of the previous track is left
+        playing.
+
         Args:
             file_path: Path to the media file to play.
 
@@ -65,18 +413,31 @@ class VLCPlayer:
             True if playback started successfully.
         """
         path = Path(file_path)
-        if not path.exists():
-            logger.warning("file not found: %s", path)
-            return False
-
-        # Create new media and set it
-        media = self._instance.media_new(str(path))
-        self._player.set_media(media)
-        self._current_file = path
-
-        # Start playback
-        result = self._player.play()
-        return result == 0
+        with self._lock:
+            if self._handed_off is not None and path == self._handed_off == self._current_file:
+                self._handed_off = None
+                return True
+            self._handed_off = None
+            self._cancel_fade()
+
+            if path == self._standby.path and self._standby.ready:
+                self._swap_decks()
+                return True
+
+            if not path.exists():
+                logger.warning("file not found: %s", path)
+                return False
+
+            self._set_media(self._active, path)
+            self._active.path = path
+            self._active.time_ms = self._active.length_ms = -1
+            self._current_file = path
+            self._generation += 1
+            self._ended_at = None
+
+            # Start playback
+            result = self._player.play()
+            return result == 0
 
     def play_paused(self, file_path: str | Path) -> bool:
         """Load a media file and immediately pause when playback begins.
@@ -88,6 +449,22 @@ class VLCPlayer:
         Args:
             file_path: Path to the media file to load.
 
+        Returns:
+            True if playback was initiated successfully.
+        """
+        return self.play_paused_at(file_path, 0)
+
+    def play_paused_at(self, file_path: str | Path, ms: int) -> bool:
+        """Load a media file paused at a position (e.g. a saved resume point).
+
+        The seek is applied from VLC's own events as soon as the media is
+        paused and reports it is seekable, however long opening the file
+        takes. Until then get_time() returns the requested position.
+
+        Args:
+            file_path: Path to the media file to load.
+            ms: Position in milliseconds; 0 or less loads at the start.
+
         Returns:
             True if playback was initiated successfully.
         """
@@ -95,21 +472,34 @@ class VLCPlayer:
         if not path.exists():
             return False
 
-        media = self._instance.media_new(str(path))
-        self._player.set_media(media)
-        self._current_file = path
+        with self._lock:
+            self._handed_off = None
+            self._cancel_fade()
+            self._set_media(self._active, path)
+            self._active.path = path
+            self._active.time_ms = self._active.length_ms = -1
+            self._active.seek_ms = ms if ms > 0 else -1
+            self._current_file = path
+            self._generation += 1
 
-        self._pause_on_play = True
-        result = self._player.play()
-        return result == 0
+            self._active.pause_on_play.set()
+            result = self._player.play()
+            return result == 0
 
     def stop(self) -> None:
-        """Stop playback."""
-        self._player.stop()
-        self._current_file = None
+        """Stop playback (a preloaded next track stays ready)."""
+        with self._lock:
+            self._handed_off = None
+            self._cancel_fade()
+            self._player.stop()
+            self._active.path = None
+            self._active.seek_ms = -1
+            self._current_file = None
+            self._generation += 1
 
     def pause(self) -> None:
         """Toggle pause state."""
+        self._cancel_fade()
         self._player.pause()
 
     def set_paused(self, paused: bool) -> None:
@@ -118,6 +508,8 @@ class VLCPlayer:
         Args:
             paused: True to pause, False to resume playback.
         """
+        if paused:
+            self._cancel_fade()
         self._player.set_pause(1 if paused else 0)
 
     def is_playing(self) -> bool:
@@ -136,20 +528,17 @@ class VLCPlayer:
         """
         return self._current_file
 
-    def set_on_end_callback(self, callback: Callable[[], None] | None) -> None:
-        """Set the callback for when track ends.
-
-        Args:
-            callback: Function to call when track ends.
-        """
-        self._on_end_callback = callback
-
     def get_time(self) -> int:
         """Get current playback time in milliseconds.
 
         Returns:
-            Current time in milliseconds, or -1 if not available.
+            Current time in milliseconds, or -1 if not available. Until a
+            track started by play_paused_at() is open, the position it
+            will be resumed at.
         """
+        deck = self._active
+        if deck.seek_ms >= 0 and not deck.opened:
+            return deck.seek_ms
         return self._player.get_time()
 
     def set_time(self, ms: int) -> None:
@@ -158,6 +547,8 @@ class VLCPlayer:
         Args:
             ms: Time in milliseconds to seek to.
         """
+        if self._active.seek_ms >= 0:
+            self._active.seek_ms = ms  # Not seekable yet; replaces the pending seek
         self._player.set_time(ms)
 
     def get_length(self) -> int:
@@ -190,10 +581,78 @@ class VLCPlayer:
         Args:
             volume: Volume level from 0 to 100.
         """
-        self._player.audio_set_volume(max(0, min(100, volume)))
+        self._volume = max(0, min(100, volume))
+        self._player.audio_set_volume(self._volume)
 
     def release(self) -> None:
         """Release VLC resources."""
-        self._player.stop()
-        self._player.release()
+        self._closed = True
+        self._fade_cancel.set()
+        self._fade_wakeup.set()
+        self._handoffs.put(None)
+        self._handoff_thread.join(timeout=1.0)
+        self._fader_thread.join(timeout=1.0)
+        for deck in (self._active, self._standby):
+            deck.player.stop()
+            deck.player.release()
+        with self._lock:
+            self.media_cache.clear()
+        self._instance.release()
+
+
+class VLCMediaParser:
+    """Reads track durations and tags with libvlc's asynchronous media parser.
+
+    Uses its own VLC instance, so parsing never touches the playback
+    players. parse() may be called from several threads at once; each call
+    starts an async parse and blocks its thread until VLC reports the media
+    parsed (or the timeout passes). Use as MediaInfoScanner's parse function.
+    """
+
+    def __init__(self, timeout_ms: int = PARSE_TIMEOUT_MS) -> None:
+        """Initialize the parser.
+
+        Args:
+            timeout_ms: Give up on a file after this long (slow network shares).
+        """
+        self._instance = vlc.Instance("--quiet", "--no-video")
+        self._timeout_ms = timeout_ms
+
+    def parse(self, path: Path) -> MediaInfo | None:
+        """Parse one file.
+
+        Args:
+            path: Media file.
+
+        Returns:
+            The file's info, or None if VLC could not parse it in time.
+        """
+        media = self._instance.media_new(str(path))
+        parsed = threading.Event()
+        event_manager = media.event_manager()
+        event_manager.event_attach(vlc.EventType.MediaParsedChanged, lambda event: parsed.set())
+        try:
+            if media.parse_with_options(vlc.MediaParseFlag.local, self._timeout_ms) != 0:
+                return None
+            parsed.wait(self._timeout_ms / 1000 + 1.0)
+            if media.get_parsed_status() != vlc.MediaParsedStatus.done:
+                return None
+
+            def meta(kind: vlc.Meta) -> str:
+                return media.get_meta(kind) or ""
+
+            title = meta(vlc.Meta.Title)
+            return MediaInfo(
+                duration_ms=media.get_duration(),
+                # VLC falls back to the file name when there is no title tag.
+                title="" if title == path.name else title,
+                artist=meta(vlc.Meta.Artist),
+                album=meta(vlc.Meta.Album),
+            )
+        finally:
+            event_manager.event_detach(vlc.EventType.MediaParsedChanged)
+            media.release()
+
+    def release(self) -> None:
+        """Release the parser's VLC instance."""
         self._instance.release()
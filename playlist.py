@@ -2,13 +2,86 @@
 
 import logging
 import random
+from array import array
 from pathlib import Path
+from typing import Iterable, Sequence, overload
 
-from .state import PlaylistState
+from .permutation import SeededShuffle
+from .shuffle import DEFAULT_STRATEGY, get_strategy
+from .state import PlaylistState, ShuffleOrder, fingerprint_names
 
 logger = logging.getLogger(__name__)
 
 
+def merge_at_random_positions(
+    base: list[int], extra: list[int], rng: random.Random | None = None
+) -> list[int]:
+    """Insert items into a list at uniformly random positions, in one pass.
+
+    Gives the same distribution as shuffling extra and inserting each item
+    at a random index with list.insert, but in O(n + k log k) time rather
+    than O(n * k): k distinct slots of the merged list are sampled, sorted,
+    and filled from extra while the gaps are filled from base.
+
+    Args:
+        base: Existing order; relative order is preserved.
+        extra: Items to insert.
+        rng: Random source (a fresh unseeded one if None).
+
+    Returns:
+        New list of len(base) + len(extra) items.
+    """
+    if rng is None:
+        rng = random.Random()
+    extra = list(extra)
+    rng.shuffle(extra)
+    slots = sorted(rng.sample(range(len(base) + len(extra)), len(extra)))
+    merged: list[int] = []
+    taken = 0  # Items of base already copied
+    for j, slot in enumerate(slots):
+        # Slot `slot` of the merged list is preceded by j extra items.
+        merged.extend(base[taken:slot - j])
+        taken = slot - j
+        merged.append(extra[j])
+    merged.extend(base[taken:])
+    return merged
+
+
+class _FileView(Sequence[Path]):
+    """The loaded files, as Paths built on demand from the root and track names.
+
+    Holding one name string per track instead of a Path object (with its
+    cached parts and string forms) keeps large folders small in memory.
+    """
+
+    __slots__ = ("_root", "_names")
+
+    def __init__(self, root: Path, names: list[str]) -> None:
+        self._root = root
+        self._names = names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @overload
+    def __getitem__(self, index: int) -> Path: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Path]: ...
+
+    def __getitem__(self, index: int | slice) -> Path | list[Path]:
+        if isinstance(index, slice):
+            return [self._root / name for name in self._names[index]]
+        return self._root / self._names[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+
 class PlaylistController:
     """Manages playlist navigation, shuffle, and per-folder state persistence.
 
@@ -16,6 +89,10 @@ class PlaylistController:
     loaded folder. The GUI holds one instance and calls into it for all
     navigation decisions; this class never touches tkinter.
 
+    Shuffle orders come from a shuffle strategy (see shuffle.py) and an
+    explicit seed stored in PlaylistState.shuffle_seed, so any order can be
+    reproduced with enable_shuffle(seed=...).
+
     Lifecycle::
 
         controller = PlaylistController()
@@ -23,30 +100,80 @@ class PlaylistController:
         controller.sync_to_state()              # before each save
     """
 
-    def __init__(self) -> None:
-        self._files: list[Path] = []
+    def __init__(self, rng: random.Random | None = None) -> None:
+        """Initialize the controller.
+
+        Args:
+            rng: Source of new shuffle seeds (a fresh unseeded one if None);
+                pass a seeded Random for reproducible runs.
+        """
+        self._rng = rng if rng is not None else random.Random()
+        self._files: Sequence[Path] = []
+        self._root: Path | None = None
         self._current_index: int = 0
-        self._shuffle_order: list[int] | None = None
+        # File indices in shuffle order: a lazy SeededShuffle, or an array("I")
+        # after reconciling a saved order against a changed folder. None = straight.
+        self._shuffle_order: Sequence[int] | None = None
+        self._inverse_order: array[int] | None = None  # For an array order: file index -> position
         self._playlist_state: PlaylistState | None = None
+        self._track_names: list[str] = []  # track_name() of each file, in file order
+        self._fingerprint: str | None = None  # fingerprint_names(_track_names), built lazily
 
     # ------------------------------------------------------------------ #
     # Loading and persistence                                              #
     # ------------------------------------------------------------------ #
 
-    def load(self, files: list[Path], playlist_state: PlaylistState) -> None:
+    def load(
+        self,
+        files: Sequence[Path],
+        playlist_state: PlaylistState,
+        root: Path | None = None,
+    ) -> None:
         """Load a file list, taking ownership of playlist_state.
 
         Reconciles the saved filename-based state against the actual files on
         disk, handling renames, deletions, and additions gracefully.
 
+        Only track names are kept; files and file_at() build Paths on demand.
+
         Args:
             files: Media files from disk, naturally sorted.
             playlist_state: Saved state for this folder (mutated in-place by
                 sync_to_state).
+            root: Folder the files were scanned from. Required when files come
+                from subfolders, so tracks are identified by relative path
+                (e.g. "disc1/01.mp3") rather than by bare filename.
         """
-        self._files = files
+        self._root = root
         self._playlist_state = playlist_state
+        self._track_names, base = self._names_of(files, root)
+        self._files = _FileView(base, self._track_names) if base is not None else list(files)
+        self._fingerprint = None
         self._reconcile()
+        self._inverse_order = None
+
+    @staticmethod
+    def _names_of(files: Sequence[Path], root: Path | None) -> tuple[list[str], Path | None]:
+        """Track names of files, and the folder they can be rebuilt from.
+
+        Returns:
+            (names, root) if root / name == file for every file; otherwise
+            (names, None), and the Paths themselves must be kept.
+        """
+        if root is None:
+            return [file.name for file in files], None
+        names: list[str] = []
+        rebuildable = True
+        for file in files:
+            if file.parent == root:
+                names.append(file.name)
+                continue
+            try:
+                names.append(file.relative_to(root).as_posix())
+            except ValueError:
+                names.append(file.name)
+                rebuildable = False
+        return names, root if rebuildable else None
 
     def sync_to_state(self) -> None:
         """Write runtime indices back to PlaylistState as filenames.
@@ -66,24 +193,42 @@ class PlaylistController:
             file_index = self._current_index
 
         if 0 <= file_index < len(self._files):
-            self._playlist_state.current_filename = self._files[file_index].name
+            self._playlist_state.current_filename = self._track_names[file_index]
 
         if self._shuffle_order is not None:
-            self._playlist_state.shuffle_order = [
-                self._files[i].name
-                for i in self._shuffle_order
-                if 0 <= i < len(self._files)
-            ]
+            saved = self._playlist_state.shuffle_order
+            if not (
+                isinstance(saved, ShuffleOrder)
+                and saved.fingerprint == self.fingerprint
+                and saved.permutation == self._shuffle_order
+            ):
+                # Keep an unchanged order's object so its packed form is reused.
+                permutation = self._shuffle_order
+                if not isinstance(permutation, SeededShuffle):
+                    permutation = array("I", permutation)
+                self._playlist_state.shuffle_order = ShuffleOrder(
+                    self._track_names, permutation, self.fingerprint
+                )
         else:
             self._playlist_state.shuffle_order = None
 
+    @property
+    def fingerprint(self) -> str:
+        """Fingerprint of the loaded track list (see state.fingerprint_names)."""
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint_names(self._track_names)
+        return self._fingerprint
+
     def _reconcile(self) -> None:
         """Resolve saved filename-based state to runtime integer indices.
 
-        Handles files added, removed, or renamed since state was saved:
+        If the folder's track list matches the saved order's fingerprint, the
+        saved permutation is used as-is. Otherwise, handles files added,
+        removed, or renamed since state was saved:
         - Renamed/deleted current track: resets to first file in display order.
         - Deleted tracks in shuffle: removed silently from shuffle order.
-        - Added tracks in shuffle mode: inserted at random positions.
+        - Added tracks in shuffle mode: inserted at random positions
+          (merge_at_random_positions, one pass however many were added).
         - Added tracks in straight mode: included automatically by sort order.
         """
         if not self._playlist_state or not self._files:
@@ -91,10 +236,47 @@ class PlaylistController:
             self._shuffle_order = None
             return
 
-        filename_to_index: dict[str, int] = {f.name: i for i, f in enumerate(self._files)}
+        saved_name = self._playlist_state.current_filename
+        saved_shuffle = self._playlist_state.shuffle_order
+
+        # Fast path: the folder is unchanged since the order was saved, so the
+        # saved permutation applies directly and no name lookup table is needed.
+        if (
+            isinstance(saved_shuffle, ShuffleOrder)
+            and len(saved_shuffle.names) == len(self._files)
+            and len(saved_shuffle) == len(self._files)
+            and saved_shuffle.fingerprint == self.fingerprint
+        ):
+            saved_permutation = saved_shuffle.permutation
+            if isinstance(saved_permutation, SeededShuffle):
+                # Own copy: the saved order must not change under its cached packed form.
+                self._shuffle_order = SeededShuffle(
+                    len(saved_permutation), saved_permutation.seed, saved_permutation.swaps
+                )
+            else:
+                self._shuffle_order = array("I", saved_permutation)
+            try:
+                current_file_index = self._track_names.index(saved_name)
+                self._current_index = self._shuffle_order.index(current_file_index)
+            except ValueError:
+                self._current_index = 0
+            return
+
+        if saved_shuffle is None:
+            # Straight mode only needs the current track; no lookup table.
+            try:
+                self._current_index = self._track_names.index(saved_name) if saved_name else 0
+            except ValueError:
+                logger.debug("current track not found, resetting: %s", saved_name)
+                self._current_index = 0
+            self._shuffle_order = None
+            return
+
+        filename_to_index: dict[str, int] = {
+            name: i for i, name in enumerate(self._track_names)
+        }
 
         # Resolve current file by name; fall back to first file if gone.
-        saved_name = self._playlist_state.current_filename
         if saved_name and saved_name in filename_to_index:
             current_file_index = filename_to_index[saved_name]
         else:
@@ -102,33 +284,31 @@ class PlaylistController:
                 logger.debug("current track not found, resetting: %s", saved_name)
             current_file_index = 0
 
-        saved_shuffle = self._playlist_state.shuffle_order
-        if saved_shuffle is not None:
-            # Retain files still present, preserving saved order.
-            present_names: set[str] = {n for n in saved_shuffle if n in filename_to_index}
-            resolved: list[int] = [filename_to_index[n] for n in saved_shuffle if n in present_names]
-
-            dropped = len(saved_shuffle) - len(present_names)
-            if dropped:
-                logger.debug("reconcile: dropped %d missing file(s) from shuffle order", dropped)
-
-            # Insert newly added files at random positions.
-            new_indices = [i for i, f in enumerate(self._files) if f.name not in present_names]
-            if new_indices:
-                logger.debug("reconcile: inserting %d new file(s) into shuffle order", len(new_indices))
-                random.shuffle(new_indices)
-                for idx in new_indices:
-                    insert_pos = random.randint(0, len(resolved))
-                    resolved.insert(insert_pos, idx)
-
-            self._shuffle_order = resolved or None
-            if self._shuffle_order and current_file_index in self._shuffle_order:
-                self._current_index = self._shuffle_order.index(current_file_index)
-            else:
-                self._current_index = 0
-        else:
-            self._shuffle_order = None
-            self._current_index = current_file_index
+        # Retain files still present, preserving saved order (and dropping
+        # duplicates); placed marks file indices already in the order.
+        placed = bytearray(len(self._files))
+        resolved: list[int] = []
+        for name in saved_shuffle:
+            i = filename_to_index.get(name)
+            if i is not None and not placed[i]:
+                placed[i] = 1
+                resolved.append(i)
+
+        dropped = len(saved_shuffle) - len(resolved)
+        if dropped:
+            logger.debug("reconcile: dropped %d missing file(s) from shuffle order", dropped)
+
+        # Insert newly added files at random positions.
+        new_indices = [i for i, done in enumerate(placed) if not done]
+        if new_indices:
+            logger.debug("reconcile: inserting %d new file(s) into shuffle order", len(new_indices))
+            seed = self._playlist_state.shuffle_seed
+            rng = random.Random(seed) if seed is not None else self._rng
+            resolved = merge_at_random_positions(resolved, new_indices, rng)
+
+        # Every file is now in the order, so the current one is always found.
+        self._shuffle_order = array("I", resolved)
+        self._current_index = self._shuffle_order.index(current_file_index)
 
     # ------------------------------------------------------------------ #
     # Properties                                                           #
@@ -140,21 +320,29 @@ class PlaylistController:
         return self._playlist_state is not None
 
     @property
-    def files(self) -> list[Path]:
-        """Current media files in natural sort order."""
+    def files(self) -> Sequence[Path]:
+        """Current media files in natural sort order (Paths built on access)."""
         return self._files
 
+    @property
+    def track_names(self) -> Sequence[str]:
+        """track_name() of every file, in file order."""
+        return self._track_names
+
     @property
     def current_display_index(self) -> int:
         """Current position in the display order."""
         return self._current_index
 
     @property
-    def display_order(self) -> list[int]:
-        """File indices in display order (shuffle sequence or straight 0..n-1)."""
+    def display_order(self) -> Sequence[int]:
+        """File indices in display order (shuffle sequence or straight 0..n-1).
+
+        Straight mode returns a range, so no per-call list is built.
+        """
         if self._shuffle_order is not None:
             return self._shuffle_order
-        return list(range(len(self._files)))
+        return range(len(self._files))
 
     @property
     def shuffle_enabled(self) -> bool:
@@ -171,6 +359,16 @@ class PlaylistController:
         if self._playlist_state:
             self._playlist_state.loop_enabled = value
 
+    @property
+    def shuffle_strategy(self) -> str:
+        """Name of the shuffle strategy used by enable_shuffle/reshuffle."""
+        return self._playlist_state.shuffle_strategy if self._playlist_state else DEFAULT_STRATEGY
+
+    @shuffle_strategy.setter
+    def shuffle_strategy(self, value: str) -> None:
+        if self._playlist_state:
+            self._playlist_state.shuffle_strategy = value
+
     @property
     def playback_position_ms(self) -> int:
         """Saved playback position within the current track, in milliseconds."""
@@ -185,6 +383,73 @@ class PlaylistController:
     # File access                                                          #
     # ------------------------------------------------------------------ #
 
+    def display_positions_of(self, file_indices: Iterable[int]) -> list[int]:
+        """Map file indices to their positions in the display order.
+
+        Args:
+            file_indices: Indices into files (e.g. search matches).
+
+        Returns:
+            Display positions in ascending order; out-of-range indices are
+            skipped.
+        """
+        return sorted(self.display_positions_of_ranked(file_indices))
+
+    def display_positions_of_ranked(self, file_indices: Iterable[int]) -> list[int]:
+        """Map file indices to display positions, keeping the input order.
+
+        Args:
+            file_indices: Indices into files, e.g. ranked search matches.
+
+        Returns:
+            Display positions in the same order as file_indices; out-of-range
+            indices are skipped.
+        """
+        count = len(self._files)
+        if self._shuffle_order is None:
+            return [i for i in file_indices if 0 <= i < count]
+        if isinstance(self._shuffle_order, SeededShuffle):
+            index = self._shuffle_order.index  # O(1) inverse, no table needed
+            return [index(i) for i in file_indices if 0 <= i < count]
+        if self._inverse_order is None or len(self._inverse_order) != count:
+            inverse = array("i", [-1]) * count
+            for pos, file_index in enumerate(self._shuffle_order):
+                if 0 <= file_index < count:
+                    inverse[file_index] = pos
+            self._inverse_order = inverse
+        inverse = self._inverse_order
+        return [inverse[i] for i in file_indices if 0 <= i < count and inverse[i] >= 0]
+
+    def track_name(self, file: Path) -> str:
+        """Name that identifies a track in saved state and in the playlist.
+
+        This is the bare filename for top-level files, and the path relative
+        to the loaded folder (with forward slashes) for files in subfolders.
+
+        Args:
+            file: One of the loaded files.
+
+        Returns:
+            The track's display and persistence name.
+        """
+        if self._root is not None and file.parent != self._root:
+            try:
+                return file.relative_to(self._root).as_posix()
+            except ValueError:
+                pass
+        return file.name
+
+    def track_name_at(self, file_index: int) -> str:
+        """track_name() of a file by index, without building its Path.
+
+        Args:
+            file_index: Index into files.
+
+        Returns:
+            The track name, or "" if out of range.
+        """
+        return self._track_names[file_index] if 0 <= file_index < len(self._track_names) else ""
+
     def current_file(self) -> Path | None:
         """Path of the currently active track, or None if nothing is loaded."""
         return self.file_at(self._current_index)
@@ -221,11 +486,11 @@ class PlaylistController:
         if self._playlist_state:
             self._playlist_state.playback_position_ms = 0
 
-    def advance(self) -> int | None:
-        """Move to the next track.
+    def peek_next(self) -> int | None:
+        """Display index advance() would move to, without moving.
 
         Returns:
-            New display index, or None if at the end and loop is disabled.
+            Next display index, or None if at the end and loop is disabled.
         """
         order_len = len(self._shuffle_order) if self._shuffle_order is not None else len(self._files)
         if order_len == 0:
@@ -236,7 +501,17 @@ class PlaylistController:
                 next_pos = 0
             else:
                 return None
-        self.go_to(next_pos)
+        return next_pos
+
+    def advance(self) -> int | None:
+        """Move to the next track.
+
+        Returns:
+            New display index, or None if at the end and loop is disabled.
+        """
+        next_pos = self.peek_next()
+        if next_pos is not None:
+            self.go_to(next_pos)
         return next_pos
 
     def retreat(self) -> int:
@@ -258,24 +533,55 @@ class PlaylistController:
     # Shuffle                                                              #
     # ------------------------------------------------------------------ #
 
-    def enable_shuffle(self) -> None:
-        """Enable shuffle mode, placing the current track first."""
+    def enable_shuffle(self, seed: int | None = None) -> None:
+        """Enable shuffle mode, placing the current track first.
+
+        The order comes from the folder's shuffle strategy. The uniform
+        strategy returns a SeededShuffle, computed on demand, so enabling
+        shuffle costs O(1) time and memory for any folder size.
+
+        Args:
+            seed: Seed for the order; a new random seed if None. The seed
+                is stored in PlaylistState.shuffle_seed.
+        """
+        if seed is None:
+            seed = self._rng.getrandbits(63)  # Fits a signed 64-bit SQLite integer
         current_file_index = self._current_file_index()
-        other_indices = [i for i in range(len(self._files)) if i != current_file_index]
-        random.shuffle(other_indices)
-        self._shuffle_order = [current_file_index] + other_indices
+        play_counts = self._playlist_state.play_counts if self._playlist_state else {}
+        order = get_strategy(self.shuffle_strategy).order(self._track_names, seed, play_counts)
+        if isinstance(order, SeededShuffle):
+            if self._files:
+                order.swap(0, order.index(current_file_index))
+        else:
+            order = array("I", order)
+            if self._files:
+                position = order.index(current_file_index)
+                order[0], order[position] = order[position], order[0]
+        if self._playlist_state:
+            self._playlist_state.shuffle_seed = seed
+        self._shuffle_order = order
+        self._inverse_order = None
         self._current_index = 0
 
     def disable_shuffle(self) -> None:
         """Disable shuffle mode, keeping the current file active."""
         self._current_index = self._current_file_index()
         self._shuffle_order = None
+        self._inverse_order = None
 
     def reshuffle(self) -> None:
         """Generate a new shuffle order (only effective in shuffle mode)."""
         if self._shuffle_order is not None:
             self.enable_shuffle()
 
+    def record_play(self) -> None:
+        """Count a play of the current track (feeds the weighted shuffle)."""
+        if not self._playlist_state or not self._files:
+            return
+        name = self._track_names[self._current_file_index()]
+        counts = self._playlist_state.play_counts
+        counts[name] = counts.get(name, 0) + 1
+
     def _current_file_index(self) -> int:
         """Return the index into self._files for the current track."""
         if self._shuffle_order is not None:
@@ -0,0 +1,189 @@
+"""Playlist search index for fast, incremental filtering."""
+
+import bisect
+import re
+import unicodedata
+from typing import Sequence
+
+# Fresh queries at least this long scan the joined haystack with str.find;
+# shorter ones match too many names for that to beat a plain linear scan.
+HAYSTACK_MIN_TERM = 3
+
+# Separator between names in the haystack; cannot occur in a filename.
+_SEP = "\0"
+
+# Characters after which a fuzzy match counts as starting a word
+_WORD_BREAKS = frozenset(" _-.()[]/,&+")
+
+
+def fold(text: str) -> str:
+    """Fold text for accent- and case-insensitive matching.
+
+    Args:
+        text: Text to fold.
+
+    Returns:
+        Casefolded text with combining marks removed ("Beyoncé" -> "beyonce").
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def _token_pattern(token: str) -> re.Pattern[str]:
+    """Regex matching token's characters in order, gaps allowed (not across lines)."""
+    return re.compile(".*?".join(re.escape(c) for c in token))
+
+
+def _score_token(token: str, pattern: re.Pattern[str], text: str) -> float | None:
+    """Score one token against one folded text, or None if it does not match.
+
+    Contiguous matches beat scattered subsequences; matches starting at a
+    word boundary get a bonus.
+    """
+    start = text.find(token)
+    if start != -1:
+        score = 2.0
+    else:
+        match = pattern.search(text)
+        if match is None:
+            return None
+        start = match.start()
+        score = len(token) / (match.end() - start)
+    if start == 0 or text[start - 1] in _WORD_BREAKS:
+        score += 0.5
+    return score
+
+
+class SearchIndex:
+    """Search over a fixed list of track names: substring or ranked fuzzy.
+
+    Built once per folder load (O(n): lowercase and join). Each query returns
+    matching name indices in ascending order:
+
+    - A query that extends the previous one (the usual case while typing)
+      only re-tests the previous matches, so results narrow incrementally.
+    - A fresh query of HAYSTACK_MIN_TERM+ characters runs str.find over all
+      names joined into one string, touching Python code only per match.
+    - Short fresh queries fall back to a linear scan of the lowercased names.
+
+    fuzzy_query() adds a ranked mode: whitespace-separated tokens must all
+    match (AND), each as a subsequence of the accent/case-folded name or
+    its tag metadata (see set_metadata).
+
+    Indices refer to the names passed in, i.e. PlaylistController file
+    indices, so results stay valid across shuffle and reshuffle.
+    """
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self._names: list[str] = [name.lower() for name in names]
+        # Folded "name\nmetadata" per track; "." in token patterns stops at "\n",
+        # so a subsequence never straddles name and metadata.
+        self._fuzzy_texts: list[str] = [fold(name) for name in names]
+        self._fuzzy_last_text: str = ""
+        self._fuzzy_last_candidates: list[int] = []
+        self._haystack = _SEP.join(self._names)
+        self._starts: list[int] = []
+        offset = 0
+        for name in self._names:
+            self._starts.append(offset)
+            offset += len(name) + 1
+        self._last_term: str = ""
+        self._last_results: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def set_metadata(self, index: int, text: str) -> None:
+        """Attach tag metadata (artist, album, title...) for fuzzy matching.
+
+        Args:
+            index: Name index the metadata belongs to.
+            text: Metadata fields joined by spaces.
+        """
+        if not 0 <= index < len(self._names):
+            return
+        name_part = self._fuzzy_texts[index].split("\n", 1)[0]
+        folded = fold(text.replace("\n", " ")).strip()
+        self._fuzzy_texts[index] = f"{name_part}\n{folded}" if folded else name_part
+        self._fuzzy_last_text = ""  # Metadata may add matches to any query
+
+    def fuzzy_query(self, text: str) -> list[int]:
+        """Ranked fuzzy search: every token must match as a subsequence.
+
+        Args:
+            text: Search text; split on whitespace into tokens.
+
+        Returns:
+            Matching name indices, best match first (ties keep list order);
+            every index for empty text.
+        """
+        folded = fold(text).strip()
+        tokens = folded.split()
+        if not tokens:
+            self._fuzzy_last_text = ""
+            return list(range(len(self._names)))
+
+        # Appending characters or tokens can only remove matches.
+        if self._fuzzy_last_text and folded.startswith(self._fuzzy_last_text):
+            candidates: Sequence[int] = self._fuzzy_last_candidates
+        else:
+            candidates = range(len(self._fuzzy_texts))
+
+        patterns = [(token, _token_pattern(token)) for token in tokens]
+        texts = self._fuzzy_texts
+        scored: list[tuple[float, int]] = []
+        for i in candidates:
+            total = 0.0
+            for token, pattern in patterns:
+                score = _score_token(token, pattern, texts[i])
+                if score is None:
+                    break
+                total += score
+            else:
+                scored.append((-total, i))
+
+        self._fuzzy_last_text = folded
+        self._fuzzy_last_candidates = sorted(i for _score, i in scored)
+        scored.sort()
+        return [i for _score, i in scored]
+
+    def query(self, term: str) -> list[int]:
+        """Find names containing term (case-insensitive).
+
+        Args:
+            term: Search text; surrounding whitespace is ignored.
+
+        Returns:
+            Ascending indices of matching names; every index for an empty term.
+        """
+        term = term.lower().strip()
+        if not term:
+            self._last_term = ""
+            return list(range(len(self._names)))
+
+        if self._last_term and self._last_term in term:
+            names = self._names
+            results = [i for i in self._last_results if term in names[i]]
+        elif len(term) >= HAYSTACK_MIN_TERM:
+            results = self._scan_haystack(term)
+        else:
+            results = [i for i, name in enumerate(self._names) if term in name]
+
+        self._last_term = term
+        self._last_results = results
+        return results
+
+    def _scan_haystack(self, term: str) -> list[int]:
+        """Find matches with str.find over the joined names."""
+        haystack = self._haystack
+        starts = self._starts
+        results: list[int] = []
+        find = haystack.find
+        pos = find(term)
+        while pos != -1:
+            index = bisect.bisect_right(starts, pos) - 1
+            results.append(index)
+            if index + 1 >= len(starts):
+                break
+            pos = find(term, starts[index + 1])  # Skip the rest of this name
+        return results
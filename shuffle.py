@@ -0,0 +1,137 @@
+"""Shuffle strategies: reproducible shuffle orders built from an explicit seed."""
+
+import math
+import random
+from array import array
+from collections import defaultdict
+from typing import Callable, Mapping, Protocol, Sequence
+
+from .permutation import EXPLICIT_MAX_SIZE, SeededShuffle
+
+DEFAULT_STRATEGY = "uniform"
+
+
+class ShuffleStrategy(Protocol):
+    """Builds a shuffle order for a folder's tracks.
+
+    Implementations must be deterministic for a given (names, seed,
+    play_counts), so a shuffle can be reproduced from its saved seed, and
+    run in O(n log n) or better.
+    """
+
+    name: str
+    label: str  # Shown in the GUI
+
+    def order(self, names: Sequence[str], seed: int, play_counts: Mapping[str, int]) -> Sequence[int]:
+        """Shuffle order for the tracks.
+
+        Args:
+            names: Track names in file order.
+            seed: RNG seed; equal seeds give equal orders.
+            play_counts: Times each track (by name) has been played.
+
+        Returns:
+            File indices in shuffle order: a permutation of range(len(names)).
+        """
+        ...
+
+
+def _folder_of(name: str) -> str:
+    """Subfolder part of a track name ("" for top-level tracks)."""
+    return name.rpartition("/")[0]
+
+
+class UniformShuffle:
+    """Every order equally likely, for folders of up to EXPLICIT_MAX_SIZE tracks.
+
+    Larger folders get a constant-memory permutation that is well mixed but
+    not exactly uniform (see permutation.seeded_permutation).
+    """
+
+    name = "uniform"
+    label = "Random"
+
+    def order(self, names: Sequence[str], seed: int, play_counts: Mapping[str, int]) -> Sequence[int]:
+        """Seeded permutation (see SeededShuffle)."""
+        return SeededShuffle(len(names), seed)
+
+
+class SpreadShuffle:
+    """Spreads each group (subfolder, or artist via group_of) evenly over the order.
+
+    Each group of k tracks is shuffled internally and its tracks are placed
+    near evenly spaced points 1/k apart, starting at a random offset, with a
+    little jitter; sorting all tracks by their point interleaves the groups,
+    so tracks from the same album or artist rarely play back to back.
+    O(n log n).
+    """
+
+    name = "spread"
+    label = "Spread folders"
+
+    def __init__(self, group_of: Callable[[str], str] = _folder_of) -> None:
+        """Initialize the strategy.
+
+        Args:
+            group_of: Maps a track name to its group key; defaults to the
+                track's subfolder.
+        """
+        self._group_of = group_of
+
+    def order(self, names: Sequence[str], seed: int, play_counts: Mapping[str, int]) -> Sequence[int]:
+        """Interleaved order with same-group tracks kept apart."""
+        rng = random.Random(seed)
+        groups: dict[str, list[int]] = defaultdict(list)
+        for index, name in enumerate(names):
+            groups[self._group_of(name)].append(index)
+
+        keyed: list[tuple[float, int]] = []
+        for members in groups.values():
+            rng.shuffle(members)
+            spacing = 1.0 / len(members)
+            point = rng.random() * spacing
+            for index in members:
+                keyed.append((point + (rng.random() - 0.5) * spacing * 0.2, index))
+                point += spacing
+        keyed.sort()
+        return array("I", (index for _point, index in keyed))
+
+
+class WeightedShuffle:
+    """Favours often-played tracks: weight 1 + play count.
+
+    Weighted random order without replacement (Efraimidis-Spirakis): each
+    track gets key log(u) / weight for u uniform in (0, 1], and tracks are
+    sorted by key, largest first. O(n log n).
+    """
+
+    name = "weighted"
+    label = "Favour most played"
+
+    def order(self, names: Sequence[str], seed: int, play_counts: Mapping[str, int]) -> Sequence[int]:
+        """Order where heavier tracks tend to come first."""
+        rng = random.Random(seed)
+        log = math.log
+        keys = [
+            log(1.0 - rng.random()) / (1 + play_counts.get(name, 0))
+            for name in names
+        ]
+        return array("I", sorted(range(len(names)), key=keys.__getitem__, reverse=True))
+
+
+STRATEGIES: dict[str, ShuffleStrategy] = {
+    strategy.name: strategy
+    for strategy in (UniformShuffle(), SpreadShuffle(), WeightedShuffle())
+}
+
+
+def get_strategy(name: str) -> ShuffleStrategy:
+    """Look up a strategy by name.
+
+    Args:
+        name: Strategy name (a key of STRATEGIES).
+
+    Returns:
+        The strategy, or the uniform strategy for unknown names.
+    """
+    return STRATEGIES.get(name, STRATEGIES[DEFAULT_STRATEGY])
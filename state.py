@@ -1,22 +1,170 @@
 """State persistence for the Song Folder Player."""
 
+import base64
+import hashlib
 import io
 import json
 import logging
 import msvcrt
 import os
+import sqlite3
+import sys
 import tempfile
+import time
+import zlib
+from array import array
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Protocol, overload
+
+from .permutation import SeededShuffle
 
 logger = logging.getLogger(__name__)
 
 APP_DIR = Path(os.environ["APPDATA"]) / "SongFolderPlayer"
 STATE_FILE = APP_DIR / "state.json"
+PLAYLISTS_DIR = APP_DIR / "playlists"  # One shard file per folder's PlaylistState
+STATE_DB = APP_DIR / "state.db"  # SQLite backend (see SqliteStateBackend)
+STATE_BACKEND_ENV = "SONG_FOLDER_PLAYER_STATE"  # "json" (default) or "sqlite"
 LOCK_FILE = APP_DIR / "state.lock"
 LOG_FILE = APP_DIR / "app.log"
 MAX_RECENT_FOLDERS = 20
+SAVE_DELAY_S = 1.0  # Quiet period before a dirty state is written
+SAVE_MAX_LATENCY_S = 10.0  # Longest a change may wait for a write under constant churn
+
+
+def fingerprint_names(names: Sequence[str]) -> str:
+    """Content fingerprint of a track list, in order.
+
+    Args:
+        names: Track names in file (natural sort) order.
+
+    Returns:
+        Hex digest identifying exactly this list of names.
+    """
+    return hashlib.sha1("\0".join(names).encode("utf-8")).hexdigest()
+
+
+def _pack(data: bytes) -> str:
+    return base64.b64encode(zlib.compress(data)).decode("ascii")
+
+
+def _unpack(text: str) -> bytes:
+    return zlib.decompress(base64.b64decode(text))
+
+
+class ShuffleOrder(Sequence[str]):
+    """A shuffle order stored as a permutation of the folder's file list.
+
+    Behaves as a read-only sequence of track names in shuffle order, but is
+    kept as the file list (names in natural sort order) plus a permutation
+    of indices into it, and a fingerprint of that list. This serializes
+    far smaller than one name per entry (names are compressed in sorted
+    order, where neighbours share long prefixes), and when the fingerprint
+    still matches the folder the permutation can be used as-is, without
+    resolving any names.
+
+    The permutation is either an explicit index list or a SeededShuffle,
+    which is saved as just its seed and swapped positions.
+    """
+
+    __slots__ = ("names", "permutation", "fingerprint", "_packed")
+
+    def __init__(
+        self, names: list[str], permutation: Sequence[int], fingerprint: str | None = None
+    ) -> None:
+        """Initialize the order.
+
+        Args:
+            names: Track names in file (natural sort) order.
+            permutation: Shuffle order as indices into names (a SeededShuffle,
+                or indices, stored as an array("I")); not modified afterwards
+                (the packed form is cached).
+            fingerprint: fingerprint_names(names), if already known.
+        """
+        self.names = names
+        if not isinstance(permutation, (SeededShuffle, array)):
+            permutation = array("I", permutation)
+        self.permutation: Sequence[int] = permutation
+        self.fingerprint = fingerprint if fingerprint is not None else fingerprint_names(names)
+        self._packed: dict[str, Any] | None = None
+
+    def __len__(self) -> int:
+        return len(self.permutation)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self.names[i] for i in self.permutation[index]]
+        return self.names[self.permutation[index]]
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self.names.__getitem__, self.permutation)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ShuffleOrder):
+            return self.fingerprint == other.fingerprint and self.permutation == other.permutation
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ShuffleOrder({len(self)} tracks, fingerprint={self.fingerprint[:8]})"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the compact JSON form (computed once, then cached)."""
+        if self._packed is None:
+            packed: dict[str, Any] = {"fingerprint": self.fingerprint}
+            if isinstance(self.permutation, SeededShuffle):
+                packed["seed"] = self.permutation.seed
+                packed["swaps"] = sorted(self.permutation.swaps.items())
+            else:
+                typecode = "H" if len(self.names) <= 0xFFFF else "I"
+                indices = array(typecode, self.permutation)
+                if sys.byteorder != "little":
+                    indices.byteswap()
+                packed["width"] = indices.itemsize
+                packed["permutation"] = _pack(indices.tobytes())
+            packed["names"] = _pack("\0".join(self.names).encode("utf-8"))
+            self._packed = packed
+        return self._packed
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ShuffleOrder":
+        """Create a ShuffleOrder from its compact form.
+
+        Raises:
+            ValueError: If the data is malformed or inconsistent.
+        """
+        try:
+            text = _unpack(data["names"]).decode("utf-8")
+            names = text.split("\0") if text else []
+            fingerprint = data["fingerprint"]
+            permutation: Sequence[int]
+            if "seed" in data:
+                swaps = {int(position): int(value) for position, value in data["swaps"]}
+                permutation = SeededShuffle(len(names), int(data["seed"]), swaps)
+            else:
+                indices = array("H" if data["width"] == 2 else "I")
+                indices.frombytes(_unpack(data["permutation"]))
+                if sys.byteorder != "little":
+                    indices.byteswap()
+                if indices and max(indices) >= len(names):
+                    raise ValueError("shuffle order index out of range")
+                permutation = indices if indices.typecode == "I" else array("I", indices)
+        except (KeyError, TypeError, zlib.error, UnicodeDecodeError) as e:
+            raise ValueError(f"malformed shuffle order: {e}") from e
+        order = cls(names, permutation, fingerprint)
+        order._packed = data
+        return order
 
 
 @dataclass
@@ -24,35 +172,63 @@ class PlaylistState:
     """State for a single playlist/folder."""
 
     current_filename: str = ""
-    shuffle_order: list[str] | None = None  # filenames in shuffle order; None = straight mode
+    # Track names in shuffle order (a list, or a compact ShuffleOrder); None = straight mode
+    shuffle_order: Sequence[str] | None = None
     loop_enabled: bool = True
     playback_position_ms: int = 0  # Position within current track
+    include_subfolders: bool = False  # Scan subfolders recursively
+    shuffle_seed: int | None = None  # Seed the current shuffle order was built from
+    shuffle_strategy: str = "uniform"  # Name of a shuffle.STRATEGIES entry
+    play_counts: dict[str, int] = field(default_factory=dict)  # Track name -> plays
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         return {
             "current_filename": self.current_filename,
-            "shuffle_order": self.shuffle_order,
+            "shuffle_order": _shuffle_order_to_json(self.shuffle_order),
             "loop_enabled": self.loop_enabled,
             "playback_position_ms": self.playback_position_ms,
+            "include_subfolders": self.include_subfolders,
+            "shuffle_seed": self.shuffle_seed,
+            "shuffle_strategy": self.shuffle_strategy,
+            "play_counts": dict(self.play_counts),
         }
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "PlaylistState":
         """Create PlaylistState from dictionary."""
         shuffle_order = data.get("shuffle_order")
+        if isinstance(shuffle_order, dict):
+            try:
+                shuffle_order = ShuffleOrder.from_dict(shuffle_order)
+            except ValueError:
+                logger.warning("discarding unreadable shuffle order", exc_info=True)
+                shuffle_order = None
         # Back-compat: old format stored integer indices — discard them since we
         # cannot convert without knowing which files were present at save time.
-        if shuffle_order and isinstance(shuffle_order[0], int):
+        elif shuffle_order and isinstance(shuffle_order[0], int):
             shuffle_order = None
         return cls(
             current_filename=data.get("current_filename", ""),
             shuffle_order=shuffle_order,
             loop_enabled=data.get("loop_enabled", True),
             playback_position_ms=data.get("playback_position_ms", 0),
+            include_subfolders=data.get("include_subfolders", False),
+            shuffle_seed=data.get("shuffle_seed"),
+            shuffle_strategy=data.get("shuffle_strategy", "uniform"),
+            play_counts=data.get("play_counts", {}),
         )
 
 
+def _shuffle_order_to_json(order: Sequence[str] | None) -> dict[str, Any] | list[str] | None:
+    """JSON form of a shuffle order: compact for ShuffleOrder, a name list otherwise."""
+    if order is None:
+        return None
+    if isinstance(order, ShuffleOrder):
+        return order.to_dict()
+    return list(order)
+
+
 @dataclass
 class AppState:
     """Application state containing recent folders and playlist states."""
@@ -61,16 +237,39 @@ class AppState:
     playlists: dict[str, PlaylistState] = field(default_factory=dict)
     volume: int = 100  # Global volume level (0-100)
     zoom_level: float = 1.2  # UI zoom level (1.0 = 100%)
+    fuzzy_search: bool = False  # Ranked fuzzy matching instead of substring
+    crossfade_ms: int = 0  # Fade between consecutive tracks (0 = off)
+    crossfade_curve: str = "equal_power"  # Fade curve name (see fade.CURVES)
+
+    # Loads one folder's PlaylistState on first use (set by load_state); None
+    # means playlists holds everything there is.
+    playlist_loader: Callable[[str], "PlaylistState | None"] | None = field(
+        default=None, repr=False, compare=False
+    )
+    # Last persisted form of each playlist, so save_state can skip unchanged ones.
+    saved_playlists: dict[str, dict[str, Any]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    # Last persisted global settings (used by SqliteStateBackend).
+    saved_globals: dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
+        data = self.to_global_dict()
+        data["playlists"] = {
+            folder: state.to_dict() for folder, state in self.playlists.items()
+        }
+        return data
+
+    def to_global_dict(self) -> dict[str, Any]:
+        """Convert the app-wide settings (everything but playlists) to a dictionary."""
         return {
-            "recent_folders": self.recent_folders,
-            "playlists": {
-                folder: state.to_dict() for folder, state in self.playlists.items()
-            },
+            "recent_folders": list(self.recent_folders),
             "volume": self.volume,
             "zoom_level": self.zoom_level,
+            "fuzzy_search": self.fuzzy_search,
+            "crossfade_ms": self.crossfade_ms,
+            "crossfade_curve": self.crossfade_curve,
         }
 
     @classmethod
@@ -84,11 +283,17 @@ class AppState:
         }
         volume = data.get("volume", 100)
         zoom_level = data.get("zoom_level", 1.2)
+        fuzzy_search = data.get("fuzzy_search", False)
+        crossfade_ms = data.get("crossfade_ms", 0)
+        crossfade_curve = data.get("crossfade_curve", "equal_power")
         return cls(
             recent_folders=recent_folders,
             playlists=playlists,
             volume=volume,
             zoom_level=zoom_level,
+            fuzzy_search=fuzzy_search,
+            crossfade_ms=crossfade_ms,
+            crossfade_curve=crossfade_curve,
         )
 
     def add_recent_folder(self, folder_path: str) -> None:
@@ -121,59 +326,571 @@ class AppState:
         """
         normalized = str(Path(folder_path).resolve())
         if normalized not in self.playlists:
-            self.playlists[normalized] = PlaylistState()
+            loaded = self.playlist_loader(normalized) if self.playlist_loader else None
+            if loaded is not None:
+                self.saved_playlists[normalized] = loaded.to_dict()
+            self.playlists[normalized] = loaded or PlaylistState()
         return self.playlists[normalized]
 
 
+def _playlist_file(folder: str) -> Path:
+    """Shard file holding one folder's PlaylistState.
+
+    Args:
+        folder: Normalized folder path.
+
+    Returns:
+        Path under PLAYLISTS_DIR named by a hash of the folder path.
+    """
+    digest = hashlib.sha1(folder.encode("utf-8")).hexdigest()
+    return PLAYLISTS_DIR / f"{digest}.json"
+
+
+def _load_playlist(folder: str) -> PlaylistState | None:
+    """Read one folder's PlaylistState shard.
+
+    Args:
+        folder: Normalized folder path.
+
+    Returns:
+        The saved state, or None if there is no (readable) shard for the folder.
+    """
+    path = _playlist_file(folder)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, OSError):
+        logger.warning("playlist state unreadable, starting fresh: %s", path, exc_info=True)
+        return None
+    if data.get("folder") != folder:
+        return None  # Hash collision or moved file; treat as absent
+    return PlaylistState.from_dict(data)
+
+
+def _write_json(path: Path, data: dict[str, Any], indent: int | None = 2) -> None:
+    """Write JSON atomically (temp file in the same folder, then replace).
+
+    Args:
+        path: Destination file.
+        data: JSON-serializable data.
+        indent: JSON indentation, or None for compact output.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix="state_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
 def load_state() -> AppState:
     """Load application state from disk.
 
+    Only the global settings file is read here; each folder's PlaylistState
+    is read from its shard on first use (AppState.get_playlist_state).
+    Playlists found inside an older single-file state.json are kept in
+    memory and moved to shards on the next save.
+
     Returns:
         AppState loaded from file, or new state if file doesn't exist.
     """
     if not STATE_FILE.exists():
-        return AppState()
+        return AppState(playlist_loader=_load_playlist)
 
     try:
         with open(STATE_FILE, "r", encoding="utf-8") as f:
             data = json.load(f)
-        return AppState.from_dict(data)
+        state = AppState.from_dict(data)
     except (json.JSONDecodeError, OSError):
         logger.warning("state file unreadable, starting fresh", exc_info=True)
-        return AppState()
+        state = AppState()
+    state.playlist_loader = _load_playlist
+    return state
 
 
 def save_state(state: AppState) -> None:
     """Save application state to disk atomically.
 
-    Uses write-to-temp-then-rename for atomic writes.
+    Writes a shard for each playlist whose state changed since it was last
+    loaded or saved (untouched folders are not rewritten) and deletes the
+    shards of folders dropped from state.playlists, then the small global
+    settings file. The global file goes last: when it replaces an
+    older single-file state.json, the playlists it held are already in
+    their shards.
 
     Args:
         state: AppState to save.
     """
-    # Write to temporary file first
-    fd, temp_path = tempfile.mkstemp(
-        dir=STATE_FILE.parent,
-        prefix="state_",
-        suffix=".tmp"
-    )
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(state.to_dict(), f, indent=2)
-
-        # Atomic rename (on Windows, need to remove target first)
-        if STATE_FILE.exists():
-            STATE_FILE.unlink()
-        Path(temp_path).rename(STATE_FILE)
+        dirty = [
+            (folder, data)
+            for folder, playlist in state.playlists.items()
+            if state.saved_playlists.get(folder) != (data := playlist.to_dict())
+        ]
+        if dirty:
+            PLAYLISTS_DIR.mkdir(parents=True, exist_ok=True)
+        for folder, data in dirty:
+            _write_json(_playlist_file(folder), {"folder": folder, **data}, indent=None)
+            state.saved_playlists[folder] = data
+
+        dropped = [folder for folder in state.saved_playlists if folder not in state.playlists]
+        for folder in dropped:
+            _playlist_file(folder).unlink(missing_ok=True)
+            del state.saved_playlists[folder]
+
+        _write_json(STATE_FILE, state.to_global_dict())
     except OSError:
         logger.error("failed to save state", exc_info=True)
-        try:
-            os.unlink(temp_path)
-        except OSError:
-            pass
         raise
 
 
+class StateBackend(Protocol):
+    """Storage for AppState; main picks one with select_backend()."""
+
+    def load(self) -> AppState:
+        """Load the state; playlists may be filled in lazily via playlist_loader."""
+        ...
+
+    def save(self, state: AppState) -> None:
+        """Persist the state, writing only what changed where possible.
+
+        Raises:
+            OSError: If the state cannot be written.
+        """
+        ...
+
+    def close(self) -> None:
+        """Release any open resources."""
+        ...
+
+
+class JsonStateBackend:
+    """The JSON files backend: state.json plus per-folder shards."""
+
+    def load(self) -> AppState:
+        """Load state with load_state()."""
+        return load_state()
+
+    def save(self, state: AppState) -> None:
+        """Save state with save_state()."""
+        save_state(state)
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def encode_shuffle_order(order: Sequence[str] | None) -> bytes | None:
+    """Pack a shuffle order into a compact blob.
+
+    A ShuffleOrder is stored in its compact form (marked by a leading "S");
+    a plain name list is joined with NUL (never part of a filename) and
+    zlib-compressed.
+
+    Args:
+        order: Track names in shuffle order, or None for straight mode.
+
+    Returns:
+        The blob, or None for straight mode.
+    """
+    if order is None:
+        return None
+    if isinstance(order, ShuffleOrder):
+        return b"S" + json.dumps(order.to_dict()).encode("ascii")
+    return zlib.compress("\0".join(order).encode("utf-8"))
+
+
+def decode_shuffle_order(blob: bytes | None) -> Sequence[str] | None:
+    """Unpack a blob made by encode_shuffle_order.
+
+    Args:
+        blob: Packed shuffle order, or None.
+
+    Returns:
+        Track names in shuffle order, or None for straight mode.
+
+    Raises:
+        ValueError: If the blob is malformed.
+    """
+    if blob is None:
+        return None
+    if blob[:1] == b"S":
+        return ShuffleOrder.from_dict(json.loads(blob[1:]))
+    text = zlib.decompress(blob).decode("utf-8")
+    return text.split("\0") if text else []
+
+
+# PlaylistState field (and to_dict() key) -> (column, field-to-column conversion)
+_PLAYLIST_COLUMNS: dict[str, tuple[str, Callable[[Any], Any]]] = {
+    "current_filename": ("current_filename", str),
+    "shuffle_order": ("shuffle_blob", encode_shuffle_order),
+    "loop_enabled": ("loop_enabled", int),
+    "playback_position_ms": ("playback_position_ms", int),
+    "include_subfolders": ("include_subfolders", int),
+    "shuffle_seed": ("shuffle_seed", lambda seed: seed),
+    "shuffle_strategy": ("shuffle_strategy", str),
+    "play_counts": ("play_counts", lambda counts: json.dumps(counts, sort_keys=True)),
+}
+
+_MISSING = object()  # Sentinel: setting never saved
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS playlists (
+    folder TEXT PRIMARY KEY,
+    current_filename TEXT NOT NULL DEFAULT '',
+    shuffle_blob BLOB,
+    loop_enabled INTEGER NOT NULL DEFAULT 1,
+    playback_position_ms INTEGER NOT NULL DEFAULT 0,
+    include_subfolders INTEGER NOT NULL DEFAULT 0,
+    shuffle_seed INTEGER,
+    shuffle_strategy TEXT NOT NULL DEFAULT 'uniform',
+    play_counts TEXT NOT NULL DEFAULT '{}'
+);
+"""
+_SCHEMA_VERSION = 2
+
+# Statements that bring a database from version (index + 1) to (index + 2)
+_UPGRADES = [
+    [
+        "ALTER TABLE playlists ADD COLUMN shuffle_seed INTEGER",
+        "ALTER TABLE playlists ADD COLUMN shuffle_strategy TEXT NOT NULL DEFAULT 'uniform'",
+        "ALTER TABLE playlists ADD COLUMN play_counts TEXT NOT NULL DEFAULT '{}'",
+    ],
+]
+
+
+class SqliteStateBackend:
+    """State in a single SQLite database in WAL mode.
+
+    Global settings are rows of a key/value table (JSON values) and each
+    folder is one row of the playlists table, with the shuffle order stored
+    as a compressed blob. save() compares against what was last loaded or
+    saved and updates only the changed columns, so the common
+    position-only update is a one-row, one-column transaction.
+
+    On first use, an existing state.json (and its per-folder shards) is
+    imported; the JSON files are left in place untouched. A failed import
+    is retried on the next connect.
+
+    A read-only backend (for instances without the instance lock) never
+    creates, imports into or upgrades the database; until the primary
+    instance has done so, it reads the JSON state instead.
+    """
+
+    def __init__(self, path: Path | None = None, read_only: bool = False) -> None:
+        """Initialize the backend; the database is opened on first load().
+
+        Args:
+            path: Database file (defaults to STATE_DB).
+            read_only: Open the database read-only (see class docstring).
+        """
+        self._path = path if path is not None else STATE_DB
+        self._read_only = read_only
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._open_read_only() if self._read_only else self._open()
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        """Open the database, creating, importing or upgrading it as needed."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; safe in WAL
+            with conn:
+                conn.executescript(_SCHEMA)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version == 0:
+                self._migrate_from_json(conn)
+            elif version < _SCHEMA_VERSION:
+                with conn:
+                    for statements in _UPGRADES[version - 1:]:
+                        for statement in statements:
+                            conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+        except BaseException:
+            conn.close()  # Not kept, so the next connect retries the import
+            raise
+        return conn
+
+    def _open_read_only(self) -> sqlite3.Connection:
+        """Open an existing, current database without writing to it.
+
+        Raises:
+            sqlite3.Error: If the database is missing or not yet imported or upgraded.
+        """
+        conn = sqlite3.connect(f"{self._path.as_uri()}?mode=ro", uri=True)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != _SCHEMA_VERSION:
+                raise sqlite3.OperationalError(f"state database at schema version {version}")
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _migrate_from_json(self, conn: sqlite3.Connection) -> None:
+        """Import state.json and all playlist shards, then stamp the schema version."""
+        state = load_state()
+        if PLAYLISTS_DIR.is_dir():
+            for shard in PLAYLISTS_DIR.glob("*.json"):
+                try:
+                    with open(shard, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    state.playlists.setdefault(data["folder"], PlaylistState.from_dict(data))
+                except (OSError, ValueError, KeyError, TypeError):
+                    logger.warning("skipping unreadable playlist shard: %s", shard, exc_info=True)
+        with conn:
+            self._write(conn, state)
+            conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+        if state.playlists or STATE_FILE.exists():
+            logger.info("migrated %d playlists from JSON state", len(state.playlists))
+
+    def load(self) -> AppState:
+        """Load global settings; playlists are read per folder on first use.
+
+        Returns:
+            AppState from the database, or new state if it cannot be read.
+        """
+        try:
+            conn = self._connect()
+            settings = {
+                key: json.loads(value)
+                for key, value in conn.execute("SELECT key, value FROM settings")
+            }
+        except (sqlite3.Error, ValueError):
+            if self._read_only:
+                logger.info("state database not ready, reading JSON state", exc_info=True)
+                return load_state()
+            logger.warning("state database unreadable, starting fresh", exc_info=True)
+            return AppState(playlist_loader=self._load_playlist)
+        state = AppState.from_dict(settings)
+        state.saved_globals = state.to_global_dict()
+        state.playlist_loader = self._load_playlist
+        return state
+
+    def _load_playlist(self, folder: str) -> PlaylistState | None:
+        """Read one folder's row, or None if there is none."""
+        try:
+            row = self._connect().execute(
+                "SELECT current_filename, shuffle_blob, loop_enabled, playback_position_ms,"
+                " include_subfolders, shuffle_seed, shuffle_strategy, play_counts"
+                " FROM playlists WHERE folder = ?",
+                (folder,),
+            ).fetchone()
+            if row is None:
+                return None
+            return PlaylistState(
+                current_filename=row[0],
+                shuffle_order=decode_shuffle_order(row[1]),
+                loop_enabled=bool(row[2]),
+                playback_position_ms=row[3],
+                include_subfolders=bool(row[4]),
+                shuffle_seed=row[5],
+                shuffle_strategy=row[6],
+                play_counts=json.loads(row[7]),
+            )
+        except (sqlite3.Error, zlib.error, ValueError):
+            logger.warning("playlist row unreadable, starting fresh: %s", folder, exc_info=True)
+            return None
+
+    def save(self, state: AppState) -> None:
+        """Write changed settings and changed playlist columns in one transaction.
+
+        Args:
+            state: AppState to save.
+
+        Raises:
+            OSError: If the database cannot be written.
+        """
+        try:
+            conn = self._connect()
+            with conn:
+                commit_snapshots = self._write(conn, state)
+            commit_snapshots()
+        except sqlite3.Error as e:
+            logger.error("failed to save state", exc_info=True)
+            raise OSError(f"state database write failed: {e}") from e
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, state: AppState) -> Callable[[], None]:
+        """Issue the statements for everything that differs from the saved snapshots.
+
+        Returns:
+            Function that records the written data as the new snapshots; call
+            it only once the caller's transaction has committed.
+        """
+        globals_now = state.to_global_dict()
+        changed = [
+            (key, json.dumps(value))
+            for key, value in globals_now.items()
+            if state.saved_globals.get(key, _MISSING) != value
+        ]
+        if changed:
+            conn.executemany(
+                "INSERT INTO settings (key, value) VALUES (?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                changed,
+            )
+
+        written: dict[str, dict[str, Any]] = {}
+        for folder, playlist in state.playlists.items():
+            data = playlist.to_dict()
+            saved = state.saved_playlists.get(folder)
+            if saved == data:
+                continue
+            if saved is None:
+                conn.execute("INSERT OR IGNORE INTO playlists (folder) VALUES (?)", (folder,))
+            updates = [
+                (column, convert(getattr(playlist, key)))
+                for key, (column, convert) in _PLAYLIST_COLUMNS.items()
+                if saved is None or saved.get(key) != data[key]
+            ]
+            assignments = ", ".join(f"{column} = ?" for column, _value in updates)
+            conn.execute(
+                f"UPDATE playlists SET {assignments} WHERE folder = ?",
+                [value for _column, value in updates] + [folder],
+            )
+            written[folder] = data
+
+        def commit_snapshots() -> None:
+            state.saved_globals = globals_now
+            state.saved_playlists.update(written)
+
+        return commit_snapshots
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def select_backend(name: str | None = None, read_only: bool = False) -> StateBackend:
+    """Create the state backend chosen by name or the STATE_BACKEND_ENV variable.
+
+    Args:
+        name: "json" or "sqlite"; None reads STATE_BACKEND_ENV (default "json").
+        read_only: The caller will not save (it does not hold the instance
+            lock), so loading must not write either.
+
+    Returns:
+        The backend. Unknown names fall back to JSON with a warning.
+    """
+    if name is None:
+        name = os.environ.get(STATE_BACKEND_ENV, "json")
+    name = name.strip().lower()
+    if name == "sqlite":
+        return SqliteStateBackend(read_only=read_only)
+    if name != "json":
+        logger.warning("unknown state backend %r, using json", name)
+    return JsonStateBackend()
+
+
+class SaveScheduler:
+    """Coalesces state saves behind a dirty flag.
+
+    Callers mark the state dirty on every change. A write happens once
+    changes stop for `delay` seconds, or at the latest `max_latency` seconds
+    after the first unsaved change, so a steady stream of updates (e.g.
+    playback position) is still written regularly. Nothing is written while
+    the state is clean.
+
+    The scheduler has no timer of its own: the owner asks due_in() when to
+    call poll() next (the GUI uses root.after), which keeps it testable.
+    """
+
+    def __init__(
+        self,
+        save: Callable[[], None],
+        delay: float = SAVE_DELAY_S,
+        max_latency: float = SAVE_MAX_LATENCY_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            save: Performs the actual write; may raise OSError.
+            delay: Quiet period in seconds before writing.
+            max_latency: Upper bound in seconds from first change to write.
+            clock: Monotonic time source (injectable for tests).
+        """
+        self._save = save
+        self._delay = delay
+        self._max_latency = max_latency
+        self._clock = clock
+        self._first_dirty: float | None = None
+        self._last_dirty: float = 0.0
+
+    @property
+    def dirty(self) -> bool:
+        """True if there are changes not yet written."""
+        return self._first_dirty is not None
+
+    def mark_dirty(self) -> None:
+        """Record that the state changed and needs writing."""
+        now = self._clock()
+        if self._first_dirty is None:
+            self._first_dirty = now
+        self._last_dirty = now
+
+    def due_in(self) -> float | None:
+        """Seconds until poll() would write, or None if the state is clean."""
+        if self._first_dirty is None:
+            return None
+        due = min(self._last_dirty + self._delay, self._first_dirty + self._max_latency)
+        return max(0.0, due - self._clock())
+
+    def poll(self) -> bool:
+        """Write the state if it is dirty and due.
+
+        Returns:
+            True if a write happened.
+        """
+        remaining = self.due_in()
+        if remaining is None or remaining > 0:
+            return False
+        return self.flush()
+
+    def flush(self) -> bool:
+        """Write the state now if it is dirty.
+
+        If the write raises, the state stays dirty and the latency window
+        restarts, so a failing disk is retried without busy-looping.
+
+        Returns:
+            True if a write happened.
+        """
+        if self._first_dirty is None:
+            return False
+        started = self._clock()
+        try:
+            self._save()
+        except BaseException:
+            self._first_dirty = self._last_dirty = self._clock()
+            raise
+        # Changes marked during the write (none on a single thread) stay dirty.
+        if self._last_dirty <= started:
+            self._first_dirty = None
+        return True
+
+
 def acquire_lock() -> io.TextIOWrapper | None:
     """Try to acquire an exclusive lock for state writing.
 
@@ -0,0 +1,208 @@
+"""Tests for PlaybackEngine sequencing, driven by FakeBackend."""
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+import song_folder_player.state as state_module
+from song_folder_player.engine import FakeBackend, PlaybackEngine
+from song_folder_player.events import PlayerEventBus
+from song_folder_player.playlist import PlaylistController
+from song_folder_player.state import AppState, PlaylistState, SaveScheduler, save_state
+
+ROOT = Path("C:/Music")
+
+
+def make_engine(
+    names: list[str],
+    current: str = "",
+    loop: bool = True,
+    position_ms: int = 0,
+    track_ms: int = 1000,
+) -> tuple[PlaybackEngine, FakeBackend, list[Path | None]]:
+    playlist = PlaylistController()
+    state = PlaylistState(
+        current_filename=current, loop_enabled=loop, playback_position_ms=position_ms
+    )
+    playlist.load([ROOT / n for n in names], state, root=ROOT)
+    backend = FakeBackend(track_ms=track_ms)
+    changes: list[Path | None] = []
+    engine = PlaybackEngine(playlist, backend, on_track_change=changes.append)
+    return engine, backend, changes
+
+
+class TestPlayAt:
+    def test_plays_and_reports_track(self) -> None:
+        engine, backend, changes = make_engine(["a.mp3", "b.mp3"])
+        assert engine.play_at(1)
+        assert backend.get_current_file() == ROOT / "b.mp3"
+        assert changes == [ROOT / "b.mp3"]
+
+    def test_records_play_and_requests_save(self) -> None:
+        playlist = PlaylistController()
+        state = PlaylistState()
+        playlist.load([ROOT / "a.mp3"], state, root=ROOT)
+        saves: list[None] = []
+        engine = PlaybackEngine(playlist, FakeBackend(), on_state_change=lambda: saves.append(None))
+        engine.play_at(0)
+        assert state.play_counts == {"a.mp3": 1}
+        assert saves == [None]
+
+    def test_preloads_next_track(self) -> None:
+        engine, backend, _ = make_engine(["a.mp3", "b.mp3", "c.mp3"])
+        engine.play_at(0)
+        backend.tick(1000)
+        assert backend.preload_hits == 1
+
+    def test_without_backend_does_nothing(self) -> None:
+        playlist = PlaylistController()
+        playlist.load([ROOT / "a.mp3"], PlaylistState(), root=ROOT)
+        assert not PlaybackEngine(playlist).play_at(0)
+
+
+class TestTrackEnd:
+    def test_end_advances(self) -> None:
+        engine, backend, changes = make_engine(["a.mp3", "b.mp3", "c.mp3"])
+        engine.play_at(0)
+        backend.tick(2500)
+        assert changes == [ROOT / "a.mp3", ROOT / "b.mp3", ROOT / "c.mp3"]
+        assert backend.get_time() == 500
+
+    def test_end_wraps_with_loop(self) -> None:
+        engine, backend, changes = make_engine(["a.mp3", "b.mp3"], current="b.mp3")
+        engine.play_at(1)
+        backend.tick(1000)
+        assert changes[-1] == ROOT / "a.mp3"
+
+    def test_end_stops_without_loop(self) -> None:
+        engine, backend, changes = make_engine(["a.mp3", "b.mp3"], current="b.mp3", loop=False)
+        engine.play_at(1)
+        backend.tick(5000)
+        assert changes[-1] is None
+        assert backend.get_current_file() is None
+        assert backend.ends == 1
+
+    def test_queued_bus_advances_on_drain(self) -> None:
+        pending: list[Callable[[], None]] = []
+        playlist = PlaylistController()
+        playlist.load([ROOT / "a.mp3", ROOT / "b.mp3"], PlaylistState(), root=ROOT)
+        backend = FakeBackend(track_ms=1000, events=PlayerEventBus(lambda ms, cb: pending.append(cb)))
+        engine = PlaybackEngine(playlist, backend)
+        engine.play_at(0)
+        backend.tick(3000)  # Ends a.mp3; the rest waits for the engine
+        assert backend.get_current_file() == ROOT / "a.mp3"
+        pending.pop()()
+        assert backend.get_current_file() == ROOT / "b.mp3"
+        assert backend.get_time() == 0
+
+
+class TestNavigation:
+    def test_next_and_previous(self) -> None:
+        engine, backend, _ = make_engine(["a.mp3", "b.mp3", "c.mp3"], current="b.mp3")
+        engine.play_next()
+        assert backend.get_current_file() == ROOT / "c.mp3"
+        engine.play_previous()
+        engine.play_previous()
+        assert backend.get_current_file() == ROOT / "a.mp3"
+
+    def test_stop_reports_none(self) -> None:
+        engine, backend, changes = make_engine(["a.mp3"])
+        engine.play_at(0)
+        engine.stop()
+        assert changes[-1] is None
+        assert not backend.is_playing()
+
+
+class TestResume:
+    def test_load_current_paused_seeks_to_saved_position(self) -> None:
+        engine, backend, changes = make_engine(
+            ["a.mp3", "b.mp3"], current="b.mp3", position_ms=400
+        )
+        assert engine.load_current_paused()
+        assert changes == [ROOT / "b.mp3"]
+        assert not backend.is_playing()
+        assert backend.get_time() == 400
+
+    def test_load_without_saved_position_starts_at_zero(self) -> None:
+        engine, backend, _ = make_engine(["a.mp3"], current="a.mp3")
+        engine.load_current_paused()
+        assert backend.get_time() == 0
+
+    def test_play_after_resume_starts_at_zero(self) -> None:
+        engine, backend, _ = make_engine(["a.mp3", "b.mp3"], current="a.mp3", position_ms=400)
+        engine.load_current_paused()
+        engine.play_at(1)
+        assert backend.get_time() == 0
+
+    def test_capture_position(self) -> None:
+        engine, backend, _ = make_engine(["a.mp3"], track_ms=10_000)
+        engine.play_at(0)
+        backend.tick(1234)
+        assert engine.capture_position()
+        assert not engine.capture_position()  # Unchanged
+
+
+class TestFolderSwitch:
+    @pytest.fixture(autouse=True)
+    def state_files(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(state_module, "STATE_FILE", tmp_path / "state.json")
+        monkeypatch.setattr(state_module, "PLAYLISTS_DIR", tmp_path / "playlists")
+
+    def test_switching_folders_with_a_pending_save_keeps_outgoing_state(
+        self, tmp_path: Path
+    ) -> None:
+        folder_a, folder_b = str(tmp_path / "a"), str(tmp_path / "b")
+        app = AppState()
+        playlist = PlaylistController()
+        backend = FakeBackend(track_ms=10_000)
+        engine = PlaybackEngine(playlist, backend)
+
+        def write() -> None:  # What the GUI's save timer does
+            playlist.sync_to_state()
+            save_state(app)
+
+        scheduler = SaveScheduler(write, clock=lambda: 0.0)
+        playlist.load(
+            [Path(folder_a) / n for n in ("1.mp3", "2.mp3", "3.mp3")],
+            app.get_playlist_state(folder_a),
+            root=Path(folder_a),
+        )
+        engine.play_at(1)
+        backend.tick(1500)
+        scheduler.mark_dirty()  # Not yet written when the next folder opens
+
+        assert engine.sync_state()  # Scan of the next folder starts
+        backend.tick(10_000)  # The old folder plays on into its next track
+        scheduler.mark_dirty()
+        assert engine.sync_state()  # Scan finished; about to load the new folder
+        playlist.load(
+            [Path(folder_b) / "x.mp3"], app.get_playlist_state(folder_b), root=Path(folder_b)
+        )
+        scheduler.flush()
+
+        saved = state_module._load_playlist(str(Path(folder_a).resolve()))
+        assert saved is not None
+        assert saved.current_filename == "3.mp3"
+        assert saved.playback_position_ms == 1500
+
+    def test_sync_state_without_a_playlist_does_nothing(self) -> None:
+        engine = PlaybackEngine(PlaylistController(), FakeBackend())
+        assert not engine.sync_state()
+
+
+class TestManyTransitions:
+    def test_shuffled_loop_plays_every_track_each_cycle(self) -> None:
+        names = [f"{i:03d}.mp3" for i in range(50)]
+        playlist = PlaylistController()
+        playlist.load([ROOT / n for n in names], PlaylistState(), root=ROOT)
+        playlist.enable_shuffle(seed=7)
+        backend = FakeBackend(track_ms=10)
+        changes: list[Path | None] = []
+        engine = PlaybackEngine(playlist, backend, on_track_change=changes.append)
+        engine.play_at(0)
+        backend.tick(10 * 50 * 3 - 1)
+        played = [p for p in changes if p is not None]
+        assert len(played) == 150
+        assert set(played[:50]) == {ROOT / n for n in names}
+        assert backend.preload_hits == 149
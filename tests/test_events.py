@@ -0,0 +1,128 @@
+"""Tests for PlayerEventBus: batching, coalescing and drain scheduling."""
+
+import threading
+from typing import Any, Callable
+
+from song_folder_player.events import EVENT_END, EVENT_PROGRESS, PlayerEventBus
+
+
+class FakeLoop:
+    """Collects scheduled drains instead of running a Tk loop."""
+
+    def __init__(self) -> None:
+        self.scheduled: list[tuple[int, Callable[[], None]]] = []
+
+    def after(self, delay_ms: int, callback: Callable[[], None]) -> None:
+        self.scheduled.append((delay_ms, callback))
+
+    def run(self) -> None:
+        pending, self.scheduled = self.scheduled, []
+        for _delay, callback in pending:
+            callback()
+
+
+def recorder(bus: PlayerEventBus, *kinds: str) -> list[tuple[Any, ...]]:
+    seen: list[tuple[Any, ...]] = []
+    for kind in kinds:
+        bus.subscribe(kind, lambda *args, kind=kind: seen.append((kind, *args)))
+    return seen
+
+
+class TestScheduledBus:
+    def test_events_wait_for_drain(self) -> None:
+        loop = FakeLoop()
+        bus = PlayerEventBus(schedule=loop.after)
+        seen = recorder(bus, EVENT_END)
+        bus.post(EVENT_END)
+        assert seen == []
+        loop.run()
+        assert seen == [(EVENT_END,)]
+
+    def test_burst_arms_one_drain(self) -> None:
+        loop = FakeLoop()
+        bus = PlayerEventBus(schedule=loop.after, delay_ms=lambda: 100)
+        for t in range(50):
+            bus.post(EVENT_PROGRESS, t, 1000, True)
+        assert len(loop.scheduled) == 1
+        assert loop.scheduled[0][0] == 100
+
+    def test_progress_is_coalesced_to_latest(self) -> None:
+        loop = FakeLoop()
+        bus = PlayerEventBus(schedule=loop.after)
+        seen = recorder(bus, EVENT_PROGRESS)
+        for t in range(5):
+            bus.post(EVENT_PROGRESS, t, 1000, True)
+        loop.run()
+        assert seen == [(EVENT_PROGRESS, 4, 1000, True)]
+
+    def test_urgent_event_drains_sooner(self) -> None:
+        loop = FakeLoop()
+        bus = PlayerEventBus(schedule=loop.after, delay_ms=lambda: 1000)
+        bus.post(EVENT_PROGRESS, 1, 1000, True)
+        bus.post(EVENT_END)
+        assert [delay for delay, _cb in loop.scheduled] == [1000, 0]
+
+    def test_order_is_kept_across_kinds(self) -> None:
+        loop = FakeLoop()
+        bus = PlayerEventBus(schedule=loop.after)
+        seen = recorder(bus, EVENT_END, EVENT_PROGRESS)
+        bus.post(EVENT_PROGRESS, 1, 10, True)
+        bus.post(EVENT_END)
+        bus.post(EVENT_PROGRESS, 0, 20, True)
+        loop.run()
+        assert seen == [(EVENT_END,), (EVENT_PROGRESS, 0, 20, True)]
+
+    def test_post_after_drain_rearms(self) -> None:
+        loop = FakeLoop()
+        bus = PlayerEventBus(schedule=loop.after)
+        seen = recorder(bus, EVENT_END)
+        bus.post(EVENT_END)
+        loop.run()
+        bus.post(EVENT_END)
+        assert len(loop.scheduled) == 1
+        loop.run()
+        assert len(seen) == 2
+
+    def test_extra_drain_is_harmless(self) -> None:
+        bus = PlayerEventBus(schedule=FakeLoop().after)
+        bus.drain()
+        assert len(bus) == 0
+
+    def test_failing_handler_does_not_stop_batch(self) -> None:
+        loop = FakeLoop()
+        bus = PlayerEventBus(schedule=loop.after)
+
+        def broken() -> None:
+            raise RuntimeError("boom")
+
+        bus.subscribe(EVENT_END, broken)
+        seen = recorder(bus, EVENT_END)
+        bus.post(EVENT_END)
+        loop.run()
+        assert seen == [(EVENT_END,)]
+
+    def test_posts_from_many_threads_are_all_delivered(self) -> None:
+        loop = FakeLoop()
+        bus = PlayerEventBus(schedule=loop.after, coalesce=())
+        seen = recorder(bus, EVENT_END)
+
+        def post_many() -> None:
+            for _ in range(1000):
+                bus.post(EVENT_END)
+
+        threads = [threading.Thread(target=post_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        loop.run()
+        assert len(seen) == 4000
+
+
+class TestDirectBus:
+    def test_dispatches_on_post(self) -> None:
+        bus = PlayerEventBus()
+        seen = recorder(bus, EVENT_END, EVENT_PROGRESS)
+        bus.post(EVENT_PROGRESS, 1, 2, False)
+        bus.post(EVENT_END)
+        assert seen == [(EVENT_PROGRESS, 1, 2, False), (EVENT_END,)]
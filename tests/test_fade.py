@@ -0,0 +1,101 @@
+"""Tests for crossfade curves and the fade timer."""
+
+import threading
+
+import pytest
+
+from song_folder_player.fade import CURVES, DEFAULT_CURVE, get_curve, run_fade
+
+
+@pytest.mark.parametrize("name", list(CURVES))
+class TestEveryCurve:
+    def test_endpoints(self, name: str) -> None:
+        curve = CURVES[name]
+        assert curve(0.0) == pytest.approx((1.0, 0.0))
+        assert curve(1.0) == pytest.approx((0.0, 1.0), abs=1e-12)
+
+    def test_monotonic(self, name: str) -> None:
+        gains = [CURVES[name](i / 20) for i in range(21)]
+        outs = [g[0] for g in gains]
+        ins = [g[1] for g in gains]
+        assert outs == sorted(outs, reverse=True)
+        assert ins == sorted(ins)
+
+    def test_symmetric(self, name: str) -> None:
+        curve = CURVES[name]
+        for t in (0.1, 0.25, 0.4):
+            assert curve(t)[0] == pytest.approx(curve(1.0 - t)[1])
+
+
+def test_equal_power_keeps_power_constant() -> None:
+    for i in range(11):
+        out_gain, in_gain = CURVES["equal_power"](i / 10)
+        assert out_gain**2 + in_gain**2 == pytest.approx(1.0)
+
+
+def test_unknown_curve_falls_back_to_default() -> None:
+    assert get_curve("nope") is CURVES[DEFAULT_CURVE]
+
+
+class FakeClock:
+    """Clock advanced by the waits run_fade makes (cancel.wait is replaced)."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SteppingEvent(threading.Event):
+    """Event whose wait() advances a FakeClock instead of sleeping."""
+
+    def __init__(self, clock: FakeClock, lag: float = 0.0) -> None:
+        super().__init__()
+        self.clock = clock
+        self.lag = lag
+
+    def wait(self, timeout: float | None = None) -> bool:
+        self.clock.now += (timeout or 0.0) + self.lag
+        return self.is_set()
+
+
+class TestRunFade:
+    def test_steps_rise_to_one(self) -> None:
+        clock = FakeClock()
+        steps: list[float] = []
+        assert run_fade(1.0, steps.append, SteppingEvent(clock), 0.1, clock)
+        assert steps[0] == 0.0
+        assert steps[-1] == 1.0
+        assert steps == sorted(steps)
+        assert abs(len(steps) - 11) <= 1  # One step per 0.1 s, give or take rounding
+
+    def test_late_wakeups_do_not_stretch_the_fade(self) -> None:
+        clock = FakeClock()
+        steps: list[float] = []
+        run_fade(1.0, steps.append, SteppingEvent(clock, lag=0.03), 0.1, clock)
+        assert clock.now == pytest.approx(1.0, abs=0.15)
+        assert steps[-1] == 1.0
+
+    def test_zero_duration_jumps_to_end(self) -> None:
+        steps: list[float] = []
+        assert run_fade(0.0, steps.append, threading.Event())
+        assert steps == [1.0]
+
+    def test_cancel_stops_early(self) -> None:
+        clock = FakeClock()
+        cancel = SteppingEvent(clock)
+        steps: list[float] = []
+
+        def step(t: float) -> None:
+            steps.append(t)
+            if t >= 0.5:
+                cancel.set()
+
+        assert not run_fade(1.0, step, cancel, 0.1, clock)
+        assert steps[-1] < 1.0
+
+    def test_real_clock_completes(self) -> None:
+        steps: list[float] = []
+        assert run_fade(0.05, steps.append, threading.Event(), 0.01)
+        assert steps[-1] == 1.0
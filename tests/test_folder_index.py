@@ -0,0 +1,166 @@
+"""Tests for folder_index: cached scans validated by directory mtime/inode."""
+
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+import song_folder_player.folder_index as folder_index
+from song_folder_player.folder_index import scan_folder_cached
+from song_folder_player.media_utils import natural_name_key, scan_folder
+
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "index"
+    monkeypatch.setattr(folder_index, "INDEX_DIR", path)
+    return path
+
+
+@pytest.fixture
+def music(tmp_path: Path) -> Path:
+    path = tmp_path / "music"
+    path.mkdir()
+    return path
+
+
+def touch_dir(path: Path) -> None:
+    """Bump a directory's mtime so the change is visible on coarse clocks."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def forbid_listing(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*args: object) -> None:
+        raise AssertionError("directory was relisted")
+    monkeypatch.setattr(folder_index, "_list_directory", fail)
+
+
+class TestScanFolderCached:
+    def test_matches_scan_folder(self, music: Path) -> None:
+        for name in ("track10.mp3", "track2.mp3", "track1.mp3", "cover.jpg"):
+            (music / name).touch()
+        assert scan_folder_cached(music) == scan_folder(music)
+
+    def test_writes_index(self, music: Path, index_dir: Path) -> None:
+        (music / "song.mp3").touch()
+        scan_folder_cached(music)
+        assert len(list(index_dir.glob("*.json"))) == 1
+
+    def test_unchanged_folder_is_not_relisted(self, music: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        (music / "b.mp3").touch()
+        (music / "a.mp3").touch()
+        first = scan_folder_cached(music)
+        forbid_listing(monkeypatch)
+        assert scan_folder_cached(music) == first
+
+    def test_changed_folder_is_rescanned(self, music: Path) -> None:
+        (music / "a.mp3").touch()
+        scan_folder_cached(music)
+        (music / "b.mp3").touch()
+        touch_dir(music)
+        assert [f.name for f in scan_folder_cached(music)] == ["a.mp3", "b.mp3"]
+
+    def test_corrupt_index_falls_back_to_scan(self, music: Path, index_dir: Path) -> None:
+        (music / "a.mp3").touch()
+        scan_folder_cached(music)
+        for path in index_dir.glob("*.json"):
+            path.write_text("{not json", encoding="utf-8")
+        assert [f.name for f in scan_folder_cached(music)] == ["a.mp3"]
+
+    def test_nonexistent_folder(self, tmp_path: Path) -> None:
+        assert scan_folder_cached(tmp_path / "missing") == []
+
+    def test_cancelled_scan_returns_nothing_and_skips_index(self, music: Path, index_dir: Path) -> None:
+        (music / "a.mp3").touch()
+        cancel = threading.Event()
+        cancel.set()
+        assert scan_folder_cached(music, cancel=cancel) == []
+        assert not index_dir.exists()
+
+
+class TestScanFolderCachedRecursive:
+    def make_tree(self, music: Path) -> None:
+        for rel in ("disc10/01.mp3", "disc2/01.mp3", "disc2/02.mp3", "intro.mp3"):
+            path = music / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+
+    def test_matches_recursive_scan_folder(self, music: Path) -> None:
+        self.make_tree(music)
+        assert scan_folder_cached(music, recursive=True) == scan_folder(music, recursive=True)
+
+    def test_only_changed_subfolder_is_relisted(self, music: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.make_tree(music)
+        scan_folder_cached(music, recursive=True)
+        (music / "disc2" / "03.mp3").touch()
+        touch_dir(music / "disc2")
+
+        relisted: list[Path] = []
+        original = folder_index._list_directory
+
+        def spy(path: Path, *args: object) -> object:
+            relisted.append(path)
+            return original(path, *args)  # type: ignore[arg-type]
+        monkeypatch.setattr(folder_index, "_list_directory", spy)
+
+        result = scan_folder_cached(music, recursive=True)
+        assert relisted == [music / "disc2"]
+        assert music / "disc2" / "03.mp3" in result
+
+    def test_on_batch_reports_every_file(self, music: Path) -> None:
+        self.make_tree(music)
+        seen: list[Path] = []
+        result = scan_folder_cached(music, recursive=True, on_batch=seen.extend)
+        assert sorted(seen) == sorted(result)
+
+    def test_slow_directory_does_not_stall_the_rest_of_the_tree(
+        self, music: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        for rel in ("a/slow.mp3", "b/c/deep.mp3"):
+            path = music / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+        release = threading.Event()
+        deep_seen = threading.Event()
+        original = folder_index._list_directory
+
+        def slow_list(path: Path, *args: object) -> object:
+            if path.name == "a":
+                release.wait(5)
+            return original(path, *args)  # type: ignore[arg-type]
+        monkeypatch.setattr(folder_index, "_list_directory", slow_list)
+
+        def on_batch(batch: list[Path]) -> None:
+            if any(f.name == "deep.mp3" for f in batch):
+                deep_seen.set()
+
+        result: list[Path] = []
+        worker = threading.Thread(
+            target=lambda: result.extend(scan_folder_cached(music, True, on_batch))
+        )
+        worker.start()
+        try:
+            assert deep_seen.wait(5)  # Two levels down while "a" is still being listed
+        finally:
+            release.set()
+            worker.join(5)
+        assert [f.name for f in result] == ["slow.mp3", "deep.mp3"]
+
+    def test_symlink_loop_is_indexed_once(self, music: Path) -> None:
+        self.make_tree(music)
+        try:
+            (music / "disc2" / "loop").symlink_to(music, target_is_directory=True)
+        except OSError:
+            pytest.skip("symlinks not permitted")
+        expected = scan_folder(music, recursive=True)
+        assert scan_folder_cached(music, recursive=True) == expected
+        assert scan_folder_cached(music, recursive=True) == expected
+
+    def test_bulk_scan_bypasses_the_natural_key_cache(self, music: Path) -> None:
+        self.make_tree(music)
+        before = natural_name_key.cache_info()
+        scan_folder_cached(music, recursive=True)
+        after = natural_name_key.cache_info()
+        assert (after.hits, after.misses) == (before.hits, before.misses)
@@ -0,0 +1,94 @@
+"""Tests for media_cache.MediaCache: reuse, LRU eviction and release."""
+
+from pathlib import Path
+
+import pytest
+
+from song_folder_player.media_cache import MediaCache
+
+
+class FakeMedia:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.released = False
+
+
+class Factory:
+    """create/release pair recording every media object made."""
+
+    def __init__(self) -> None:
+        self.created: list[FakeMedia] = []
+
+    def create(self, path: Path) -> FakeMedia:
+        media = FakeMedia(path)
+        self.created.append(media)
+        return media
+
+    @staticmethod
+    def release(media: FakeMedia) -> None:
+        assert not media.released, "released twice"
+        media.released = True
+
+
+@pytest.fixture
+def factory() -> Factory:
+    return Factory()
+
+
+def make_cache(factory: Factory, capacity: int) -> MediaCache[FakeMedia]:
+    return MediaCache(factory.create, factory.release, capacity)
+
+
+class TestMediaCache:
+    def test_repeated_path_reuses_media(self, factory: Factory) -> None:
+        cache = make_cache(factory, 4)
+        first = cache.get(Path("a.mp3"))
+        assert cache.get(Path("a.mp3")) is first
+        assert len(factory.created) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used(self, factory: Factory) -> None:
+        cache = make_cache(factory, 2)
+        a = cache.get(Path("a.mp3"))
+        b = cache.get(Path("b.mp3"))
+        cache.get(Path("a.mp3"))  # b is now the oldest
+        cache.get(Path("c.mp3"))
+        assert Path("b.mp3") not in cache
+        assert Path("a.mp3") in cache
+        assert b.released and not a.released
+        assert cache.evictions == 1
+        assert len(cache) == 2
+
+    def test_looping_within_capacity_creates_each_media_once(self, factory: Factory) -> None:
+        cache = make_cache(factory, 8)
+        paths = [Path(f"{i}.mp3") for i in range(5)]
+        for _ in range(10):
+            for path in paths:
+                cache.get(path)
+        assert len(factory.created) == 5
+        assert cache.hits == 45
+
+    def test_clear_releases_everything(self, factory: Factory) -> None:
+        cache = make_cache(factory, 4)
+        for name in ("a.mp3", "b.mp3", "c.mp3"):
+            cache.get(Path(name))
+        cache.clear()
+        assert len(cache) == 0
+        assert all(media.released for media in factory.created)
+
+    def test_nothing_leaks_past_capacity(self, factory: Factory) -> None:
+        cache = make_cache(factory, 3)
+        for i in range(100):
+            cache.get(Path(f"{i}.mp3"))
+        live = [media for media in factory.created if not media.released]
+        assert len(live) == 3
+
+    def test_release_errors_are_logged_not_raised(self) -> None:
+        def release(media: FakeMedia) -> None:
+            raise RuntimeError("native error")
+
+        cache = MediaCache(FakeMedia, release, 1)
+        cache.get(Path("a.mp3"))
+        cache.get(Path("b.mp3"))
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,234 @@
+"""Tests for media_info: the per-folder info cache and the background scanner."""
+
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+import song_folder_player.media_info as media_info
+from song_folder_player.media_info import MediaInfo, MediaInfoCache, MediaInfoScanner
+
+
+@pytest.fixture(autouse=True)
+def info_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "media_info"
+    monkeypatch.setattr(media_info, "MEDIA_INFO_DIR", path)
+    return path
+
+
+@pytest.fixture
+def music(tmp_path: Path) -> Path:
+    path = tmp_path / "music"
+    path.mkdir()
+    for name in ("a.mp3", "b.mp3", "c.mp3"):
+        (path / name).write_bytes(b"x" * 10)
+    return path
+
+
+class FakeParser:
+    """Parse function returning the file size as the duration, counting calls."""
+
+    def __init__(self, fail: set[str] | None = None) -> None:
+        self.calls: list[str] = []
+        self.fail = fail or set()
+        self._lock = threading.Lock()
+
+    def __call__(self, path: Path) -> MediaInfo | None:
+        with self._lock:
+            self.calls.append(path.name)
+        if path.name in self.fail:
+            return None
+        return MediaInfo(duration_ms=path.stat().st_size * 1000, title=path.stem.upper())
+
+
+def run_scan(scanner: MediaInfoScanner, folder: Path) -> dict[int, MediaInfo]:
+    """Scan folder to completion and collect the reported info."""
+    names = sorted(p.name for p in folder.iterdir())
+    results: dict[int, MediaInfo] = {}
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def on_info(index: int, info: MediaInfo) -> None:
+        with lock:
+            results[index] = info
+
+    scanner.scan(folder, [folder / n for n in names], names, on_info, done.set)
+    assert done.wait(5)
+    return results
+
+
+class TestMediaInfo:
+    def test_search_text_joins_tags(self) -> None:
+        info = MediaInfo(1000, title="Song", artist="Band", album="")
+        assert info.search_text == "Band Song"
+
+    def test_search_text_empty_without_tags(self) -> None:
+        assert MediaInfo(1000).search_text == ""
+
+
+class TestMediaInfoCache:
+    def test_roundtrip(self, music: Path) -> None:
+        cache = MediaInfoCache(music)
+        cache.put("a.mp3", 10, 123, MediaInfo(5000, "T", "A", "B"))
+        cache.save()
+        loaded = MediaInfoCache.load(music)
+        assert loaded.get("a.mp3", 10, 123) == MediaInfo(5000, "T", "A", "B")
+
+    def test_changed_file_is_a_miss(self, music: Path) -> None:
+        cache = MediaInfoCache(music)
+        cache.put("a.mp3", 10, 123, MediaInfo(5000))
+        assert cache.get("a.mp3", 11, 123) is None
+        assert cache.get("a.mp3", 10, 124) is None
+
+    def test_save_drops_names_not_kept(self, music: Path) -> None:
+        cache = MediaInfoCache(music)
+        cache.put("a.mp3", 10, 1, MediaInfo(1))
+        cache.put("gone.mp3", 10, 1, MediaInfo(1))
+        cache.save(keep=["a.mp3"])
+        loaded = MediaInfoCache.load(music)
+        assert len(loaded) == 1
+
+    def test_unreadable_cache_is_empty(self, music: Path, info_dir: Path) -> None:
+        cache = MediaInfoCache(music)
+        cache.put("a.mp3", 10, 1, MediaInfo(1))
+        cache.save()
+        for path in info_dir.glob("*.json"):
+            path.write_text("{not json", encoding="utf-8")
+        assert len(MediaInfoCache.load(music)) == 0
+
+    def test_unchanged_cache_is_not_rewritten(self, music: Path, info_dir: Path) -> None:
+        cache = MediaInfoCache(music)
+        cache.put("a.mp3", 10, 1, MediaInfo(1))
+        cache.save()
+        (path,) = info_dir.glob("*.json")
+        mtime = path.stat().st_mtime_ns
+        os.utime(path, ns=(mtime - 10**9, mtime - 10**9))
+        MediaInfoCache.load(music).save()
+        assert path.stat().st_mtime_ns == mtime - 10**9
+
+
+class TestMediaInfoScanner:
+    def test_reports_every_track(self, music: Path) -> None:
+        scanner = MediaInfoScanner(FakeParser(), max_workers=2)
+        try:
+            results = run_scan(scanner, music)
+        finally:
+            scanner.close()
+        assert sorted(results) == [0, 1, 2]
+        assert results[0] == MediaInfo(10_000, title="A")
+
+    def test_second_scan_uses_cache(self, music: Path) -> None:
+        parser = FakeParser()
+        scanner = MediaInfoScanner(parser, max_workers=2)
+        try:
+            run_scan(scanner, music)
+            parser.calls.clear()
+            results = run_scan(scanner, music)
+        finally:
+            scanner.close()
+        assert parser.calls == []
+        assert len(results) == 3
+
+    def test_modified_file_is_reparsed(self, music: Path) -> None:
+        parser = FakeParser()
+        scanner = MediaInfoScanner(parser, max_workers=2)
+        try:
+            run_scan(scanner, music)
+            parser.calls.clear()
+            (music / "b.mp3").write_bytes(b"x" * 20)
+            results = run_scan(scanner, music)
+        finally:
+            scanner.close()
+        assert parser.calls == ["b.mp3"]
+        assert results[1].duration_ms == 20_000
+
+    def test_unparsable_files_are_skipped(self, music: Path) -> None:
+        scanner = MediaInfoScanner(FakeParser(fail={"b.mp3"}), max_workers=2)
+        try:
+            results = run_scan(scanner, music)
+        finally:
+            scanner.close()
+        assert sorted(results) == [0, 2]
+
+    def test_parse_errors_do_not_stop_the_scan(self, music: Path) -> None:
+        def parse(path: Path) -> MediaInfo:
+            if path.name == "a.mp3":
+                raise RuntimeError("broken file")
+            return MediaInfo(1)
+
+        scanner = MediaInfoScanner(parse, max_workers=1)
+        try:
+            results = run_scan(scanner, music)
+        finally:
+            scanner.close()
+        assert sorted(results) == [1, 2]
+
+    def test_new_scan_cancels_previous(self, music: Path, tmp_path: Path) -> None:
+        started = threading.Event()
+        release = threading.Event()
+        reported: list[str] = []
+
+        def slow_parse(path: Path) -> MediaInfo:
+            started.set()
+            release.wait(5)
+            return MediaInfo(1)
+
+        scanner = MediaInfoScanner(slow_parse, max_workers=1)
+        other = tmp_path / "other"
+        other.mkdir()
+        (other / "z.mp3").write_bytes(b"x")
+        done = threading.Event()
+        try:
+            names = ["a.mp3", "b.mp3", "c.mp3"]
+            scanner.scan(music, [music / n for n in names], names,
+                         lambda i, info: reported.append(names[i]))
+            assert started.wait(5)
+            scanner.scan(other, [other / "z.mp3"], ["z.mp3"],
+                         lambda i, info: reported.append("z.mp3"), done.set)
+            release.set()
+            assert done.wait(5)
+        finally:
+            scanner.close()
+        # The first scan stopped with the file it was parsing, unreported.
+        assert reported == ["z.mp3"]
+
+    def test_cancelled_scan_saves_progress_without_pruning(
+        self, music: Path, tmp_path: Path
+    ) -> None:
+        old = MediaInfoCache(music)
+        old.put("gone.mp3", 1, 1, MediaInfo(1))
+        old.save()
+        parsing_b = threading.Event()
+        release = threading.Event()
+
+        def parse(path: Path) -> MediaInfo:
+            if path.name == "b.mp3":
+                parsing_b.set()
+                release.wait(5)
+            return MediaInfo(1)
+
+        scanner = MediaInfoScanner(parse, max_workers=1)
+        other = tmp_path / "other"
+        other.mkdir()
+        done = threading.Event()
+        try:
+            names = ["a.mp3", "b.mp3", "c.mp3"]
+            scanner.scan(music, [music / n for n in names], names, lambda i, info: None)
+            assert parsing_b.wait(5)
+            # Runs on the same worker once the cancelled scan has finished.
+            scanner.scan(other, [], [], lambda i, info: None, done.set)
+            release.set()
+            assert done.wait(5)
+        finally:
+            scanner.close()
+
+        cache = MediaInfoCache.load(music)
+
+        def cached(name: str) -> bool:
+            st = os.stat(music / name)
+            return cache.get(name, st.st_size, st.st_mtime_ns) is not None
+
+        assert cached("a.mp3") and cached("b.mp3")
+        assert not cached("c.mp3")
+        assert cache.get("gone.mp3", 1, 1) is not None  # Not pruned by a partial scan
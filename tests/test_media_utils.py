@@ -1,5 +1,8 @@
 """Tests for media_utils: file filtering and natural sort."""
 
+import os
+import threading
+import time
 from pathlib import Path
 
 import pytest
@@ -7,8 +10,15 @@ import pytest
 from song_folder_player.media_utils import (
     MEDIA_EXTENSIONS,
     is_media_file,
+    iter_media_files,
+    natural_name_key,
     natural_sort_key,
+    natural_sorted,
     scan_folder,
+    scan_folders,
+    sort_names,
+    tree_sort_key,
+    walk_media_dirs,
 )
 
 
@@ -53,6 +63,27 @@ class TestNaturalSortKey:
         assert files[0].name == "a.mp3"
 
 
+    def test_key_is_hashable_tuple(self) -> None:
+        key = natural_sort_key(Path("Track10.flac"))
+        assert key == ("track", 10, ".flac")
+        assert hash(key) == hash(natural_name_key("track10.FLAC"))
+
+    def test_leading_digits(self) -> None:
+        assert natural_name_key("01 intro.ogg") == ("", 1, " intro.ogg")
+        assert sort_names(["10 b.mp3", "2 a.mp3", "intro.mp3"]) == ["2 a.mp3", "10 b.mp3", "intro.mp3"]
+
+
+class TestBulkSort:
+    def test_sort_names(self) -> None:
+        assert sort_names(["track10.mp3", "Track2.mp3", "track1.mp3"]) == [
+            "track1.mp3", "Track2.mp3", "track10.mp3"
+        ]
+
+    def test_natural_sorted_matches_key_sort(self) -> None:
+        paths = [Path("b/x10.mp3"), Path("a/x9.mp3"), Path("x1.mp3")]
+        assert natural_sorted(paths) == sorted(paths, key=natural_sort_key)
+
+
 class TestScanFolder:
     def test_returns_media_files_sorted(self, tmp_path: Path) -> None:
         for name in ("track10.mp3", "track2.mp3", "track1.mp3"):
@@ -80,3 +111,188 @@ class TestScanFolder:
 
     def test_nonexistent_folder(self, tmp_path: Path) -> None:
         assert scan_folder(tmp_path / "does_not_exist") == []
+
+    def test_ignores_directory_with_media_extension(self, tmp_path: Path) -> None:
+        (tmp_path / "song.mp3").touch()
+        (tmp_path / "album.flac").mkdir()
+        result = scan_folder(tmp_path)
+        assert [f.name for f in result] == ["song.mp3"]
+
+    def test_returns_full_paths(self, tmp_path: Path) -> None:
+        (tmp_path / "song.mp3").touch()
+        assert scan_folder(tmp_path) == [tmp_path / "song.mp3"]
+
+
+class TestScanFolders:
+    def test_scans_each_folder(self, tmp_path: Path) -> None:
+        a = tmp_path / "a"
+        b = tmp_path / "b"
+        a.mkdir()
+        b.mkdir()
+        (a / "track2.mp3").touch()
+        (a / "track10.mp3").touch()
+        (b / "song.flac").touch()
+        result = scan_folders([a, b], max_workers=2)
+        assert list(result) == [a, b]
+        assert [f.name for f in result[a]] == ["track2.mp3", "track10.mp3"]
+        assert [f.name for f in result[b]] == ["song.flac"]
+
+    def test_missing_folder_is_empty(self, tmp_path: Path) -> None:
+        (tmp_path / "song.mp3").touch()
+        result = scan_folders([tmp_path, tmp_path / "missing"], max_workers=2)
+        assert result[tmp_path / "missing"] == []
+
+
+def make_tree(root: Path, *relpaths: str) -> None:
+    """Create empty files (and their parent folders) below root."""
+    for rel in relpaths:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+
+_real_stat = os.stat
+
+
+def _stat_without_ids(path, *args, **kwargs):  # type: ignore[no-untyped-def]
+    """os.stat as on a filesystem that reports no inode or device numbers."""
+    st = list(_real_stat(path, *args, **kwargs))
+    st[1] = st[2] = 0  # st_ino, st_dev
+    return os.stat_result(st)
+
+
+class _EntryWithoutIds:
+    """A DirEntry whose stat() reports no inode or device, as on Windows."""
+
+    def __init__(self, entry: os.DirEntry[str]) -> None:
+        self._entry = entry
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_dir(self) -> bool:
+        return self._entry.is_dir()
+
+    def is_file(self) -> bool:
+        return self._entry.is_file()
+
+    def stat(self) -> os.stat_result:
+        return _stat_without_ids(self.path)
+
+
+class _Listing(list):  # type: ignore[type-arg]
+    """A scandir result usable as a context manager."""
+
+    def __enter__(self) -> "_Listing":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+
+class TestRecursiveScan:
+    def test_includes_nested_files_in_tree_order(self, tmp_path: Path) -> None:
+        make_tree(
+            tmp_path,
+            "artist/album/disc10/01.mp3",
+            "artist/album/disc2/01.mp3",
+            "artist/album/disc2/02.mp3",
+            "intro.mp3",
+        )
+        result = scan_folder(tmp_path, recursive=True)
+        assert [f.relative_to(tmp_path).as_posix() for f in result] == [
+            "artist/album/disc2/01.mp3",
+            "artist/album/disc2/02.mp3",
+            "artist/album/disc10/01.mp3",
+            "intro.mp3",
+        ]
+
+    def test_max_depth_limits_descent(self, tmp_path: Path) -> None:
+        make_tree(tmp_path, "top.mp3", "a/one.mp3", "a/b/two.mp3")
+        result = scan_folder(tmp_path, recursive=True, max_depth=1)
+        assert [f.relative_to(tmp_path).as_posix() for f in result] == ["a/one.mp3", "top.mp3"]
+
+    def test_max_depth_zero_is_top_level(self, tmp_path: Path) -> None:
+        make_tree(tmp_path, "top.mp3", "a/one.mp3")
+        assert scan_folder(tmp_path, recursive=True, max_depth=0) == [tmp_path / "top.mp3"]
+
+    def test_symlink_loop_is_walked_once(self, tmp_path: Path) -> None:
+        make_tree(tmp_path, "a/song.mp3")
+        try:
+            (tmp_path / "a" / "loop").symlink_to(tmp_path, target_is_directory=True)
+        except OSError:
+            pytest.skip("symlinks not permitted")
+        result = scan_folder(tmp_path, recursive=True)
+        assert [f.name for f in result] == ["song.mp3"]
+
+    def test_walks_siblings_when_entries_report_no_inode(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # On Windows, DirEntry.stat() reports st_ino = st_dev = 0 for every
+        # non-symlink entry.
+        real_scandir = os.scandir
+
+        def scandir_without_ids(path):  # type: ignore[no-untyped-def]
+            with real_scandir(path) as entries:
+                return _Listing([_EntryWithoutIds(e) for e in entries])
+
+        make_tree(tmp_path, "a/1.mp3", "b/2.mp3", "c/d/3.mp3")
+        monkeypatch.setattr(os, "scandir", scandir_without_ids)
+        result = scan_folder(tmp_path, recursive=True)
+        assert [f.name for f in result] == ["1.mp3", "2.mp3", "3.mp3"]
+
+    def test_walks_siblings_on_filesystem_without_inodes(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        make_tree(tmp_path, "a/1.mp3", "b/2.mp3", "c/d/3.mp3")
+        monkeypatch.setattr(os, "stat", _stat_without_ids)
+        result = scan_folder(tmp_path, recursive=True)
+        assert [f.name for f in result] == ["1.mp3", "2.mp3", "3.mp3"]
+
+    def test_symlink_loop_without_inodes_is_walked_once(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        make_tree(tmp_path, "a/song.mp3")
+        try:
+            (tmp_path / "a" / "loop").symlink_to(tmp_path, target_is_directory=True)
+        except OSError:
+            pytest.skip("symlinks not permitted")
+        monkeypatch.setattr(os, "stat", _stat_without_ids)
+        result = scan_folder(tmp_path, recursive=True)
+        assert [f.name for f in result] == ["song.mp3"]
+
+    def test_iter_streams_one_batch_per_directory(self, tmp_path: Path) -> None:
+        make_tree(tmp_path, "x.mp3", "a/y.mp3", "a/z.mp3", "b/notes.txt")
+        batches = list(iter_media_files(tmp_path, max_workers=2))
+        assert sorted(len(b) for b in batches) == [1, 2]
+
+    def test_iter_stops_when_cancelled(self, tmp_path: Path) -> None:
+        make_tree(tmp_path, "x.mp3", "a/y.mp3")
+        cancel = threading.Event()
+        cancel.set()
+        assert list(iter_media_files(tmp_path, cancel=cancel)) == []
+
+    def test_cancel_does_not_wait_for_a_blocked_listing(self, tmp_path: Path) -> None:
+        make_tree(tmp_path, "x.mp3")
+        release = threading.Event()
+        cancel = threading.Event()
+
+        def hanging_lister(folder: str, st: os.stat_result) -> tuple[list[Path], list[str]]:
+            release.wait(10)  # An unresponsive network share
+            return [], []
+
+        threading.Timer(0.05, cancel.set).start()
+        started = time.monotonic()
+        try:
+            assert list(walk_media_dirs(tmp_path, cancel=cancel, lister=hanging_lister)) == []
+            assert time.monotonic() - started < 2
+        finally:
+            release.set()
+
+    def test_iter_missing_folder(self, tmp_path: Path) -> None:
+        assert list(iter_media_files(tmp_path / "missing")) == []
+
+    def test_tree_sort_key_compares_components_naturally(self) -> None:
+        root = Path("music")
+        paths = [root / "disc10" / "a.mp3", root / "disc2" / "b.mp3"]
+        paths.sort(key=lambda p: tree_sort_key(p, root))
+        assert [p.parent.name for p in paths] == ["disc2", "disc10"]
@@ -0,0 +1,206 @@
+"""Tests for VLCPlayer's resume seek, driven through its VLC event handlers.
+
+No media is played: the players are stand-ins that record calls, and the
+handlers are called directly with the events VLC would send.
+"""
+
+import sys
+import threading
+import types
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+try:
+    import vlc  # noqa: F401
+except ImportError:
+    # Only the names player.py touches at import time are needed here.
+    _vlc = types.ModuleType("vlc")
+    _vlc.__getattr__ = lambda name: type(name, (), {})  # type: ignore[method-assign]
+    sys.modules["vlc"] = _vlc
+
+from song_folder_player.events import EVENT_PROGRESS, PlayerEventBus
+from song_folder_player.fade import DEFAULT_CURVE, get_curve
+from song_folder_player.player import VLCPlayer, _Deck
+
+
+class FakeMediaPlayer:
+    """Records the calls VLCPlayer makes on a libvlc media player."""
+
+    def __init__(self) -> None:
+        self.seekable = True
+        self.media: Any = None
+        self.paused = False
+        self.seeks: list[int] = []
+
+    def set_media(self, media: Any) -> None:
+        self.media = media
+
+    def play(self) -> int:
+        return 0
+
+    def stop(self) -> None:
+        self.media = None
+
+    def set_pause(self, paused: int) -> None:
+        self.paused = bool(paused)
+
+    def is_seekable(self) -> int:
+        return int(self.seekable)
+
+    def set_time(self, ms: int) -> None:
+        self.seeks.append(ms)
+
+    def get_time(self) -> int:
+        return self.seeks[-1] if self.seeks else 0
+
+    def audio_set_volume(self, volume: int) -> None:
+        pass
+
+
+class FakeMedia:
+    def release(self) -> None:
+        pass
+
+
+class FakeInstance:
+    def media_new(self, path: str) -> FakeMedia:
+        return FakeMedia()
+
+
+def event(**fields: Any) -> types.SimpleNamespace:
+    """A VLC event carrying fields in its u union."""
+    return types.SimpleNamespace(u=types.SimpleNamespace(**fields))
+
+
+@pytest.fixture
+def track(tmp_path: Path) -> Path:
+    path = tmp_path / "a.mp3"
+    path.write_bytes(b"x")
+    return path
+
+
+@pytest.fixture
+def player() -> VLCPlayer:
+    """A VLCPlayer with fake decks and no VLC instance or threads."""
+    player = VLCPlayer.__new__(VLCPlayer)
+    player._instance = FakeInstance()
+    player.media_cache = types.SimpleNamespace(get=lambda path: FakeMedia())
+    player._active = _Deck(FakeMediaPlayer())
+    player._standby = _Deck(FakeMediaPlayer())
+    player._player = player._active.player
+    player.events = PlayerEventBus()
+    player._current_file = None
+    player._volume = 100
+    player._lock = threading.RLock()
+    player._handed_off = None
+    player._generation = 0
+    player._ended_at = None
+    player.last_gap_ms = None
+    player._fade_curve = get_curve(DEFAULT_CURVE)
+    player._fading = None
+    return player
+
+
+class TestResumeSeek:
+    def test_pending_position_reported_until_open(self, player: VLCPlayer, track: Path) -> None:
+        assert player.play_paused_at(track, 5000)
+        assert player._active.seek_ms == 5000
+        assert player.get_time() == 5000
+        assert player._active.player.seeks == []
+
+    def test_seek_applied_on_playing_when_seekable(self, player: VLCPlayer, track: Path) -> None:
+        progress: list[tuple[int, int, bool]] = []
+        player.events.subscribe(EVENT_PROGRESS, lambda *args: progress.append(args))
+        player.play_paused_at(track, 5000)
+        player._handle_playing(event(), player._active)
+
+        deck = player._active
+        assert deck.player.paused
+        assert deck.player.seeks == [5000]
+        assert deck.seek_ms == -1
+        assert progress[-1] == (5000, -1, False)
+
+    def test_seek_waits_for_seekable_changed(self, player: VLCPlayer, track: Path) -> None:
+        player.play_paused_at(track, 5000)
+        deck = player._active
+        deck.player.seekable = False
+        player._handle_seekable_changed(event(new_seekable=1), deck)
+
+        assert deck.player.seeks == [5000]
+        player._handle_playing(event(), deck)
+        assert deck.player.seeks == [5000]  # Applied once
+
+    def test_unseekable_on_playing_keeps_seek_pending(
+        self, player: VLCPlayer, track: Path
+    ) -> None:
+        player.play_paused_at(track, 5000)
+        deck = player._active
+        deck.player.seekable = False
+        player._handle_playing(event(), deck)
+
+        assert deck.seek_ms == 5000
+        assert deck.player.seeks == []
+        assert player.get_time() == 0  # The real position, not the stale target
+
+        # Seekable only reported just after Playing.
+        deck.player.seekable = True
+        player._handle_seekable_changed(event(new_seekable=1), deck)
+        assert deck.player.seeks == [5000]
+        assert deck.seek_ms == -1
+        assert player.get_time() == 5000
+
+    def test_unseekable_changed_after_playing_drops_seek(
+        self, player: VLCPlayer, track: Path
+    ) -> None:
+        player.play_paused_at(track, 5000)
+        deck = player._active
+        deck.player.seekable = False
+        player._handle_playing(event(), deck)
+        player._handle_seekable_changed(event(new_seekable=0), deck)
+        assert deck.seek_ms == -1
+        assert deck.player.seeks == []
+
+    def test_unseekable_changed_drops_seek(self, player: VLCPlayer, track: Path) -> None:
+        player.play_paused_at(track, 5000)
+        player._handle_seekable_changed(event(new_seekable=0), player._active)
+        assert player._active.seek_ms == -1
+        player.set_time(1000)
+        assert player._active.seek_ms == -1  # Not turned back into a pending seek
+
+    def test_set_time_replaces_pending_seek(self, player: VLCPlayer, track: Path) -> None:
+        player.play_paused_at(track, 5000)
+        player.set_time(1000)
+        assert player.get_time() == 1000
+        player._active.player.seeks.clear()
+        player._handle_playing(event(), player._active)
+        assert player._active.player.seeks == [1000]
+
+    def test_zero_position_is_not_a_pending_seek(self, player: VLCPlayer, track: Path) -> None:
+        player.play_paused_at(track, 0)
+        assert player._active.seek_ms == -1
+
+    def test_stop_clears_pending_seek(self, player: VLCPlayer, track: Path) -> None:
+        player.play_paused_at(track, 5000)
+        player.stop()
+        assert player._active.seek_ms == -1
+
+    def test_loading_another_track_clears_pending_seek(
+        self, player: VLCPlayer, track: Path
+    ) -> None:
+        player.play_paused_at(track, 5000)
+        player.play(track)
+        assert player._active.seek_ms == -1
+        player._handle_playing(event(), player._active)
+        assert player._active.player.seeks == []
+
+
+class TestPreloadRewind:
+    def test_standby_rewound_when_ready(self, player: VLCPlayer, track: Path) -> None:
+        player.preload(track)
+        standby = player._standby
+        player._handle_playing(event(), standby)
+        assert standby.ready
+        assert standby.player.paused
+        assert standby.player.seeks == [0]
@@ -1,11 +1,12 @@
 """Tests for PlaylistController: navigation, shuffle, and reconciliation."""
 
+from array import array
 from pathlib import Path
 
 import pytest
 
-from song_folder_player.playlist import PlaylistController
-from song_folder_player.state import PlaylistState
+from song_folder_player.playlist import PlaylistController, merge_at_random_positions
+from song_folder_player.state import PlaylistState, ShuffleOrder
 
 
 def files(*names: str) -> list[Path]:
@@ -75,6 +76,39 @@ class TestAdvanceStraight:
         assert ctrl.advance() is None
 
 
+class TestPeekNext:
+    def test_peek_does_not_move(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(files("a.mp3", "b.mp3", "c.mp3"), straight_state("a.mp3"))
+        assert ctrl.peek_next() == 1
+        assert ctrl.current_display_index == 0
+
+    def test_peek_matches_advance_in_shuffle(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(
+            files("a.mp3", "b.mp3", "c.mp3"),
+            shuffle_state("c.mp3", ["b.mp3", "c.mp3", "a.mp3"]),
+        )
+        peeked = ctrl.peek_next()
+        assert ctrl.file_at(peeked) == Path("a.mp3")
+        assert ctrl.advance() == peeked
+
+    def test_peek_wraps_with_loop(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(files("a.mp3", "b.mp3"), straight_state("b.mp3", loop=True))
+        assert ctrl.peek_next() == 0
+
+    def test_peek_returns_none_at_end_without_loop(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(files("a.mp3", "b.mp3"), straight_state("b.mp3", loop=False))
+        assert ctrl.peek_next() is None
+
+    def test_peek_empty_playlist(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load([], straight_state())
+        assert ctrl.peek_next() is None
+
+
 class TestRetreatStraight:
     def test_retreat_moves_backward(self) -> None:
         ctrl = PlaylistController()
@@ -283,6 +317,220 @@ class TestGoToAndSync:
 # file_at                                                              #
 # ------------------------------------------------------------------ #
 
+class TestCompactShuffleOrder:
+    def saved_order(self, names: tuple[str, ...], current: str) -> PlaylistState:
+        ps = straight_state(current)
+        ctrl = PlaylistController()
+        ctrl.load(files(*names), ps)
+        ctrl.enable_shuffle()
+        ctrl.sync_to_state()
+        return ps
+
+    def test_sync_writes_permutation_of_file_list(self) -> None:
+        ps = self.saved_order(("a.mp3", "b.mp3", "c.mp3"), "b.mp3")
+        assert isinstance(ps.shuffle_order, ShuffleOrder)
+        assert ps.shuffle_order.names == ["a.mp3", "b.mp3", "c.mp3"]
+        assert ps.shuffle_order[0] == "b.mp3"
+
+    def test_unchanged_folder_restores_order(self) -> None:
+        names = ("a.mp3", "b.mp3", "c.mp3", "d.mp3")
+        ps = self.saved_order(names, "c.mp3")
+        saved = list(ps.shuffle_order or [])
+
+        ctrl = PlaylistController()
+        ctrl.load(files(*names), ps)
+        assert [ctrl.file_at(i).name for i in range(4)] == saved  # type: ignore[union-attr]
+        assert ctrl.current_file() == Path("c.mp3")
+
+    def test_unchanged_order_keeps_saved_object(self) -> None:
+        names = ("a.mp3", "b.mp3", "c.mp3")
+        ps = self.saved_order(names, "a.mp3")
+        saved = ps.shuffle_order
+        ctrl = PlaylistController()
+        ctrl.load(files(*names), ps)
+        ctrl.advance()
+        ctrl.sync_to_state()
+        assert ps.shuffle_order is saved
+
+    def test_changed_folder_falls_back_to_names(self) -> None:
+        ps = self.saved_order(("a.mp3", "b.mp3", "c.mp3"), "b.mp3")
+        saved = [n for n in ps.shuffle_order or [] if n != "a.mp3"]
+
+        ctrl = PlaylistController()
+        ctrl.load(files("b.mp3", "c.mp3", "d.mp3"), ps)
+        order = [ctrl.file_at(i).name for i in range(3)]  # type: ignore[union-attr]
+        assert [n for n in order if n != "d.mp3"] == saved
+        assert ctrl.current_file() == Path("b.mp3")
+
+
+class TestLazyShuffle:
+    def test_enable_shuffle_stores_seed_not_list(self) -> None:
+        names = tuple(f"{i:03d}.mp3" for i in range(200))
+        ps = straight_state("050.mp3")
+        ctrl = PlaylistController()
+        ctrl.load(files(*names), ps)
+        ctrl.enable_shuffle()
+        ctrl.sync_to_state()
+        packed = ps.to_dict()["shuffle_order"]
+        assert "seed" in packed and "permutation" not in packed
+        assert len(packed["swaps"]) <= 2
+
+    def test_saved_seed_restores_same_order(self) -> None:
+        names = tuple(f"{i:03d}.mp3" for i in range(200))
+        ps = straight_state("050.mp3")
+        ctrl = PlaylistController()
+        ctrl.load(files(*names), ps)
+        ctrl.enable_shuffle()
+        ctrl.advance()
+        ctrl.sync_to_state()
+        expected = [ctrl.file_at(i) for i in range(200)]
+
+        restored = PlaylistState.from_dict(ps.to_dict())
+        other = PlaylistController()
+        other.load(files(*names), restored)
+        assert [other.file_at(i) for i in range(200)] == expected
+        assert other.current_display_index == 1
+
+    def test_display_positions_use_inverse(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(files("a.mp3", "b.mp3", "c.mp3", "d.mp3"), straight_state("c.mp3"))
+        ctrl.enable_shuffle()
+        positions = ctrl.display_positions_of([0, 1, 2, 3])
+        assert positions == [0, 1, 2, 3]
+        assert ctrl.display_positions_of_ranked([2]) == [0]
+
+
+class TestCompactStorage:
+    def test_files_rebuilt_from_root(self) -> None:
+        root = Path("music")
+        paths = [root / "a.mp3", root / "disc1" / "b.mp3"]
+        ctrl = PlaylistController()
+        ctrl.load(paths, straight_state(), root=root)
+        assert ctrl.files == paths
+        assert list(ctrl.files) == paths
+        assert ctrl.files[-1] == root / "disc1" / "b.mp3"
+        assert ctrl.file_at(1) == root / "disc1" / "b.mp3"
+
+    def test_track_names_without_paths(self) -> None:
+        root = Path("music")
+        ctrl = PlaylistController()
+        ctrl.load([root / "a.mp3", root / "disc1" / "b.mp3"], straight_state(), root=root)
+        assert list(ctrl.track_names) == ["a.mp3", "disc1/b.mp3"]
+        assert ctrl.track_name_at(1) == "disc1/b.mp3"
+        assert ctrl.track_name_at(2) == ""
+
+    def test_files_outside_root_are_kept(self) -> None:
+        root = Path("music")
+        paths = [root / "a.mp3", Path("elsewhere") / "b.mp3"]
+        ctrl = PlaylistController()
+        ctrl.load(paths, straight_state(), root=root)
+        assert ctrl.files == paths
+
+    def test_reconciled_order_is_an_index_array(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(files("a.mp3", "b.mp3", "c.mp3"), shuffle_state("b.mp3", ["c.mp3", "b.mp3"]))
+        assert isinstance(ctrl.display_order, array)
+        assert ctrl.display_order.itemsize == 4
+
+
+class TestShuffleStrategies:
+    names = tuple(f"disc{d}/{t:02d}.mp3" for d in range(3) for t in range(10))
+    root = Path("music")
+
+    def load(self, ctrl: PlaylistController, ps: PlaylistState) -> None:
+        ctrl.load([self.root / name for name in self.names], ps, root=self.root)
+
+    def test_seed_reproduces_order(self) -> None:
+        orders = []
+        for _ in range(2):
+            ctrl = PlaylistController()
+            self.load(ctrl, straight_state(self.names[0]))
+            ctrl.enable_shuffle(seed=1234)
+            orders.append([ctrl.file_at(i) for i in range(len(self.names))])
+        assert orders[0] == orders[1]
+
+    def test_seed_stored_in_state(self) -> None:
+        ps = straight_state(self.names[0])
+        ctrl = PlaylistController()
+        self.load(ctrl, ps)
+        ctrl.enable_shuffle(seed=99)
+        assert ps.shuffle_seed == 99
+
+    def test_seeded_controller_rng_is_reproducible(self) -> None:
+        import random
+        seeds = []
+        for _ in range(2):
+            ps = straight_state(self.names[0])
+            ctrl = PlaylistController(rng=random.Random(5))
+            self.load(ctrl, ps)
+            ctrl.enable_shuffle()
+            seeds.append(ps.shuffle_seed)
+        assert seeds[0] == seeds[1]
+
+    @pytest.mark.parametrize("strategy", ["uniform", "spread", "weighted"])
+    def test_current_track_first(self, strategy: str) -> None:
+        ctrl = PlaylistController()
+        self.load(ctrl, straight_state("disc1/05.mp3"))
+        ctrl.shuffle_strategy = strategy
+        ctrl.enable_shuffle()
+        assert ctrl.current_file() == self.root / "disc1" / "05.mp3"
+        assert ctrl.current_display_index == 0
+        assert sorted(ctrl.display_order) == list(range(len(self.names)))
+
+    def test_strategy_order_survives_save(self) -> None:
+        ps = straight_state("disc0/00.mp3")
+        ctrl = PlaylistController()
+        self.load(ctrl, ps)
+        ctrl.shuffle_strategy = "spread"
+        ctrl.enable_shuffle(seed=7)
+        ctrl.sync_to_state()
+        expected = list(ctrl.display_order)
+
+        restored = PlaylistState.from_dict(ps.to_dict())
+        other = PlaylistController()
+        self.load(other, restored)
+        assert list(other.display_order) == expected
+        assert other.shuffle_strategy == "spread"
+
+    def test_record_play_counts_current_track(self) -> None:
+        ps = straight_state("disc0/01.mp3")
+        ctrl = PlaylistController()
+        self.load(ctrl, ps)
+        ctrl.record_play()
+        ctrl.record_play()
+        assert ps.play_counts == {"disc0/01.mp3": 2}
+
+
+class TestMergeAtRandomPositions:
+    def test_keeps_base_order_and_adds_every_item(self) -> None:
+        base = list(range(100))
+        merged = merge_at_random_positions(base, list(range(100, 150)))
+        assert sorted(merged) == list(range(150))
+        assert [i for i in merged if i < 100] == base
+
+    def test_empty_inputs(self) -> None:
+        assert merge_at_random_positions([], [3]) == [3]
+        assert merge_at_random_positions([1, 2], []) == [1, 2]
+
+    def test_positions_are_spread(self) -> None:
+        # A single new item should land in every slot of a short list eventually.
+        positions = {merge_at_random_positions([0, 1, 2], [9]).index(9) for _ in range(200)}
+        assert positions == {0, 1, 2, 3}
+
+    def test_many_new_files_in_reconcile(self) -> None:
+        names = tuple(f"{i:04d}.mp3" for i in range(1000))
+        ctrl = PlaylistController()
+        ctrl.load(files(*names), shuffle_state("0500.mp3", ["0500.mp3", "0001.mp3"]))
+        assert sorted(ctrl.display_order) == list(range(1000))
+        assert ctrl.current_file() == Path("0500.mp3")
+        assert ctrl.display_order.index(500) < ctrl.display_order.index(1)
+
+    def test_duplicate_saved_names_collapse(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(files("a.mp3", "b.mp3"), shuffle_state("a.mp3", ["b.mp3", "a.mp3", "b.mp3"]))
+        assert list(ctrl.display_order) == [1, 0]
+
+
 class TestFileAt:
     def test_straight_mode(self) -> None:
         ctrl = PlaylistController()
@@ -300,3 +548,70 @@ class TestFileAt:
         assert ctrl.file_at(0) == Path("c.mp3")
         assert ctrl.file_at(1) == Path("a.mp3")
         assert ctrl.file_at(3) is None
+
+
+# ------------------------------------------------------------------ #
+# Subfolder (recursive) playlists                                      #
+# ------------------------------------------------------------------ #
+
+class TestSubfolders:
+    def test_track_name_is_relative_to_root(self) -> None:
+        root = Path("music")
+        ctrl = PlaylistController()
+        ctrl.load([root / "disc1" / "01.mp3", root / "intro.mp3"], straight_state(), root=root)
+        assert ctrl.track_name(root / "disc1" / "01.mp3") == "disc1/01.mp3"
+        assert ctrl.track_name(root / "intro.mp3") == "intro.mp3"
+
+    def test_same_filename_in_different_subfolders(self) -> None:
+        root = Path("music")
+        tracks = [root / "disc1" / "01.mp3", root / "disc2" / "01.mp3"]
+        ps = straight_state("disc2/01.mp3")
+        ctrl = PlaylistController()
+        ctrl.load(tracks, ps, root=root)
+        assert ctrl.current_file() == root / "disc2" / "01.mp3"
+        ctrl.enable_shuffle()
+        ctrl.sync_to_state()
+        assert ps.current_filename == "disc2/01.mp3"
+        assert set(ps.shuffle_order) == {"disc1/01.mp3", "disc2/01.mp3"}
+
+
+# ------------------------------------------------------------------ #
+# display_positions_of                                                 #
+# ------------------------------------------------------------------ #
+
+class TestDisplayPositionsOf:
+    def test_straight_mode_is_identity(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(files("a.mp3", "b.mp3", "c.mp3"), straight_state("a.mp3"))
+        assert ctrl.display_positions_of([2, 0]) == [0, 2]
+
+    def test_shuffle_mode_maps_through_order(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(
+            files("a.mp3", "b.mp3", "c.mp3"),
+            shuffle_state("c.mp3", ["c.mp3", "a.mp3", "b.mp3"]),
+        )
+        # a.mp3 (file 0) is at position 1, c.mp3 (file 2) at position 0
+        assert ctrl.display_positions_of([0, 2]) == [0, 1]
+
+    def test_follows_reshuffle(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(files("a.mp3", "b.mp3", "c.mp3"), straight_state("b.mp3"))
+        ctrl.enable_shuffle()
+        ctrl.display_positions_of([0])
+        ctrl.reshuffle()
+        (pos,) = ctrl.display_positions_of([0])
+        assert ctrl.file_at(pos) == Path("a.mp3")
+
+    def test_out_of_range_skipped(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(files("a.mp3"), straight_state("a.mp3"))
+        assert ctrl.display_positions_of([0, 5, -1]) == [0]
+
+    def test_ranked_keeps_input_order(self) -> None:
+        ctrl = PlaylistController()
+        ctrl.load(
+            files("a.mp3", "b.mp3", "c.mp3"),
+            shuffle_state("c.mp3", ["c.mp3", "a.mp3", "b.mp3"]),
+        )
+        assert ctrl.display_positions_of_ranked([1, 2, 0]) == [2, 0, 1]
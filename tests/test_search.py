@@ -0,0 +1,93 @@
+"""Tests for search: SearchIndex substring queries and incremental narrowing."""
+
+from song_folder_player.search import SearchIndex, fold
+
+
+NAMES = ["Intro.mp3", "Love Song.mp3", "loveless.flac", "Outro.ogg", "Glove.mp3"]
+
+
+def brute_force(term: str) -> list[int]:
+    term = term.lower().strip()
+    return [i for i, name in enumerate(NAMES) if term in name.lower()]
+
+
+class TestSearchIndex:
+    def test_case_insensitive_substring(self) -> None:
+        index = SearchIndex(NAMES)
+        assert index.query("LOVE") == [1, 2, 4]
+
+    def test_short_and_long_terms_match_brute_force(self) -> None:
+        index = SearchIndex(NAMES)
+        for term in ("o", "ro", "tro", ".mp3", "song.mp3", "xyz", "3"):
+            assert SearchIndex(NAMES).query(term) == brute_force(term), term
+            assert index.query(term) == brute_force(term), term
+
+    def test_narrows_as_term_grows(self) -> None:
+        index = SearchIndex(NAMES)
+        for term in ("l", "lo", "lov", "love", "loves", "lovel"):
+            assert index.query(term) == brute_force(term), term
+
+    def test_term_does_not_match_across_names(self) -> None:
+        index = SearchIndex(["abc", "def"])
+        assert index.query("cd") == []
+
+    def test_empty_term_returns_all(self) -> None:
+        index = SearchIndex(NAMES)
+        index.query("love")
+        assert index.query("  ") == list(range(len(NAMES)))
+
+    def test_backspace_requeries(self) -> None:
+        index = SearchIndex(NAMES)
+        index.query("loves")
+        assert index.query("love") == brute_force("love")
+
+    def test_empty_index(self) -> None:
+        index = SearchIndex([])
+        assert index.query("abc") == []
+        assert len(index) == 0
+
+
+class TestFold:
+    def test_strips_accents_and_case(self) -> None:
+        assert fold("Beyoncé – DÉJÀ VU") == "beyonce – deja vu"
+
+    def test_casefold(self) -> None:
+        assert fold("Straße") == "strasse"
+
+
+class TestFuzzyQuery:
+    def test_subsequence_match(self) -> None:
+        index = SearchIndex(["Hotel California.mp3", "Highway to Hell.mp3"])
+        assert index.fuzzy_query("htlcal") == [0]
+
+    def test_all_tokens_required(self) -> None:
+        index = SearchIndex(["Love Song.mp3", "Love Me Do.mp3", "Song 2.mp3"])
+        assert index.fuzzy_query("love song") == [0]
+
+    def test_token_order_does_not_matter(self) -> None:
+        index = SearchIndex(["Love Song.mp3", "Other.mp3"])
+        assert index.fuzzy_query("song love") == [0]
+
+    def test_contiguous_ranks_above_scattered(self) -> None:
+        index = SearchIndex(["s-o-n-g.mp3", "song.mp3"])
+        assert index.fuzzy_query("song") == [1, 0]
+
+    def test_accent_insensitive(self) -> None:
+        index = SearchIndex(["Café del Mar.flac"])
+        assert index.fuzzy_query("cafe") == [0]
+        assert index.fuzzy_query("CAFÉ") == [0]
+
+    def test_metadata_matches(self) -> None:
+        index = SearchIndex(["01.mp3", "02.mp3"])
+        index.set_metadata(1, "Daft Punk Discovery")
+        assert index.fuzzy_query("daft") == [1]
+
+    def test_narrowing_matches_fresh_query(self) -> None:
+        names = ["alpha beta.mp3", "alphabet.mp3", "beta.mp3", "gamma.mp3"]
+        index = SearchIndex(names)
+        for text in ("a", "al", "alp", "alp b", "alp be"):
+            assert index.fuzzy_query(text) == SearchIndex(names).fuzzy_query(text), text
+
+    def test_empty_returns_all(self) -> None:
+        index = SearchIndex(["a.mp3", "b.mp3"])
+        assert index.fuzzy_query(" ") == [0, 1]
@@ -0,0 +1,77 @@
+"""Tests for shuffle strategies: reproducibility and ordering properties."""
+
+from collections import Counter
+
+import pytest
+
+from song_folder_player.shuffle import (
+    STRATEGIES,
+    SpreadShuffle,
+    UniformShuffle,
+    WeightedShuffle,
+    get_strategy,
+)
+
+
+def album_names(albums: int, tracks: int) -> list[str]:
+    return [f"album{a:02d}/{t:02d}.mp3" for a in range(albums) for t in range(tracks)]
+
+
+@pytest.mark.parametrize("name", list(STRATEGIES))
+class TestEveryStrategy:
+    def test_is_a_permutation(self, name: str) -> None:
+        names = album_names(5, 7)
+        order = STRATEGIES[name].order(names, 1, {})
+        assert sorted(order) == list(range(len(names)))
+
+    def test_same_seed_same_order(self, name: str) -> None:
+        names = album_names(5, 7)
+        strategy = STRATEGIES[name]
+        assert list(strategy.order(names, 42, {})) == list(strategy.order(names, 42, {}))
+        assert list(strategy.order(names, 42, {})) != list(strategy.order(names, 43, {}))
+
+    def test_empty(self, name: str) -> None:
+        assert list(STRATEGIES[name].order([], 1, {})) == []
+
+
+class TestSpreadShuffle:
+    def adjacent_same_album(self, names: list[str], order: list[int]) -> int:
+        folders = [names[i].split("/")[0] for i in order]
+        return sum(a == b for a, b in zip(folders, folders[1:]))
+
+    def test_fewer_same_album_neighbours_than_uniform(self) -> None:
+        names = album_names(10, 10)
+        spread = sum(
+            self.adjacent_same_album(names, list(SpreadShuffle().order(names, seed, {})))
+            for seed in range(20)
+        )
+        uniform = sum(
+            self.adjacent_same_album(names, list(UniformShuffle().order(names, seed, {})))
+            for seed in range(20)
+        )
+        assert spread < uniform / 2
+
+    def test_custom_group_key(self) -> None:
+        names = [f"{artist} - {n}.mp3" for artist in ("a", "b") for n in range(10)]
+        order = SpreadShuffle(group_of=lambda name: name[0]).order(names, 3, {})
+        artists = [names[i][0] for i in order]
+        assert sum(x == y for x, y in zip(artists, artists[1:])) <= 4
+
+
+class TestWeightedShuffle:
+    def test_played_tracks_tend_to_come_first(self) -> None:
+        names = [f"{i:03d}.mp3" for i in range(100)]
+        counts = {"007.mp3": 500}
+        positions = [list(WeightedShuffle().order(names, seed, counts)).index(7) for seed in range(30)]
+        assert sum(positions) / len(positions) < 5
+
+
+def test_uniform_orders_equally_likely() -> None:
+    names = [f"{i}.mp3" for i in range(4)]
+    counts = Counter(tuple(UniformShuffle().order(names, seed, {})) for seed in range(4800))
+    assert len(counts) == 24
+    assert all(150 < count < 250 for count in counts.values())  # 200 expected
+
+
+def test_unknown_strategy_falls_back_to_uniform() -> None:
+    assert get_strategy("nope") is STRATEGIES["uniform"]
@@ -1,11 +1,25 @@
 """Tests for state: data classes, serialization, and persistence."""
 
 import json
+import random
+import sqlite3
 from pathlib import Path
 
 import pytest
 
-from song_folder_player.state import AppState, PlaylistState, load_state, save_state
+from song_folder_player.state import (
+    AppState,
+    JsonStateBackend,
+    PlaylistState,
+    SaveScheduler,
+    ShuffleOrder,
+    SqliteStateBackend,
+    decode_shuffle_order,
+    encode_shuffle_order,
+    load_state,
+    save_state,
+    select_backend,
+)
 
 
 class TestPlaylistState:
@@ -43,6 +57,20 @@ class TestPlaylistState:
         assert state.shuffle_order is None
         assert state.loop_enabled is True
         assert state.playback_position_ms == 0
+        assert state.include_subfolders is False
+
+    def test_include_subfolders_roundtrip(self) -> None:
+        original = PlaylistState(include_subfolders=True)
+        assert PlaylistState.from_dict(original.to_dict()).include_subfolders is True
+
+    def test_shuffle_settings_roundtrip(self) -> None:
+        original = PlaylistState(
+            shuffle_seed=2**62 + 1, shuffle_strategy="weighted", play_counts={"a.mp3": 3}
+        )
+        restored = PlaylistState.from_dict(json.loads(json.dumps(original.to_dict())))
+        assert restored.shuffle_seed == 2**62 + 1
+        assert restored.shuffle_strategy == "weighted"
+        assert restored.play_counts == {"a.mp3": 3}
 
 
 class TestAppState:
@@ -59,13 +87,24 @@ class TestAppState:
             },
             volume=80,
             zoom_level=1.5,
+            fuzzy_search=True,
+            crossfade_ms=5000,
+            crossfade_curve="linear",
         )
         restored = AppState.from_dict(state.to_dict())
         assert restored.recent_folders == state.recent_folders
         assert restored.volume == 80
         assert restored.zoom_level == 1.5
+        assert restored.fuzzy_search is True
+        assert restored.crossfade_ms == 5000
+        assert restored.crossfade_curve == "linear"
         assert restored.playlists["C:\\Music\\A"].current_filename == "song.mp3"
 
+    def test_crossfade_defaults_off(self) -> None:
+        restored = AppState.from_dict({"recent_folders": []})
+        assert restored.crossfade_ms == 0
+        assert restored.crossfade_curve == "equal_power"
+
     def test_add_recent_folder_prepends(self) -> None:
         state = AppState(recent_folders=["C:\\B"])
         state.add_recent_folder("C:\\A")
@@ -125,3 +164,427 @@ class TestLoadSaveState:
 
         state = load_state()
         assert isinstance(state, AppState)
+
+
+class TestShardedPlaylists:
+    @pytest.fixture(autouse=True)
+    def app_dir(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        import song_folder_player.state as state_module
+        monkeypatch.setattr(state_module, "STATE_FILE", tmp_path / "state.json")
+        monkeypatch.setattr(state_module, "PLAYLISTS_DIR", tmp_path / "playlists")
+        return tmp_path
+
+    def test_global_file_has_no_playlists(self, app_dir: Path) -> None:
+        state = load_state()
+        state.get_playlist_state(str(app_dir / "music")).current_filename = "a.mp3"
+        save_state(state)
+        data = json.loads((app_dir / "state.json").read_text(encoding="utf-8"))
+        assert "playlists" not in data
+        assert len(list((app_dir / "playlists").glob("*.json"))) == 1
+
+    def test_playlist_loaded_lazily_from_shard(self, app_dir: Path) -> None:
+        folder = str(app_dir / "music")
+        state = load_state()
+        state.get_playlist_state(folder).current_filename = "b.mp3"
+        save_state(state)
+
+        restored = load_state()
+        assert restored.playlists == {}
+        assert restored.get_playlist_state(folder).current_filename == "b.mp3"
+
+    def test_only_changed_playlists_are_rewritten(self, app_dir: Path) -> None:
+        state = load_state()
+        a = state.get_playlist_state(str(app_dir / "a"))
+        b = state.get_playlist_state(str(app_dir / "b"))
+        a.current_filename = "a.mp3"
+        b.current_filename = "b.mp3"
+        save_state(state)
+
+        for shard in (app_dir / "playlists").glob("*.json"):
+            shard.write_text(shard.read_text(encoding="utf-8").replace("mp3", "xx3"), encoding="utf-8")
+        b.playback_position_ms = 1000
+        save_state(state)
+
+        contents = [p.read_text(encoding="utf-8") for p in (app_dir / "playlists").glob("*.json")]
+        assert sum("xx3" in c for c in contents) == 1  # a.mp3 untouched, b rewritten
+
+    def test_shuffle_order_change_detected(self, app_dir: Path) -> None:
+        folder = str(app_dir / "music")
+        state = load_state()
+        ps = state.get_playlist_state(folder)
+        ps.shuffle_order = ["a.mp3", "b.mp3"]
+        save_state(state)
+        ps.shuffle_order.reverse()
+        save_state(state)
+        assert load_state().get_playlist_state(folder).shuffle_order == ["b.mp3", "a.mp3"]
+
+    def test_migrates_single_file_playlists(self, app_dir: Path) -> None:
+        folder = str(app_dir / "music")
+        legacy = {
+            "recent_folders": [folder],
+            "playlists": {folder: {"current_filename": "old.mp3", "shuffle_order": None}},
+            "volume": 50,
+        }
+        (app_dir / "state.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        save_state(load_state())
+
+        data = json.loads((app_dir / "state.json").read_text(encoding="utf-8"))
+        assert "playlists" not in data
+        assert load_state().get_playlist_state(folder).current_filename == "old.mp3"
+
+    def test_dropped_playlist_shard_is_deleted(self, app_dir: Path) -> None:
+        state = load_state()
+        kept, dropped = str(app_dir / "a"), str(app_dir / "b")
+        state.get_playlist_state(kept).current_filename = "a.mp3"
+        state.get_playlist_state(dropped).current_filename = "b.mp3"
+        save_state(state)
+        assert len(list((app_dir / "playlists").glob("*.json"))) == 2
+
+        del state.playlists[dropped]
+        save_state(state)
+
+        assert len(list((app_dir / "playlists").glob("*.json"))) == 1
+        restored = load_state()
+        assert restored.get_playlist_state(kept).current_filename == "a.mp3"
+        assert restored.get_playlist_state(dropped).current_filename == ""
+
+    def test_unloaded_playlist_shards_are_kept(self, app_dir: Path) -> None:
+        state = load_state()
+        state.get_playlist_state(str(app_dir / "a")).current_filename = "a.mp3"
+        save_state(state)
+        save_state(load_state())  # Nothing loaded lazily yet
+        assert len(list((app_dir / "playlists").glob("*.json"))) == 1
+
+    def test_failed_shard_write_keeps_single_file_playlists(
+        self, app_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        import song_folder_player.state as state_module
+        folder = str(app_dir / "music")
+        legacy = {"playlists": {folder: {"current_filename": "old.mp3", "shuffle_order": None}}}
+        (app_dir / "state.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        write_json = state_module._write_json
+
+        def failing_write(path: Path, data: dict, indent: int | None = 2) -> None:
+            if path.parent == app_dir / "playlists":
+                raise OSError("disk full")
+            write_json(path, data, indent)
+
+        monkeypatch.setattr(state_module, "_write_json", failing_write)
+        with pytest.raises(OSError):
+            save_state(load_state())
+        monkeypatch.setattr(state_module, "_write_json", write_json)
+
+        assert load_state().get_playlist_state(folder).current_filename == "old.mp3"
+
+    def test_corrupt_shard_starts_fresh(self, app_dir: Path) -> None:
+        folder = str(app_dir / "music")
+        state = load_state()
+        state.get_playlist_state(folder).current_filename = "a.mp3"
+        save_state(state)
+        for shard in (app_dir / "playlists").glob("*.json"):
+            shard.write_text("{broken", encoding="utf-8")
+        assert load_state().get_playlist_state(folder).current_filename == ""
+
+
+class TestShuffleOrder:
+    def make(self, count: int = 5) -> ShuffleOrder:
+        names = [f"{i:02d} track.mp3" for i in range(count)]
+        return ShuffleOrder(names, list(reversed(range(count))))
+
+    def test_reads_as_names_in_shuffle_order(self) -> None:
+        order = self.make(3)
+        assert list(order) == ["02 track.mp3", "01 track.mp3", "00 track.mp3"]
+        assert order[0] == "02 track.mp3"
+        assert order == ["02 track.mp3", "01 track.mp3", "00 track.mp3"]
+        assert len(order) == 3
+
+    def test_roundtrip_through_playlist_state(self) -> None:
+        order = self.make()
+        state = PlaylistState(current_filename="01 track.mp3", shuffle_order=order)
+        restored = PlaylistState.from_dict(json.loads(json.dumps(state.to_dict())))
+        assert isinstance(restored.shuffle_order, ShuffleOrder)
+        assert restored.shuffle_order == order
+        assert restored.shuffle_order.fingerprint == order.fingerprint
+
+    def test_much_smaller_than_name_list(self) -> None:
+        names = [f"Artist - Album - {i:05d} Some Title.mp3" for i in range(30000)]
+        permutation = list(range(30000))
+        random.Random(1).shuffle(permutation)
+        packed = json.dumps(PlaylistState(shuffle_order=ShuffleOrder(names, permutation)).to_dict())
+        plain = json.dumps(PlaylistState(shuffle_order=[names[i] for i in permutation]).to_dict())
+        assert len(packed) < len(plain) / 4
+
+    def test_corrupt_compact_form_discarded(self) -> None:
+        data = PlaylistState(shuffle_order=self.make()).to_dict()
+        data["shuffle_order"]["permutation"] = "not base64 zlib"
+        assert PlaylistState.from_dict(data).shuffle_order is None
+
+    def test_out_of_range_index_rejected(self) -> None:
+        data = ShuffleOrder(["a.mp3"], [0]).to_dict()
+        data["names"] = ShuffleOrder([], []).to_dict()["names"]
+        with pytest.raises(ValueError):
+            ShuffleOrder.from_dict(data)
+
+    def test_sqlite_blob_roundtrip(self) -> None:
+        order = self.make()
+        decoded = decode_shuffle_order(encode_shuffle_order(order))
+        assert isinstance(decoded, ShuffleOrder)
+        assert decoded == order
+
+
+class TestShuffleBlob:
+    @pytest.mark.parametrize("order", [None, [], ["a.mp3"], ["disc1/01 é.mp3", "02.flac"]])
+    def test_roundtrip(self, order: list[str] | None) -> None:
+        assert decode_shuffle_order(encode_shuffle_order(order)) == order
+
+    def test_smaller_than_json(self) -> None:
+        order = [f"Artist - Album - {i:04d} Title.mp3" for i in range(1000)]
+        blob = encode_shuffle_order(order)
+        assert blob is not None
+        assert len(blob) < len(json.dumps(order)) / 4
+
+
+class TestSqliteStateBackend:
+    @pytest.fixture(autouse=True)
+    def app_dir(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        import song_folder_player.state as state_module
+        monkeypatch.setattr(state_module, "STATE_FILE", tmp_path / "state.json")
+        monkeypatch.setattr(state_module, "PLAYLISTS_DIR", tmp_path / "playlists")
+        return tmp_path
+
+    @pytest.fixture
+    def backend(self, app_dir: Path) -> SqliteStateBackend:
+        backend = SqliteStateBackend(app_dir / "state.db")
+        yield backend
+        backend.close()
+
+    def reopen(self, app_dir: Path) -> SqliteStateBackend:
+        return SqliteStateBackend(app_dir / "state.db")
+
+    def test_roundtrip(self, app_dir: Path, backend: SqliteStateBackend) -> None:
+        state = backend.load()
+        state.volume = 40
+        state.add_recent_folder(str(app_dir / "music"))
+        ps = state.get_playlist_state(str(app_dir / "music"))
+        ps.current_filename = "b.mp3"
+        ps.shuffle_order = ["b.mp3", "a.mp3"]
+        ps.playback_position_ms = 1234
+        backend.save(state)
+        backend.close()
+
+        other = self.reopen(app_dir)
+        restored = other.load()
+        other_ps = restored.get_playlist_state(str(app_dir / "music"))
+        other.close()
+        assert restored.volume == 40
+        assert restored.recent_folders == state.recent_folders
+        assert other_ps == ps
+
+    def test_uses_wal(self, app_dir: Path, backend: SqliteStateBackend) -> None:
+        backend.load()
+        conn = sqlite3.connect(app_dir / "state.db")
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_position_update_touches_one_column(self, app_dir: Path, backend: SqliteStateBackend) -> None:
+        state = backend.load()
+        ps = state.get_playlist_state(str(app_dir / "music"))
+        ps.shuffle_order = ["a.mp3", "b.mp3"]
+        backend.save(state)
+
+        statements: list[str] = []
+        backend._connect().set_trace_callback(statements.append)
+        ps.playback_position_ms = 5000
+        backend.save(state)
+        writes = [s for s in statements if s.startswith(("INSERT", "UPDATE"))]
+        assert len(writes) == 1
+        assert "playback_position_ms = 5000" in writes[0]
+        assert "shuffle_blob" not in writes[0]
+
+    def test_clean_state_writes_nothing(self, app_dir: Path, backend: SqliteStateBackend) -> None:
+        state = backend.load()
+        state.get_playlist_state(str(app_dir / "music")).current_filename = "a.mp3"
+        backend.save(state)
+        statements: list[str] = []
+        backend._connect().set_trace_callback(statements.append)
+        backend.save(state)
+        assert not [s for s in statements if s.startswith(("INSERT", "UPDATE"))]
+
+    def test_migrates_json_state_and_shards(self, app_dir: Path) -> None:
+        legacy_folder = str(app_dir / "legacy")
+        sharded_folder = str(app_dir / "sharded")
+        state = load_state()
+        state.volume = 30
+        state.get_playlist_state(sharded_folder).current_filename = "shard.mp3"
+        save_state(state)
+        data = json.loads((app_dir / "state.json").read_text(encoding="utf-8"))
+        data["playlists"] = {legacy_folder: {"current_filename": "old.mp3"}}
+        (app_dir / "state.json").write_text(json.dumps(data), encoding="utf-8")
+
+        backend = SqliteStateBackend(app_dir / "state.db")
+        migrated = backend.load()
+        assert migrated.volume == 30
+        assert migrated.get_playlist_state(legacy_folder).current_filename == "old.mp3"
+        assert migrated.get_playlist_state(sharded_folder).current_filename == "shard.mp3"
+        backend.close()
+
+    def test_migration_runs_once(self, app_dir: Path, backend: SqliteStateBackend) -> None:
+        state = backend.load()
+        state.volume = 10
+        backend.save(state)
+        backend.close()
+        (app_dir / "state.json").write_text(json.dumps({"volume": 99}), encoding="utf-8")
+        assert self.reopen(app_dir).load().volume == 10
+
+    def test_failed_migration_is_retried(
+        self, app_dir: Path, backend: SqliteStateBackend, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        import song_folder_player.state as state_module
+        (app_dir / "state.json").write_text(json.dumps({"volume": 30}), encoding="utf-8")
+        real_load_state = state_module.load_state
+
+        def failing_load_state() -> AppState:
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(state_module, "load_state", failing_load_state)
+        assert backend.load().volume == 100  # Fresh state this time
+        monkeypatch.setattr(state_module, "load_state", real_load_state)
+        assert backend.load().volume == 30
+
+    def test_read_only_backend_does_not_create_database(self, app_dir: Path) -> None:
+        (app_dir / "state.json").write_text(json.dumps({"volume": 30}), encoding="utf-8")
+        backend = SqliteStateBackend(app_dir / "state.db", read_only=True)
+        assert backend.load().volume == 30  # From JSON
+        backend.close()
+        assert not (app_dir / "state.db").exists()
+
+    def test_read_only_backend_does_not_migrate(self, app_dir: Path) -> None:
+        sqlite3.connect(app_dir / "state.db").close()  # Created but never imported
+        (app_dir / "state.json").write_text(json.dumps({"volume": 30}), encoding="utf-8")
+        backend = SqliteStateBackend(app_dir / "state.db", read_only=True)
+        assert backend.load().volume == 30
+        backend.close()
+        conn = sqlite3.connect(app_dir / "state.db")
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+        conn.close()
+
+    def test_read_only_backend_reads_database(
+        self, app_dir: Path, backend: SqliteStateBackend
+    ) -> None:
+        state = backend.load()
+        state.volume = 40
+        state.get_playlist_state(str(app_dir / "music")).current_filename = "b.mp3"
+        backend.save(state)
+
+        reader = SqliteStateBackend(app_dir / "state.db", read_only=True)
+        restored = reader.load()
+        assert restored.volume == 40
+        assert restored.get_playlist_state(str(app_dir / "music")).current_filename == "b.mp3"
+        reader.close()
+
+    def test_shuffle_settings_roundtrip(self, app_dir: Path, backend: SqliteStateBackend) -> None:
+        folder = str(app_dir / "music")
+        state = backend.load()
+        ps = state.get_playlist_state(folder)
+        ps.shuffle_seed = 2**63 - 1
+        ps.shuffle_strategy = "spread"
+        ps.play_counts = {"a.mp3": 2}
+        backend.save(state)
+        backend.close()
+        restored = self.reopen(app_dir).load().get_playlist_state(folder)
+        assert (restored.shuffle_seed, restored.shuffle_strategy, restored.play_counts) == (
+            2**63 - 1, "spread", {"a.mp3": 2}
+        )
+
+    def test_upgrades_version_1_database(self, app_dir: Path) -> None:
+        conn = sqlite3.connect(app_dir / "state.db")
+        conn.executescript(
+            "CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE playlists (folder TEXT PRIMARY KEY, current_filename TEXT NOT NULL DEFAULT '',"
+            " shuffle_blob BLOB, loop_enabled INTEGER NOT NULL DEFAULT 1,"
+            " playback_position_ms INTEGER NOT NULL DEFAULT 0,"
+            " include_subfolders INTEGER NOT NULL DEFAULT 0);"
+            "PRAGMA user_version=1;"
+        )
+        folder = str(app_dir / "music")
+        conn.execute("INSERT INTO playlists (folder, current_filename) VALUES (?, 'a.mp3')", (folder,))
+        conn.commit()
+        conn.close()
+        backend = self.reopen(app_dir)
+        ps = backend.load().get_playlist_state(folder)
+        backend.close()
+        assert ps.current_filename == "a.mp3"
+        assert ps.shuffle_strategy == "uniform"
+        assert ps.play_counts == {}
+
+    def test_select_backend(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("SONG_FOLDER_PLAYER_STATE", "sqlite")
+        assert isinstance(select_backend(), SqliteStateBackend)
+        monkeypatch.delenv("SONG_FOLDER_PLAYER_STATE")
+        assert isinstance(select_backend(), JsonStateBackend)
+        assert isinstance(select_backend("bogus"), JsonStateBackend)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSaveScheduler:
+    def make(self, clock: FakeClock, saves: list[float]) -> SaveScheduler:
+        return SaveScheduler(lambda: saves.append(clock.now), delay=1.0, max_latency=10.0, clock=clock)
+
+    def test_clean_state_never_writes(self) -> None:
+        clock, saves = FakeClock(), []
+        scheduler = self.make(clock, saves)
+        clock.now = 100.0
+        assert scheduler.due_in() is None
+        assert not scheduler.poll()
+        assert not scheduler.flush()
+        assert saves == []
+
+    def test_burst_is_coalesced_into_one_write(self) -> None:
+        clock, saves = FakeClock(), []
+        scheduler = self.make(clock, saves)
+        for t in (0.0, 0.2, 0.4, 0.6):
+            clock.now = t
+            scheduler.mark_dirty()
+            assert not scheduler.poll()
+        clock.now = 1.6
+        assert scheduler.poll()
+        assert saves == [1.6]
+        assert not scheduler.dirty
+
+    def test_max_latency_bounds_constant_churn(self) -> None:
+        clock, saves = FakeClock(), []
+        scheduler = self.make(clock, saves)
+        for step in range(25):
+            clock.now = step * 0.5
+            scheduler.mark_dirty()
+            scheduler.poll()
+        assert saves == [10.0]
+
+    def test_due_in_reports_delay(self) -> None:
+        clock, saves = FakeClock(), []
+        scheduler = self.make(clock, saves)
+        scheduler.mark_dirty()
+        clock.now = 0.25
+        assert scheduler.due_in() == pytest.approx(0.75)
+
+    def test_failed_write_stays_dirty_and_backs_off(self) -> None:
+        clock = FakeClock()
+
+        def fail() -> None:
+            raise OSError("disk full")
+        scheduler = SaveScheduler(fail, delay=1.0, max_latency=10.0, clock=clock)
+        scheduler.mark_dirty()
+        clock.now = 5.0
+        with pytest.raises(OSError):
+            scheduler.poll()
+        assert scheduler.dirty
+        assert scheduler.due_in() == pytest.approx(1.0)
@@ -0,0 +1,277 @@
+"""Virtualized list widget that draws only the rows in view."""
+
+import tkinter as tk
+import tkinter.font as tkfont
+from typing import Callable
+
+
+class VirtualListbox(tk.Canvas):
+    """Canvas-backed replacement for a single-select tk.Listbox.
+
+    Rows are not stored in the widget. The owner supplies a row count and a
+    row_text(index) function, and only the rows in view are ever formatted
+    and drawn, using a small pool of canvas text items. Scrolling, resizing
+    and rebuilding the list cost O(visible rows), whatever the list length.
+
+    Mirrors the Listbox notions the GUI relies on:
+    - selection: one highlighted row (the playing track)
+    - active: the keyboard cursor row, drawn underlined
+    """
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        *,
+        font: tuple[str, int],
+        bg: str,
+        fg: str,
+        selectbackground: str,
+        selectforeground: str,
+        yscrollcommand: Callable[[float, float], object] | None = None,
+        message_fg: str = "#666666",
+        **kwargs: object,
+    ) -> None:
+        super().__init__(master, bg=bg, highlightthickness=0, takefocus=True, **kwargs)
+        self._fg = fg
+        self._select_bg = selectbackground
+        self._select_fg = selectforeground
+        self._message_fg = message_fg
+        self._yscrollcommand = yscrollcommand
+
+        self._font = tkfont.Font(self, family=font[0], size=font[1])
+        self._active_font = self._font.copy()
+        self._active_font.configure(underline=True)
+        self._row_height = self._font.metrics("linespace") + 2
+
+        self._count: int = 0
+        self._row_text: Callable[[int], str] = lambda index: ""
+        self._message: str = ""
+        self._top: int = 0  # First row in view
+        self._active: int | None = None
+        self._selected: int | None = None
+        self._pending_see: int | None = None  # see() requested before first layout
+        self._redraw_scheduled: bool = False
+
+        self._select_rect = self.create_rectangle(0, 0, 0, 0, fill=selectbackground, width=0, state=tk.HIDDEN)
+        self._text_items: list[int] = []
+
+        self.bind("<Configure>", self._on_configure)
+        self.bind("<Button-1>", self._on_click)
+        self.bind("<MouseWheel>", self._on_mousewheel)
+        self.bind("<Button-4>", lambda e: self._scroll_rows(-3))
+        self.bind("<Button-5>", lambda e: self._scroll_rows(3))
+        self.bind("<Up>", lambda e: self._move_active(-1))
+        self.bind("<Down>", lambda e: self._move_active(1))
+        self.bind("<Prior>", lambda e: self._move_active(-self._visible_rows()))
+        self.bind("<Next>", lambda e: self._move_active(self._visible_rows()))
+
+    # ------------------------------------------------------------------ #
+    # Content                                                              #
+    # ------------------------------------------------------------------ #
+
+    def set_rows(self, count: int, row_text: Callable[[int], str]) -> None:
+        """Replace the list contents.
+
+        Args:
+            count: Number of rows.
+            row_text: Returns the text for a row; called only for rows in view.
+        """
+        self._count = count
+        self._row_text = row_text
+        self._message = ""
+        if self._active is not None and self._active >= count:
+            self._active = None
+        if self._selected is not None and self._selected >= count:
+            self._selected = None
+        self._top = max(0, min(self._top, self._max_top()))
+        self._schedule_redraw()
+
+    def set_message(self, text: str) -> None:
+        """Clear the list and show a dimmed placeholder line instead.
+
+        Args:
+            text: Placeholder text, e.g. "Loading player...".
+        """
+        self.set_rows(0, lambda index: "")
+        self._message = text
+        self._schedule_redraw()
+
+    def size(self) -> int:
+        """Number of rows."""
+        return self._count
+
+    def refresh(self) -> None:
+        """Re-read the text of the rows in view (e.g. after a marker moved)."""
+        self._schedule_redraw()
+
+    def set_font(self, font: tuple[str, int]) -> None:
+        """Change the row font.
+
+        Args:
+            font: (family, size) tuple.
+        """
+        self._font.configure(family=font[0], size=font[1])
+        self._active_font.configure(family=font[0], size=font[1])
+        self._row_height = self._font.metrics("linespace") + 2
+        self._schedule_redraw()
+
+    # ------------------------------------------------------------------ #
+    # Selection and active row                                             #
+    # ------------------------------------------------------------------ #
+
+    def active_index(self) -> int | None:
+        """Row under the keyboard cursor, or None if there is none."""
+        return self._active
+
+    def activate(self, index: int) -> None:
+        """Move the keyboard cursor (underlined row).
+
+        Args:
+            index: Row to activate; clamped to the list.
+        """
+        if self._count == 0:
+            return
+        self._active = max(0, min(index, self._count - 1))
+        self._schedule_redraw()
+
+    def selection_set(self, index: int) -> None:
+        """Highlight a single row.
+
+        Args:
+            index: Row to select.
+        """
+        if 0 <= index < self._count:
+            self._selected = index
+            self._schedule_redraw()
+
+    def selection_clear(self) -> None:
+        """Remove the row highlight."""
+        self._selected = None
+        self._schedule_redraw()
+
+    def see(self, index: int) -> None:
+        """Scroll so that a row is in view.
+
+        Args:
+            index: Row to bring into view.
+        """
+        if self.winfo_height() <= 1:
+            self._pending_see = index  # Not laid out yet; apply on first <Configure>
+            return
+        visible = max(1, self.winfo_height() // self._row_height)
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + visible:
+            self._top = index - visible + 1
+        self._top = max(0, min(self._top, self._max_top()))
+        self._schedule_redraw()
+
+    # ------------------------------------------------------------------ #
+    # Scrolling                                                            #
+    # ------------------------------------------------------------------ #
+
+    def yview(self, *args: str) -> None:  # type: ignore[override]
+        """Scrollbar command: handles "moveto" and "scroll" like Listbox.yview."""
+        if not args or self._count == 0:
+            return
+        if args[0] == "moveto":
+            self._top = int(float(args[1]) * self._count)
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                amount *= max(1, self._visible_rows() - 1)
+            self._top += amount
+        self._top = max(0, min(self._top, self._max_top()))
+        self._schedule_redraw()
+
+    def _scroll_rows(self, rows: int) -> str:
+        self.yview("scroll", str(rows), "units")
+        return "break"
+
+    def _on_mousewheel(self, event: tk.Event) -> str:  # type: ignore[type-arg]
+        return self._scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _move_active(self, delta: int) -> str:
+        if self._count:
+            start = self._active if self._active is not None else self._top
+            self.activate(start + delta)
+            if self._active is not None:
+                self.see(self._active)
+        return "break"
+
+    def _on_click(self, event: tk.Event) -> None:  # type: ignore[type-arg]
+        self.focus_set()
+        index = self._top + event.y // self._row_height
+        if 0 <= index < self._count:
+            self._active = index
+            self._selected = index
+            self._schedule_redraw()
+
+    def _visible_rows(self) -> int:
+        return max(1, -(-self.winfo_height() // self._row_height))
+
+    def _max_top(self) -> int:
+        return max(0, self._count - max(1, self.winfo_height() // self._row_height))
+
+    # ------------------------------------------------------------------ #
+    # Drawing                                                              #
+    # ------------------------------------------------------------------ #
+
+    def _on_configure(self, event: tk.Event) -> None:  # type: ignore[type-arg]
+        if self._pending_see is not None and event.height > 1:
+            index, self._pending_see = self._pending_see, None
+            self.see(index)
+        self._schedule_redraw()
+
+    def _schedule_redraw(self) -> None:
+        # Coalesce the several state changes of one GUI update into one redraw.
+        if not self._redraw_scheduled:
+            self._redraw_scheduled = True
+            self.after_idle(self._redraw)
+
+    def _redraw(self) -> None:
+        self._redraw_scheduled = False
+        visible = self._visible_rows()
+        while len(self._text_items) < visible:
+            self._text_items.append(self.create_text(2, 0, anchor="nw", font=self._font, fill=self._fg))
+        for item in self._text_items[visible:]:
+            self.itemconfigure(item, state=tk.HIDDEN)
+
+        width = self.winfo_width()
+        row_h = self._row_height
+        self.itemconfigure(self._select_rect, state=tk.HIDDEN)
+
+        for slot in range(visible):
+            item = self._text_items[slot]
+            row = self._top + slot
+            y = slot * row_h + 1
+            if row >= self._count:
+                if slot == 0 and self._message:
+                    self.coords(item, 2, y)
+                    self.itemconfigure(
+                        item, text=self._message, fill=self._message_fg, font=self._font, state=tk.NORMAL
+                    )
+                else:
+                    self.itemconfigure(item, state=tk.HIDDEN)
+                continue
+
+            selected = row == self._selected
+            if selected:
+                self.coords(self._select_rect, 0, y - 1, width, y - 1 + row_h)
+                self.itemconfigure(self._select_rect, state=tk.NORMAL)
+            self.coords(item, 2, y)
+            self.itemconfigure(
+                item,
+                text=self._row_text(row),
+                fill=self._select_fg if selected else self._fg,
+                font=self._active_font if row == self._active else self._font,
+                state=tk.NORMAL,
+            )
+
+        if self._yscrollcommand is not None:
+            if self._count:
+                first = self._top / self._count
+                last = min(1.0, (self._top + self.winfo_height() / row_h) / self._count)
+            else:
+                first, last = 0.0, 1.0
+            self._yscrollcommand(first, last)